@@ -0,0 +1,68 @@
+"""
+benchmarks.bench_codec
+~~~~~~~~~~~~~~~~~~~~~~
+
+Compares `pricing.codec` with pickle and repr strings parsed by
+`Price.parse`, per price and for arrays of prices.
+
+Usage: python benchmarks/bench_codec.py [number]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from decimal import Decimal
+import pickle
+import random
+import sys
+import time
+import timeit
+
+from pricing import Price, PriceRange, codec
+
+
+CASES = [
+    ('Price', Price('1234.56', 'USD')),
+    ('Price wide', Price('12345678901234567890.12345678', 'BTC')),
+    ('PriceRange', PriceRange(Price('10', 'EUR'), Price('99.99', 'EUR'))),
+]
+
+
+def run(number):
+    print('{:<24} {:>10} {:>10} {:>10} {:>6} {:>6}'.format(
+        'round trip', 'repr', 'pickle', 'codec', 'pickle', 'codec'))
+    for case, obj in CASES:
+        funcs = [lambda: pickle.loads(pickle.dumps(obj)),
+                 lambda: codec.loads(codec.dumps(obj))]
+        if isinstance(obj, Price):
+            funcs.insert(0, lambda: Price.parse(repr(obj)))
+        timings = [timeit.timeit(func, number=number) / number * 1e9
+                   for func in funcs]
+        if len(timings) < 3:
+            timings.insert(0, float('nan'))
+        print('{:<24} {:>8.0f}ns {:>8.0f}ns {:>8.0f}ns {:>5}B {:>5}B'.format(
+            case, *timings, len(pickle.dumps(obj)), len(codec.dumps(obj))))
+
+    rnd = random.Random(48)
+    prices = [Price(Decimal(rnd.randint(0, 10 ** 7)).scaleb(-2), 'USD')
+              for _ in range(number)]
+    print('\n{} prices'.format(number))
+    for case, dump, load in [
+            ('pickle list', pickle.dumps, pickle.loads),
+            ('codec records',
+             lambda items: b''.join(map(codec.dumps, items)),
+             lambda data: list(codec.iter_unpack(data))),
+            ('codec array', codec.dumps_array,
+             lambda data: codec.PriceBuffer(data).to_prices()),
+            ('codec array view', codec.dumps_array, codec.PriceBuffer)]:
+        start = time.perf_counter()
+        data = dump(prices)
+        dumped = time.perf_counter()
+        load(data)
+        loaded = time.perf_counter()
+        print('{:<24} dump {:>6.3f}s load {:>6.3f}s {:>10}B'.format(
+            case, dumped - start, loaded - dumped, len(data)))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
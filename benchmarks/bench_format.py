@@ -0,0 +1,52 @@
+"""
+benchmarks.bench_format
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Compares compiled formatters with `pricing.babel_numbers.format_currency`
+and `babel.numbers.format_currency`.
+
+Usage: python benchmarks/bench_format.py [number]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from decimal import Decimal
+import sys
+import timeit
+
+import babel.numbers
+
+from pricing import babel_numbers
+
+
+CASES = [
+    ('en_US', 'USD', None),
+    ('de_DE', 'EUR', None),
+    ('hi_IN', 'INR', None),
+    ('ja_JP', 'JPY', None),
+    ('en_US', 'BTC', '¤#,##0.########'),
+]
+
+VALUE = Decimal('1234567.891')
+
+
+def run(number):
+    print('{:<24} {:>10} {:>10} {:>10}'.format(
+        'case', 'babel', 'patched', 'compiled'))
+    for locale, currency, format in CASES:
+        formatter = babel_numbers.compile_formatter(
+            currency, format, locale)
+        timings = [
+            timeit.timeit(func, number=number) / number * 1e6 for func in (
+                lambda: babel.numbers.format_currency(
+                    VALUE, currency, format, locale),
+                lambda: babel_numbers.format_currency(
+                    VALUE, currency, format, locale),
+                lambda: formatter(VALUE))]
+        print('{:<24} {:>8.2f}us {:>8.2f}us {:>8.2f}us'.format(
+            '{} {}'.format(locale, currency), *timings))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
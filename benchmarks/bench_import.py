@@ -0,0 +1,41 @@
+"""
+benchmarks.bench_import
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Measures the time to import pricing, and to format a first price, in fresh
+interpreters.  tests/test_registry.py guards against eager imports.
+
+Usage: python benchmarks/bench_import.py [number]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import subprocess
+import sys
+import time
+
+
+CASES = [
+    ('interpreter', 'pass'),
+    ('import pricing', 'import pricing'),
+    ('from pricing import Price', 'from pricing import Price'),
+    ('first format', "import pricing; pricing.Price('1', 'USD').format()"),
+    ('pricing.configure()', 'import pricing; pricing.configure()'),
+]
+
+
+def timed(source):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', source], check=True)
+    return time.perf_counter() - start
+
+
+def run(number):
+    for name, source in CASES:
+        best = min(timed(source) for _ in range(number))
+        print('{:<28} {:>8.1f}ms'.format(name, best * 1e3))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,55 @@
+"""
+benchmarks.bench_pickle
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Compares pickle round trips and deep copies of prices using their
+``__reduce__``, ``__copy__`` and ``__deepcopy__``, with the generic paths
+used for attrs instances.
+
+Usage: python benchmarks/bench_pickle.py [number]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import copy
+from decimal import Decimal
+import pickle
+import random
+import sys
+import time
+
+from pricing import Price
+
+
+class GenericPrice(Price):
+    """Price pickled and copied like any attrs instance."""
+
+    __reduce__ = object.__reduce__
+    __deepcopy__ = None
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(number):
+    rnd = random.Random(49)
+    amounts = [Decimal(rnd.randint(0, 10 ** 7)).scaleb(-2)
+               for _ in range(number)]
+    print('{} prices'.format(number))
+    for case, cls in [('generic', GenericPrice), ('reduce', Price)]:
+        prices = [cls(amount, 'USD') for amount in amounts]
+        data, dumped = timed(pickle.dumps, prices, pickle.HIGHEST_PROTOCOL)
+        loaded, load = timed(pickle.loads, data)
+        assert loaded == prices
+        print('{:<24} dump {:>6.3f}s load {:>6.3f}s {:>10}B'.format(
+            'pickle ' + case, dumped, load, len(data)))
+        _, copied = timed(copy.deepcopy, prices)
+        print('{:<24} {:>6.3f}s'.format('deepcopy ' + case, copied))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,43 @@
+"""
+benchmarks.bench_registry
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Compares `pricing.registry.query_utility` with `zope.component.queryUtility`
+for the lookups made on every `Price.format` and `Price.to`.
+
+Usage: python benchmarks/bench_registry.py [number]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import sys
+import timeit
+
+from zope.component import queryUtility
+
+from pricing import registry
+from pricing.interfaces import ICurrencyFormat, IExchange, IFormatCache
+
+
+CASES = [
+    ('ICurrencyFormat BTC', ICurrencyFormat, 'BTC'),
+    ('ICurrencyFormat USD', ICurrencyFormat, 'USD'),
+    ('IExchange', IExchange, ''),
+    ('IFormatCache', IFormatCache, ''),
+]
+
+
+def run(number):
+    registry.configure()
+    print('{:<24} {:>10} {:>10}'.format('case', 'zope', 'snapshot'))
+    for case, interface, name in CASES:
+        timings = [
+            timeit.timeit(func, number=number) / number * 1e9 for func in (
+                lambda: queryUtility(interface, name),
+                lambda: registry.query_utility(interface, name))]
+        print('{:<24} {:>8.0f}ns {:>8.0f}ns'.format(case, *timings))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
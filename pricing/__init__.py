@@ -33,6 +33,8 @@ Usage::
 __version__ = '1.0.1'
 __title__ = 'pricing'
 __all__ = [
+    'configure',
+    'config',
     'exceptions',
     'interfaces',
     'exchange',
@@ -43,17 +45,52 @@ __all__ = [
     'XPrice',
     'SimpleBackend',
     'CoinBaseBackend',
+    'FileBackend',
+    'SharedBackend',
     'Exchange',
     'PriceRange'
     ]
 
 
-from zope.configuration import xmlconfig
+import importlib
+import os
 
-from . import exceptions, interfaces, exchange, price, fields, range
-from .price import Price, XPrice
-from .exchange import SimpleBackend, CoinBaseBackend, Exchange
-from .range import PriceRange
 
+# Submodules and their classes are imported on first access, see PEP 562.
+_lazy_modules = frozenset([
+    'config', 'exceptions', 'interfaces', 'exchange', 'price', 'fields',
+    'range'])
+_lazy_attributes = {
+    'configure': 'registry',
+    'Price': 'price',
+    'XPrice': 'price',
+    'SimpleBackend': 'exchange',
+    'CoinBaseBackend': 'exchange',
+    'FileBackend': 'exchange',
+    'SharedBackend': 'exchange',
+    'Exchange': 'exchange',
+    'PriceRange': 'range',
+}
 
-xmlconfig.file('configure.zcml', __import__('sys').modules[__name__])
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        module = importlib.import_module(
+            '.' + _lazy_attributes[name], __name__)
+        value = getattr(module, name)
+    elif name in _lazy_modules:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if os.environ.get('PRICING_DATA_PACK'):
+    from . import datapack
+    datapack.load(os.environ['PRICING_DATA_PACK'])
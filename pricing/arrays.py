@@ -0,0 +1,336 @@
+"""
+pricing.arrays
+~~~~~~~~~~~~~~
+
+Columnar arrays of price ranges.
+
+A `PriceRangeArray` stores the starts and stops of many ranges in one
+currency as integer columns at a common decimal scale, so shifting,
+containment tests, intersections and validation run over whole columns
+instead of building a `PriceRange` per row.  Columns are NumPy arrays when
+NumPy is installed, Python lists otherwise.
+
+Usage::
+
+    >>> ranges = PriceRangeArray.from_ranges([
+    ...     PriceRange(Price('1', 'USD'), Price('10', 'USD')),
+    ...     PriceRange(Price('5', 'USD'), Price('7.5', 'USD'))])
+    >>> (ranges + Price('0.25', 'USD'))[1]
+    PriceRange(start=USD 5.25, stop=USD 7.75)
+    >>> ranges.contains(Price('8', 'USD'))
+    array([ True, False])
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from decimal import Decimal
+
+from .exceptions import CurrencyMismatch, InvalidOperandType
+from .price import Price
+from .range import PriceRange
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+__all__ = ['PriceRangeArray']
+
+
+# Largest magnitude of int64 columns, sums and scaled values of smaller
+# magnitudes don't overflow.
+INT64_SAFE = 2 ** 62
+
+
+def _digits(amount):
+    """Return the number of fraction digits of a finite Decimal."""
+    if not amount.is_finite():
+        raise ValueError(f'Cannot store {amount} in a price range array')
+    return max(-amount.as_tuple().exponent, 0)
+
+
+def _column(values):
+    """Return an integer column of values."""
+    if numpy is None:
+        return list(values)
+    if not isinstance(values, numpy.ndarray):
+        values = list(values)
+        if not all(-INT64_SAFE < value < INT64_SAFE for value in values):
+            return numpy.array(values, dtype=object)
+    column = numpy.asarray(values)
+    if not column.size:
+        return column.astype(numpy.int64)
+    if column.dtype.kind == 'O':
+        return column
+    if column.dtype.kind not in 'iu':
+        raise TypeError(f'Integer columns required, not {column.dtype}')
+    if _magnitude(column) >= INT64_SAFE:
+        return column.astype(object)
+    return column.astype(numpy.int64, copy=False)
+
+
+def _is_array(column):
+    return numpy is not None and isinstance(column, numpy.ndarray)
+
+
+def _magnitude(column):
+    """Return the largest absolute value of a non-empty NumPy column."""
+    return max(abs(int(column.min())), abs(int(column.max())))
+
+
+def _widen(column, bound):
+    """Return column as Python ints if combining its values with values up
+    to bound could overflow int64."""
+    if (_is_array(column) and column.dtype != object and column.size and
+            _magnitude(column) + abs(bound) >= INT64_SAFE):
+        return column.astype(object)
+    return column
+
+
+def _add(column, value):
+    if _is_array(column):
+        return _widen(column, value) + value
+    return [item + value for item in column]
+
+
+def _multiply(column, factor):
+    if factor == 1:
+        return column
+    if _is_array(column):
+        if (column.dtype != object and column.size and
+                _magnitude(column) * factor >= INT64_SAFE):
+            column = column.astype(object)
+        return column * factor
+    return [item * factor for item in column]
+
+
+def _compare(op, left, right):
+    """Return the mask of op applied elementwise, right may be an int."""
+    if _is_array(left) or _is_array(right):
+        return op(left, right)
+    if isinstance(right, int):
+        return [op(item, right) for item in left]
+    return [op(a, b) for a, b in zip(left, right)]
+
+
+def _le(a, b):
+    return a <= b
+
+
+def _ge(a, b):
+    return a >= b
+
+
+def _combine(op, left, right):
+    """Combine two masks or columns elementwise."""
+    if _is_array(left) or _is_array(right):
+        return {'and': numpy.logical_and, 'max': numpy.maximum,
+                'min': numpy.minimum}[op](left, right)
+    func = {'and': lambda a, b: a and b, 'max': max, 'min': min}[op]
+    return [func(a, b) for a, b in zip(left, right)]
+
+
+class PriceRangeArray:
+    """Price ranges in one currency stored as integer columns.
+
+    Row i is the range from ``starts[i]`` to ``stops[i]`` units of
+    ``10 ** -scale``.  Like `PriceRange`, ranges are validated on creation,
+    in one pass over the columns.
+
+    :param currency str: A ISO4217 currency code.
+    :param starts: Column of range starts, a sequence or NumPy array of
+        integers.
+    :param stops: Column of range stops.
+    :param scale int: Number of fraction digits of the columns.
+    """
+
+    __slots__ = ('currency', 'starts', 'stops', 'scale')
+
+    def __init__(self, currency, starts, stops, scale=0):
+        self.currency = currency
+        self.starts = _column(starts)
+        self.stops = _column(stops)
+        self.scale = scale
+        self.validate()
+
+    @classmethod
+    def from_ranges(cls, ranges, currency=None):
+        """Build an array from `PriceRange` objects of one currency.
+
+        The scale is the largest number of fraction digits of the amounts.
+        currency is needed when ranges may be empty.
+        """
+        ranges = list(ranges)
+        if currency is None:
+            if not ranges:
+                raise ValueError('currency is required without ranges')
+            currency = ranges[0].currency
+        for price_range in ranges:
+            if price_range.currency != currency:
+                raise CurrencyMismatch(
+                    currency, price_range.currency, 'PriceRangeArray')
+        starts = [price_range.start.amount for price_range in ranges]
+        stops = [price_range.stop.amount for price_range in ranges]
+        scale = max(map(_digits, starts + stops), default=0)
+        return cls(currency,
+                   [int(amount.scaleb(scale)) for amount in starts],
+                   [int(amount.scaleb(scale)) for amount in stops],
+                   scale)
+
+    def validate(self):
+        """Raise ValueError unless every range starts before it stops."""
+        if len(self.starts) != len(self.stops):
+            raise ValueError(
+                'Got {} starts for {} stops'.format(
+                    len(self.starts), len(self.stops)))
+        valid = _compare(_le, self.starts, self.stops)
+        if _is_array(valid):
+            row = None if valid.all() else int(numpy.argmin(valid))
+        else:
+            row = None if all(valid) else valid.index(False)
+        if row is not None:
+            raise ValueError(
+                f'Cannot create a range from {self._price(self.starts[row])!r}'
+                f' to {self._price(self.stops[row])!r} at row {row}')
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return map(self._range, self.starts, self.stops)
+
+    def __getitem__(self, row):
+        return self._range(self.starts[row], self.stops[row])
+
+    def __eq__(self, other):
+        if not isinstance(other, PriceRangeArray):
+            return NotImplemented
+        return self.to_ranges() == other.to_ranges()
+
+    def __repr__(self):
+        return '{}({!r}, {} ranges, scale={})'.format(
+            type(self).__name__, self.currency, len(self), self.scale)
+
+    def _price(self, units):
+        return Price(Decimal(int(units)).scaleb(-self.scale), self.currency)
+
+    def _range(self, start, stop):
+        return PriceRange(self._price(start), self._price(stop))
+
+    def to_ranges(self):
+        """Return the rows as a list of `PriceRange` objects."""
+        return list(self)
+
+    def _rescaled(self, scale):
+        """Return starts and stops at a larger scale."""
+        factor = 10 ** (scale - self.scale)
+        return _multiply(self.starts, factor), _multiply(self.stops, factor)
+
+    def _units(self, price):
+        """Return price as integer units and their scale, aligned with the
+        columns' scale."""
+        if not isinstance(price, Price):
+            raise InvalidOperandType(price, 'PriceRangeArray')
+        if price.currency != self.currency:
+            raise CurrencyMismatch(
+                self.currency, price.currency, 'PriceRangeArray')
+        scale = max(self.scale, _digits(price.amount))
+        return int(price.amount.scaleb(scale)), scale
+
+    def _unit_column(self, prices):
+        """Return prices as an integer column and its scale, aligned with
+        the columns' scale."""
+        prices = list(prices)
+        if len(prices) != len(self):
+            raise ValueError(
+                'Got {} prices for {} ranges'.format(len(prices), len(self)))
+        for price in prices:
+            if not isinstance(price, Price):
+                raise InvalidOperandType(price, 'PriceRangeArray')
+            if price.currency != self.currency:
+                raise CurrencyMismatch(
+                    self.currency, price.currency, 'PriceRangeArray')
+        amounts = [price.amount for price in prices]
+        scale = max(map(_digits, amounts), default=0)
+        scale = max(scale, self.scale)
+        return _column(int(amount.scaleb(scale)) for amount in amounts), scale
+
+    def __add__(self, other):
+        """Shift every range by a `Price`."""
+        if not isinstance(other, Price):
+            return NotImplemented
+        units, scale = self._units(other)
+        starts, stops = self._rescaled(scale)
+        return PriceRangeArray(
+            self.currency, _add(starts, units), _add(stops, units), scale)
+
+    def __sub__(self, other):
+        """Shift every range by the negation of a `Price`."""
+        if not isinstance(other, Price):
+            return NotImplemented
+        return self + Price(-other.amount, other.currency)
+
+    def shift(self, price):
+        """Return the ranges shifted by price, same as ``self + price``."""
+        return self + price
+
+    def contains(self, prices):
+        """Return a boolean mask of the ranges containing prices.
+
+        :param prices: A `Price` tested against every range, or a sequence
+            of prices tested against the range of the same row.
+        """
+        if isinstance(prices, Price):
+            units, scale = self._units(prices)
+            starts, stops = (
+                _widen(column, units) for column in self._rescaled(scale))
+        else:
+            units, scale = self._unit_column(prices)
+            starts, stops = self._rescaled(scale)
+        return _combine('and', _compare(_le, starts, units),
+                        _compare(_ge, stops, units))
+
+    def overlaps(self, other):
+        """Return a boolean mask of the rows overlapping other's rows."""
+        starts, stops, other_starts, other_stops = self._aligned(other)
+        return _combine('and', _compare(_le, starts, other_stops),
+                        _compare(_ge, stops, other_starts))
+
+    def intersection(self, other):
+        """Return the intersections of the rows of both arrays.
+
+        Raises ValueError if any rows don't overlap, select overlapping
+        rows first with `overlaps` and `compress`.
+        """
+        starts, stops, other_starts, other_stops = self._aligned(other)
+        return PriceRangeArray(
+            self.currency, _combine('max', starts, other_starts),
+            _combine('min', stops, other_stops),
+            max(self.scale, other.scale))
+
+    def compress(self, mask):
+        """Return the rows where mask is true."""
+        if _is_array(self.starts):
+            mask = numpy.asarray(mask, dtype=bool)
+            return PriceRangeArray(self.currency, self.starts[mask],
+                                   self.stops[mask], self.scale)
+        return PriceRangeArray(
+            self.currency,
+            [start for start, keep in zip(self.starts, mask) if keep],
+            [stop for stop, keep in zip(self.stops, mask) if keep],
+            self.scale)
+
+    def _aligned(self, other):
+        if not isinstance(other, PriceRangeArray):
+            raise TypeError(
+                f'PriceRangeArray required, not {type(other)}')
+        if other.currency != self.currency:
+            raise CurrencyMismatch(
+                self.currency, other.currency, 'PriceRangeArray')
+        if len(other) != len(self):
+            raise ValueError(
+                'Got {} ranges for {} ranges'.format(len(other), len(self)))
+        scale = max(self.scale, other.scale)
+        return self._rescaled(scale) + other._rescaled(scale)
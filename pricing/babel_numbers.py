@@ -9,14 +9,20 @@ Custom patches babel.numbers with improved `format_currency` function.
 """
 
 import decimal
+import functools
+import re
+from types import MappingProxyType
 
+import attr
 import babel.numbers
-from babel.core import Locale
+from babel.core import Locale, get_global
+from babel.plural import PluralRule
 from babel.numbers import NumberPattern as _NumberPattern
 from babel.numbers import LC_NUMERIC, number_re, UnknownCurrencyFormatError
 
 
-__all__ = ['format_currency']
+__all__ = ['FixedFormat', 'LocalePack', 'compile_formatter',
+           'format_currency', 'get_locale_pack', 'install_data_pack']
 
 
 def format_currency(number, currency, format=None,
@@ -87,31 +93,426 @@ def format_currency(number, currency, format=None,
     :param number: the number to format
     :param currency: the currency code
     :param format: the format string to use
-    :param locale: the `Locale` object or locale identifier
+    :param locale: the `Locale` object, `LocalePack` or locale identifier
     :param currency_digits: use the currency's natural number of decimal digits
     :param format_type: the currency format type to use
     :param decimal_quantization: Truncate and round high-precision numbers to
                                  the format pattern. Defaults to `True`.
     """
 
-    locale = Locale.parse(locale)
-    if format:
-        pattern = parse_pattern(format)
-    else:
-        try:
-            p = locale.currency_formats[format_type]
-            pattern = NumberPattern(
-                p.pattern, p.prefix, p.suffix, p.grouping, p.int_prec,
-                p.frac_prec, p.exp_prec, p.exp_plus)
-
-        except KeyError:
-            raise UnknownCurrencyFormatError(
-                "%r is not a known currency format type" % format_type)
+    pack = get_locale_pack(locale)
+    pattern = _get_pattern(pack, format, format_type)
     return pattern.apply(
-        number, locale, currency=currency, currency_digits=currency_digits,
+        number, pack, currency=currency, currency_digits=currency_digits,
         decimal_quantization=decimal_quantization)
 
 
+def _get_pattern(pack, format, format_type):
+    if format:
+        return parse_pattern(format)
+    try:
+        return pack.currency_formats[format_type]
+    except KeyError:
+        raise UnknownCurrencyFormatError(
+            "%r is not a known currency format type" % format_type)
+
+
+def compile_formatter(currency, format=None, locale=LC_NUMERIC,
+                      currency_digits=True, format_type='standard',
+                      decimal_quantization=True):
+    """Return a function formatting numbers like `format_currency`.
+
+    Plain fixed precision patterns are compiled into a specialized function
+    with the prefix, suffix, grouping and fraction digits hard-coded, other
+    patterns fall back to `NumberPattern.apply`.  Formatters are cached, so
+    compiling the same arguments again is cheap.
+
+    >>> formatter = compile_formatter('USD', locale='en_US')
+    >>> formatter(1099.98)
+    u'$1,099.98'
+
+    See `format_currency` for the parameters.
+    """
+    return _compile_formatter(
+        currency, format, get_locale_pack(locale), currency_digits,
+        format_type, decimal_quantization)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_formatter(currency, format, pack, currency_digits, format_type,
+                       decimal_quantization):
+    pattern = _get_pattern(pack, format, format_type)
+    fallback = functools.partial(
+        pattern.apply, locale=pack, currency=currency,
+        currency_digits=currency_digits,
+        decimal_quantization=decimal_quantization)
+
+    if currency and currency_digits:
+        precision = pack.currency_precision(currency)
+    elif pattern.frac_prec[0] == pattern.frac_prec[1]:
+        precision = pattern.frac_prec[0]
+    else:
+        precision = None
+    # The full currency name depends on the plural form of the value.
+    if (not pattern.fixed_point or not decimal_quantization or
+            precision is None or u'¤¤¤' in pattern.pattern):
+        return fallback
+
+    fixed = FixedFormat(
+        prefix=tuple(NumberPattern._sub_currency(affix, None, pack, currency)
+                     for affix in pattern.prefix),
+        suffix=tuple(NumberPattern._sub_currency(affix, None, pack, currency)
+                     for affix in pattern.suffix),
+        precision=precision, grouping=tuple(pattern.grouping),
+        group=pack.group, decimal=pack.decimal, scale=pattern.scale)
+    source = fixed.source()
+    namespace = {
+        'Decimal': decimal.Decimal,
+        'fallback': fallback,
+        'fixed_units': fixed_units,
+        'fixed_number': fixed_number,
+        'quantum': fixed.quantum}
+    exec(compile(source, '<pricing formatter>', 'exec'), namespace)
+    formatter = namespace['format_currency']
+    formatter.source = source
+    formatter.fixed = fixed
+    return formatter
+
+
+@attr.s(frozen=True, slots=True)
+class FixedFormat(object):
+    """A fixed precision pattern resolved for one locale and currency.
+
+    Prefixes and suffixes are (positive, negative) pairs with the currency
+    placeholders already substituted.
+    """
+
+    prefix = attr.ib()
+    suffix = attr.ib()
+    precision = attr.ib()
+    grouping = attr.ib()
+    group = attr.ib()
+    decimal = attr.ib()
+    scale = attr.ib(default=0)
+    quantum = attr.ib(init=False, cmp=False, repr=False)
+    #: %-format rendering the decimal symbol and the fraction digits.
+    fraction_format = attr.ib(init=False, cmp=False, repr=False)
+
+    @quantum.default
+    def _quantum(self):
+        return get_decimal_quantum(self.precision)
+
+    @fraction_format.default
+    def _fraction_format(self):
+        return self.decimal.replace('%', '%%') + '%%0%dd' % self.precision
+
+    def write(self, write, value):
+        """Render a finite Decimal, passing each piece to write."""
+        if self.scale:
+            value = value.scaleb(self.scale)
+        sign = int(value.is_signed())
+        units = fixed_units(value, self.quantum, self.precision)
+        write(self.prefix[sign])
+        if self.precision:
+            integer, fraction = divmod(units, 10 ** self.precision)
+            write(self.group_integer(integer))
+            write(self.fraction_format % fraction)
+        else:
+            write(self.group_integer(units))
+        write(self.suffix[sign])
+
+    def group_integer(self, integer):
+        """Return the digits of a non-negative int with group symbols."""
+        return group_integer(integer, self.grouping, self.group)
+
+    def source(self):
+        """Return the source of a specialized `format_currency` function,
+        rendering the value with `fixed_units` and `fixed_number`."""
+        lines = [
+            'def format_currency(value):',
+            '    if not isinstance(value, Decimal):',
+            '        value = Decimal(str(value))',
+            '    if not value.is_finite():',
+            '        return fallback(value)']
+        if self.scale:
+            lines.append('    value = value.scaleb(%d)' % self.scale)
+        lines.extend([
+            '    if value.is_signed():',
+            '        prefix, suffix = %r, %r' % (
+                self.prefix[1], self.suffix[1]),
+            '    else:',
+            '        prefix, suffix = %r, %r' % (
+                self.prefix[0], self.suffix[0]),
+            '    units = fixed_units(value, quantum, %d)' % self.precision,
+            '    return prefix + fixed_number(units, %d, %r, %r, %r) + suffix'
+            % (self.precision, self.grouping, self.group, self.decimal)])
+        return '\n'.join(lines) + '\n'
+
+
+def fixed_units(value, quantum, precision):
+    """Return the absolute value of a finite Decimal, rounded to quantum,
+    as an int of 10 ** -precision units."""
+    return int(abs(value).normalize().quantize(quantum).scaleb(precision))
+
+
+def fixed_number(units, precision, grouping, group, decimal):
+    """Return a non-negative int of 10 ** -precision units as grouped
+    digits, with precision fraction digits."""
+    if not precision:
+        return group_integer(units, grouping, group)
+    integer, fraction = divmod(units, 10 ** precision)
+    return '%s%s%0*d' % (
+        group_integer(integer, grouping, group), decimal, precision,
+        fraction)
+
+
+def group_integer(integer, grouping, group):
+    """Return the digits of a non-negative int with group symbols.
+
+    grouping holds the sizes of the first and the next groups.
+    """
+    size, next_size = grouping
+    if size >= 1000:
+        return str(integer)
+    if size == next_size == 3:
+        number = format(integer, ',')
+        return number if group == ',' else number.replace(',', group)
+    digits = str(integer)
+    if len(digits) <= size:
+        return digits
+    groups = [digits[-size:]]
+    digits = digits[:-size]
+    while len(digits) > next_size:
+        groups.append(digits[-next_size:])
+        digits = digits[:-next_size]
+    groups.append(digits)
+    groups.reverse()
+    return group.join(groups)
+
+
+_currency_precisions = None
+_data_pack = None
+
+
+def get_currency_precisions():
+    """Return the CLDR currency precisions and the default precision."""
+    global _currency_precisions
+    if _currency_precisions is None:
+        if _data_pack is not None:
+            precisions = dict(_data_pack['currency_fractions'])
+        else:
+            precisions = {
+                code: digits[0] for code, digits in
+                get_global('currency_fractions').items()}
+        _currency_precisions = (
+            MappingProxyType(precisions), precisions['DEFAULT'])
+    return _currency_precisions
+
+
+def install_data_pack(data):
+    """Use a trimmed CLDR data pack for formatting.
+
+    Locales and currencies missing from the pack are still resolved from
+    babel.  Pass None to go back to babel only.  See `pricing.datapack`.
+    """
+    global _data_pack, _currency_precisions
+    if data is not None and data.get('version') != DATA_PACK_VERSION:
+        raise ValueError(
+            'unsupported data pack version: {}'.format(data.get('version')))
+    _data_pack = data
+    _currency_precisions = None
+    _locale_packs.clear()
+    _babel_pack.cache_clear()
+    _compile_formatter.cache_clear()
+
+
+DATA_PACK_VERSION = 1
+
+
+@attr.s(frozen=True, slots=True)
+class LocalePack(object):
+    """Number formatting data of a locale, resolved once from babel.
+
+    Packs are immutable and shared between threads, use `get_locale_pack`
+    to obtain the cached pack of a locale.
+    """
+
+    locale = attr.ib(cmp=False, repr=False)
+    identifier = attr.ib()
+    decimal = attr.ib(repr=False)
+    group = attr.ib(repr=False)
+    minus = attr.ib(repr=False)
+    plus = attr.ib(repr=False)
+    exponential = attr.ib(repr=False)
+    currency_symbols = attr.ib(cmp=False, repr=False)
+    currency_names = attr.ib(cmp=False, repr=False)
+    currency_names_plural = attr.ib(cmp=False, repr=False)
+    currency_precisions = attr.ib(cmp=False, repr=False)
+    default_precision = attr.ib(repr=False)
+    currency_formats = attr.ib(cmp=False, repr=False)
+    plural_form = attr.ib(cmp=False, repr=False)
+    #: Currency codes covered by a trimmed pack, None when complete.
+    currencies = attr.ib(default=None, cmp=False, repr=False)
+
+    @classmethod
+    def from_locale(cls, locale):
+        locale = Locale.parse(locale)
+        precisions, default_precision = get_currency_precisions()
+        return cls(
+            locale=locale,
+            identifier=str(locale),
+            decimal=babel.numbers.get_decimal_symbol(locale),
+            group=babel.numbers.get_group_symbol(locale),
+            minus=babel.numbers.get_minus_sign_symbol(locale),
+            plus=babel.numbers.get_plus_sign_symbol(locale),
+            exponential=babel.numbers.get_exponential_symbol(locale),
+            currency_symbols=MappingProxyType(dict(locale.currency_symbols)),
+            currency_names=MappingProxyType(dict(locale.currencies)),
+            currency_names_plural=MappingProxyType({
+                code: MappingProxyType(dict(names)) for code, names in
+                _currency_names_plural(locale).items()}),
+            currency_precisions=precisions,
+            default_precision=default_precision,
+            currency_formats=MappingProxyType({
+                name: parse_pattern(p.pattern)
+                for name, p in locale.currency_formats.items()}),
+            plural_form=locale.plural_form)
+
+    @classmethod
+    def from_data(cls, identifier, data, currencies=None):
+        """Build a pack from the data of one locale of a data pack."""
+        precisions, default_precision = get_currency_precisions()
+        return cls(
+            locale=Locale.parse(identifier),
+            identifier=identifier,
+            decimal=data['decimal'],
+            group=data['group'],
+            minus=data['minus'],
+            plus=data['plus'],
+            exponential=data['exponential'],
+            currency_symbols=MappingProxyType(data['currency_symbols']),
+            currency_names=MappingProxyType(data['currency_names']),
+            currency_names_plural=MappingProxyType({
+                code: MappingProxyType(names) for code, names in
+                data['currency_names_plural'].items()}),
+            currency_precisions=precisions,
+            default_precision=default_precision,
+            currency_formats=MappingProxyType({
+                name: parse_pattern(pattern)
+                for name, pattern in data['currency_formats'].items()}),
+            plural_form=PluralRule(data['plural_rules']),
+            currencies=None if currencies is None else frozenset(currencies))
+
+    def to_data(self, currencies=None):
+        """Return the data of this pack for a data pack, as plain dicts."""
+        def trim(mapping):
+            return {code: value for code, value in mapping.items()
+                    if currencies is None or code in currencies}
+        return {
+            'decimal': self.decimal,
+            'group': self.group,
+            'minus': self.minus,
+            'plus': self.plus,
+            'exponential': self.exponential,
+            'currency_symbols': trim(self.currency_symbols),
+            'currency_names': trim(self.currency_names),
+            'currency_names_plural': {
+                code: dict(names) for code, names in
+                trim(self.currency_names_plural).items()},
+            'currency_formats': {
+                name: pattern.pattern
+                for name, pattern in self.currency_formats.items()},
+            'plural_rules': dict(self.plural_form.rules)}
+
+    def covers(self, currency):
+        """Return whether the pack holds the data of a currency."""
+        return self.currencies is None or currency in self.currencies
+
+    def babel_pack(self):
+        """Return the complete pack of this locale, built from babel."""
+        return _babel_pack(self.identifier)
+
+    def currency_symbol(self, currency):
+        """Same as `babel.numbers.get_currency_symbol`."""
+        if not self.covers(currency):
+            return self.babel_pack().currency_symbol(currency)
+        return self.currency_symbols.get(currency, currency)
+
+    def currency_name(self, currency, count=None):
+        """Same as `babel.numbers.get_currency_name`."""
+        if not self.covers(currency):
+            return self.babel_pack().currency_name(currency, count)
+        if count is not None:
+            names = self.currency_names_plural.get(currency)
+            if names:
+                try:
+                    plural_form = self.plural_form(count)
+                except (OverflowError, ValueError):
+                    plural_form = 'other'
+                if plural_form in names:
+                    return names[plural_form]
+                if 'other' in names:
+                    return names['other']
+        return self.currency_names.get(currency, currency)
+
+    def currency_precision(self, currency):
+        """Same as `babel.numbers.get_currency_precision`."""
+        return self.currency_precisions.get(currency, self.default_precision)
+
+
+_locale_packs = {}
+
+
+def get_locale_pack(locale=LC_NUMERIC):
+    """Return the shared `LocalePack` of a locale or locale identifier."""
+    if isinstance(locale, LocalePack):
+        return locale
+    key = locale if isinstance(locale, str) else str(locale)
+    try:
+        return _locale_packs[key]
+    except KeyError:
+        pass
+    if _data_pack is not None and key in _data_pack['locales']:
+        pack = LocalePack.from_data(
+            key, _data_pack['locales'][key], _data_pack['currencies'])
+    else:
+        pack = _babel_pack(key if isinstance(locale, str) else locale)
+    return _locale_packs.setdefault(key, pack)
+
+
+# Counts of every plural form of CLDR locales.
+_PLURAL_SAMPLES = (0, 1, 2, 3, 5, 6, 11, 21, 22, 100, 101, 102, 1000000,
+                   decimal.Decimal('0.5'), decimal.Decimal('1.5'))
+
+
+def _currency_names_plural(locale):
+    """Return a babel Locale's currency names of each plural form.
+
+    Babel only exposes them one by one, through `get_currency_name`, the
+    table is read from the locale data when it's still where expected.
+    """
+    try:
+        return locale._data['currency_names_plural']
+    except (AttributeError, KeyError, TypeError):
+        return _public_currency_names_plural(locale)
+
+
+def _public_currency_names_plural(locale):
+    counts = {}
+    for count in _PLURAL_SAMPLES:
+        counts.setdefault(locale.plural_form(count), count)
+    identifier = str(locale)
+    return {code: {form: babel.numbers.get_currency_name(
+                       code, count, identifier)
+                   for form, count in counts.items()}
+            for code in locale.currencies}
+
+
+@functools.lru_cache(maxsize=None)
+def _babel_pack(locale):
+    return LocalePack.from_locale(locale)
+
+
 def parse_pattern(pattern):
     """Parse number format patterns"""
     if isinstance(pattern, NumberPattern):
@@ -182,16 +583,60 @@ def parse_pattern(pattern):
 class NumberPattern(_NumberPattern):
     """Overriding babel.numbers.NumberPattern.apply to newer version."""
 
+    def __init__(self, *args, **kwargs):
+        super(NumberPattern, self).__init__(*args, **kwargs)
+        # Plain patterns without exponent, significant digits or zero padded
+        # integer part can be rendered from an integer amount of minor units.
+        self.fixed_point = (
+            not self.exp_prec and '@' not in self.pattern and
+            self.int_prec[0] <= 1)
+
     def apply(
             self, value, locale, currency=None, currency_digits=True,
             decimal_quantization=True):
         """Renders into a string a number following the defined pattern.
         Forced decimal quantization is active by default so we'll produce a
         number string that is strictly following CLDR pattern definitions.
+
+        The locale may be given as a `LocalePack`, an identifier or a
+        `Locale`, the latter are resolved through `get_locale_pack`.
         """
+        pack = get_locale_pack(locale)
         if not isinstance(value, decimal.Decimal):
             value = decimal.Decimal(str(value))
 
+        if self.fixed_point and decimal_quantization and value.is_finite():
+            if currency and currency_digits:
+                precision = pack.currency_precision(currency)
+            elif self.frac_prec[0] == self.frac_prec[1]:
+                precision = self.frac_prec[0]
+            else:
+                precision = None
+            if precision is not None:
+                return self._apply_fixed(value, pack, currency, precision)
+
+        return self._apply_generic(
+            value, pack, currency, currency_digits, decimal_quantization)
+
+    def _apply_fixed(self, value, pack, currency, precision):
+        """Renders a fixed precision pattern using integer arithmetic."""
+        if self.scale:
+            value = value.scaleb(self.scale)
+
+        is_negative = int(value.is_signed())
+        number = fixed_number(
+            fixed_units(value, get_decimal_quantum(precision), precision),
+            precision, self.grouping, pack.group, pack.decimal)
+
+        return self._sub_currency(''.join([
+            self.prefix[is_negative],
+            number,
+            self.suffix[is_negative]]), abs(value).normalize(), pack,
+            currency)
+
+    def _apply_generic(
+            self, value, pack, currency, currency_digits,
+            decimal_quantization):
         value = value.scaleb(self.scale)
 
         # Separate the absolute value from its sign.
@@ -201,13 +646,13 @@ class NumberPattern(_NumberPattern):
         # Prepare scientific notation metadata.
         if self.exp_prec:
             value, exp, exp_sign = self.scientific_notation_elements(
-                value, locale)
+                value, pack)
 
         # Adjust the precision of the fractionnal part and force it to the
         # currency's if neccessary.
         frac_prec = self.frac_prec
         if currency and currency_digits:
-            frac_prec = (babel.numbers.get_currency_precision(currency), ) * 2
+            frac_prec = (pack.currency_precision(currency), ) * 2
 
         # Bump decimal precision to the natural precision of the number if it
         # exceeds the one we're about to use. This adaptative precision is only
@@ -223,11 +668,11 @@ class NumberPattern(_NumberPattern):
         # Render scientific notation.
         if self.exp_prec:
             number = ''.join([
-                self._quantize_value(value, locale, frac_prec),
-                babel.numbers.get_exponential_symbol(locale),
+                self._quantize_value(value, pack, frac_prec),
+                pack.exponential,
                 exp_sign,
                 self._format_int(
-                    str(exp), self.exp_prec[0], self.exp_prec[1], locale)])
+                    str(exp), self.exp_prec[0], self.exp_prec[1], pack)])
 
         # Is it a siginificant digits pattern?
         elif '@' in self.pattern:
@@ -235,39 +680,69 @@ class NumberPattern(_NumberPattern):
                                             self.int_prec[0],
                                             self.int_prec[1])
             a, sep, b = text.partition(".")
-            number = self._format_int(a, 0, 1000, locale)
+            number = self._format_int(a, 0, 1000, pack)
             if sep:
-                number += babel.numbers.get_decimal_symbol(locale) + b
+                number += pack.decimal + b
 
         # A normal number pattern.
         else:
-            number = self._quantize_value(value, locale, frac_prec)
+            number = self._quantize_value(value, pack, frac_prec)
 
-        retval = ''.join([
+        return self._sub_currency(''.join([
             self.prefix[is_negative],
             number,
-            self.suffix[is_negative]])
+            self.suffix[is_negative]]), value, pack, currency)
 
+    @staticmethod
+    def _sub_currency(retval, value, pack, currency):
         if u'¤' in retval:
-            retval = retval.replace(u'¤¤¤',
-                                    babel.numbers.get_currency_name(
-                                        currency, value, locale))
-            retval = retval.replace(u'¤¤', currency.upper())
-            retval = retval.replace(u'¤', babel.numbers.get_currency_symbol(
-                currency, locale))
+            if u'¤¤¤' in retval:
+                retval = retval.replace(
+                    u'¤¤¤', pack.currency_name(currency, value))
+            if u'¤¤' in retval:
+                retval = retval.replace(u'¤¤', currency.upper())
+            if u'¤' in retval:
+                retval = retval.replace(u'¤', pack.currency_symbol(currency))
+
+        # remove single quotes around text, except for doubled single quotes
+        # which are replaced with a single quote
+        if u"'" in retval:
+            retval = re.sub(r"'([^']*)'", lambda m: m.group(1) or "'", retval)
 
         return retval
 
-    def _quantize_value(self, value, locale, frac_prec):
+    def _quantize_value(self, value, pack, frac_prec):
         quantum = get_decimal_quantum(frac_prec[1])
         rounded = value.quantize(quantum)
         a, sep, b = str(rounded).partition(".")
         number = (self._format_int(a, self.int_prec[0],
-                                   self.int_prec[1], locale) +
-                  self._format_frac(b or '0', locale, frac_prec))
+                                   self.int_prec[1], pack) +
+                  self._format_frac(b or '0', pack, frac_prec))
         return number
 
-    def scientific_notation_elements(self, value, locale):
+    def _format_int(self, value, min, max, pack):
+        width = len(value)
+        if width < min:
+            value = '0' * (min - width) + value
+        gsize = self.grouping[0]
+        ret = ''
+        while len(value) > gsize:
+            ret = pack.group + value[-gsize:] + ret
+            value = value[:-gsize]
+            gsize = self.grouping[1]
+        return value + ret
+
+    def _format_frac(self, value, pack, force_frac=None):
+        min, max = force_frac or self.frac_prec
+        if len(value) < min:
+            value += ('0' * (min - len(value)))
+        if max == 0 or (min == 0 and int(value) == 0):
+            return ''
+        while len(value) > min and value[-1] == '0':
+            value = value[:-1]
+        return pack.decimal + value
+
+    def scientific_notation_elements(self, value, pack):
         """ Returns normalized scientific notation components of a value."""
         # Normalize value to only have one lead digit.
         exp = value.adjusted()
@@ -284,9 +759,9 @@ class NumberPattern(_NumberPattern):
         # Get exponent sign symbol.
         exp_sign = ''
         if exp < 0:
-            exp_sign = babel.numbers.get_minus_sign_symbol(locale)
+            exp_sign = pack.minus
         elif self.exp_plus:
-            exp_sign = babel.numbers.get_plus_sign_symbol(locale)
+            exp_sign = pack.plus
 
         # Normalize exponent value now that we have the sign.
         exp = abs(exp)
@@ -0,0 +1,341 @@
+"""
+pricing.buckets
+~~~~~~~~~~~~~~~
+
+Price bucketing and histograms, ex: for faceted search.
+
+A `Bucketizer` assigns prices to buckets with a binary search over the
+bucket starts, or with NumPy's ``searchsorted`` for columns of amounts, and
+computes the count, total, minimum and maximum of each bucket in one pass.
+Prices in other currencies are converted with a single rate snapshot.
+
+Usage::
+
+    >>> buckets = Bucketizer(['0', '10', '25', '100', 'Infinity'], 'USD')
+    >>> [bucket.count for bucket in buckets.histogram(prices)]
+    [12, 30, 7, 1]
+    >>> buckets.histogram(prices, exchange=get_exchange())
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from bisect import bisect_right
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+
+import attr
+
+from .exceptions import CurrencyMismatch, ExchangeRateNotFound
+from .price import Price, amount_converter
+from .range import PriceRange
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+__all__ = ['Bucket', 'Bucketizer']
+
+
+# Bounds of int64 columns, stand in for infinite bucket ends.
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Largest magnitude of int64 columns, sums of smaller magnitudes don't
+# overflow.
+INT64_SAFE = 2 ** 62
+
+
+@attr.s(frozen=True, slots=True)
+class Bucket:
+    """Statistics of the prices assigned to a bucket.
+
+    :param range PriceRange: Bounds of the bucket, its stop is excluded for
+        buckets made from boundaries.
+    :param count int: Number of prices.
+    :param total Price: Sum of the prices.
+    :param minimum Price: Smallest price, None for an empty bucket.
+    :param maximum Price: Largest price, None for an empty bucket.
+    """
+
+    range = attr.ib()
+    count = attr.ib(default=0)
+    total = attr.ib(default=None)
+    minimum = attr.ib(default=None)
+    maximum = attr.ib(default=None)
+
+
+class Bucketizer:
+    """Assigns prices of one currency to sorted, disjoint buckets.
+
+    Built from boundaries, consecutive boundaries delimit buckets including
+    their start but not their stop, use an infinite last boundary for an
+    open ended bucket.  Built from ranges with `from_ranges`, buckets
+    include both ends and may leave gaps.  Prices outside every bucket are
+    ignored.
+
+    :param boundaries: Sorted amounts or `Price` objects.
+    :param currency str: Currency of the buckets, taken from the boundaries
+        when they are prices.
+    """
+
+    __slots__ = ('currency', 'starts', 'stops', 'closed')
+
+    def __init__(self, boundaries, currency=None):
+        boundaries = list(boundaries)
+        amounts = []
+        for boundary in boundaries:
+            if isinstance(boundary, Price):
+                if currency is None:
+                    currency = boundary.currency
+                elif boundary.currency != currency:
+                    raise CurrencyMismatch(
+                        currency, boundary.currency, 'Bucketizer')
+                boundary = boundary.amount
+            amounts.append(amount_converter(boundary))
+        if currency is None:
+            raise ValueError('currency is required for amount boundaries')
+        if len(amounts) < 2:
+            raise ValueError('At least two boundaries are required')
+        self._init(currency, amounts[:-1], amounts[1:], False)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Return a bucketizer of non overlapping `PriceRange` objects,
+        sorted by start."""
+        ranges = list(ranges)
+        if not ranges:
+            raise ValueError('At least one range is required')
+        currency = ranges[0].currency
+        for price_range in ranges:
+            if price_range.currency != currency:
+                raise CurrencyMismatch(
+                    currency, price_range.currency, 'Bucketizer')
+        bucketizer = cls.__new__(cls)
+        bucketizer._init(
+            currency, [price_range.start.amount for price_range in ranges],
+            [price_range.stop.amount for price_range in ranges], True)
+        return bucketizer
+
+    def _init(self, currency, starts, stops, closed):
+        for start, stop, next_start in zip(starts, stops, starts[1:]):
+            if not start <= stop <= next_start or (
+                    closed and stop == next_start):
+                raise ValueError('Buckets must be sorted and disjoint')
+        if not starts[-1] <= stops[-1]:
+            raise ValueError('Buckets must be sorted and disjoint')
+        self.currency = currency
+        self.starts = starts
+        self.stops = stops
+        self.closed = closed
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def ranges(self):
+        """Return the bounds of the buckets as `PriceRange` objects."""
+        currency = self.currency
+        return [PriceRange(Price(start, currency), Price(stop, currency))
+                for start, stop in zip(self.starts, self.stops)]
+
+    def _index(self, amount):
+        index = bisect_right(self.starts, amount) - 1
+        if index >= 0 and (amount < self.stops[index] or (
+                self.closed and amount == self.stops[index])):
+            return index
+        return None
+
+    def _amounts(self, prices, exchange):
+        """Yield the amounts of prices in the buckets' currency."""
+        currency = self.currency
+        quotes = None
+        rates = {}
+        for price in prices:
+            if price.currency == currency:
+                yield price.amount
+                continue
+            if exchange is None:
+                raise CurrencyMismatch(
+                    currency, price.currency, 'Bucketizer')
+            if quotes is None:
+                # One snapshot for the whole call.
+                snapshot = getattr(exchange, 'snapshot', None)
+                quotes = (snapshot() if snapshot is not None else None) or (
+                    exchange)
+            try:
+                rate = rates[price.currency]
+            except KeyError:
+                rate = rates[price.currency] = quotes.quotation(
+                    price.currency, currency)
+            if rate is None:
+                raise ExchangeRateNotFound(
+                    getattr(exchange, 'backend_name', None), price.currency,
+                    currency)
+            yield price.amount * rate
+
+    def bucket(self, price, exchange=None):
+        """Return the index of the bucket of price, or None."""
+        return self._index(next(self._amounts([price], exchange)))
+
+    def assign(self, prices, exchange=None):
+        """Return the bucket index of each of prices, None when outside.
+
+        :param exchange: An exchange or `RateSnapshot` converting prices
+            in other currencies, a snapshot is taken once per call.
+        """
+        index = self._index
+        return [index(amount) for amount in self._amounts(prices, exchange)]
+
+    def histogram(self, prices, exchange=None):
+        """Return a `Bucket` of statistics per bucket for prices.
+
+        See `assign` for exchange.
+        """
+        count = [0] * len(self)
+        total = [Decimal(0)] * len(self)
+        minimum = [None] * len(self)
+        maximum = [None] * len(self)
+        index = self._index
+        for amount in self._amounts(prices, exchange):
+            i = index(amount)
+            if i is None:
+                continue
+            count[i] += 1
+            total[i] += amount
+            if minimum[i] is None or amount < minimum[i]:
+                minimum[i] = amount
+            if maximum[i] is None or amount > maximum[i]:
+                maximum[i] = amount
+        return self._buckets(count, total, minimum, maximum)
+
+    def _buckets(self, count, total, minimum, maximum):
+        currency = self.currency
+
+        def price(amount):
+            return None if amount is None else Price(amount, currency)
+
+        return [Bucket(bounds, count[i], Price(total[i], currency),
+                       price(minimum[i]), price(maximum[i]))
+                for i, bounds in enumerate(self.ranges)]
+
+    def _column_bounds(self, minor_digits, dtype):
+        """Return starts and exclusive stops comparable with a column."""
+        if minor_digits is None:
+            starts = numpy.array([float(start) for start in self.starts])
+            stops = numpy.array([float(stop) for stop in self.stops])
+            if self.closed:
+                stops = numpy.nextafter(stops, numpy.inf)
+            return starts, stops.astype(dtype if dtype.kind == 'f' else float)
+
+        # Object columns of Python ints are compared with unbounded ints.
+        if dtype == object:
+            low, high, dtype = float('-inf'), float('inf'), object
+        else:
+            low, high, dtype = INT64_MIN, INT64_MAX, numpy.int64
+
+        def scaled(amount, rounding):
+            if amount.is_infinite():
+                return low if amount < 0 else high
+            units = int(amount.scaleb(minor_digits).to_integral_value(
+                rounding))
+            return min(max(units, low), high)
+
+        # Integer x >= start is x >= ceil(start), x < stop is x < ceil(stop)
+        # and x <= stop is x < floor(stop) + 1.
+        starts = [scaled(start, ROUND_CEILING) for start in self.starts]
+        if self.closed:
+            stops = [min(scaled(stop, ROUND_FLOOR) + 1, high)
+                     if stop.is_finite() else high
+                     for stop in self.stops]
+        else:
+            stops = [scaled(stop, ROUND_CEILING) for stop in self.stops]
+        return (numpy.array(starts, dtype=dtype),
+                numpy.array(stops, dtype=dtype))
+
+    def _integer_column(self, values, count=1):
+        """Return an integer column as int64, or as Python ints when its
+        values, or sums of count of them, could overflow int64."""
+        if values.size and count * max(abs(int(values.min())),
+                                       abs(int(values.max()))) >= INT64_SAFE:
+            return values.astype(object)
+        return values.astype(numpy.int64, copy=False)
+
+    def _is_numpy_column(self, values, minor_digits):
+        return numpy is not None and isinstance(values, numpy.ndarray) and (
+            values.dtype.kind in 'iu' or (
+                values.dtype.kind == 'f' and minor_digits is None))
+
+    def _column_amounts(self, values, minor_digits):
+        if numpy is not None:
+            if isinstance(values, numpy.ndarray):
+                values = values.tolist()
+            # Object arrays and sequences may still hold NumPy scalars.
+            values = [value.item() if isinstance(value, numpy.generic)
+                      else value for value in values]
+        if minor_digits is None:
+            return [amount_converter(value) for value in values]
+        return [amount_converter(value).scaleb(-minor_digits)
+                for value in values]
+
+    def assign_column(self, values, minor_digits=None):
+        """Return the bucket index of each of a column of amounts.
+
+        :param values: A sequence or NumPy array of amounts.
+        :param minor_digits int: Number of decimal digits of a minor unit
+            when values are integer amounts of minor units.
+        :return: A NumPy array of indexes, -1 when outside, for NumPy
+            integer or float columns, a list like `assign` otherwise.
+        """
+        if not self._is_numpy_column(values, minor_digits):
+            index = self._index
+            return [index(amount)
+                    for amount in self._column_amounts(values, minor_digits)]
+        if values.dtype.kind in 'iu':
+            values = self._integer_column(values)
+        starts, stops = self._column_bounds(minor_digits, values.dtype)
+        indexes = numpy.searchsorted(starts, values, side='right') - 1
+        inside = (indexes >= 0) & (values < stops[numpy.maximum(indexes, 0)])
+        return numpy.where(inside, indexes, -1)
+
+    def histogram_column(self, values, minor_digits=None):
+        """Return a `Bucket` of statistics per bucket for a column of
+        amounts, see `assign_column`.
+
+        NumPy float columns are compared and summed as floats.
+        """
+        if not self._is_numpy_column(values, minor_digits):
+            return self.histogram(
+                Price(amount, self.currency)
+                for amount in self._column_amounts(values, minor_digits))
+        indexes = self.assign_column(values, minor_digits)
+        inside = indexes >= 0
+        indexes, values = indexes[inside], values[inside]
+        if values.dtype.kind in 'iu':
+            values = self._integer_column(values, len(values))
+        size = len(self)
+        count = numpy.bincount(indexes, minlength=size)
+        total = numpy.zeros(size, dtype=values.dtype)
+        numpy.add.at(total, indexes, values)
+        if values.dtype.kind == 'i':
+            low, high = INT64_MAX, INT64_MIN
+        else:
+            low, high = numpy.inf, -numpy.inf
+        minimum = numpy.full(size, low, dtype=values.dtype)
+        maximum = numpy.full(size, high, dtype=values.dtype)
+        numpy.minimum.at(minimum, indexes, values)
+        numpy.maximum.at(maximum, indexes, values)
+
+        def amount(value):
+            if isinstance(value, numpy.generic):
+                value = value.item()
+            if isinstance(value, float):
+                return Decimal(repr(value))
+            value = Decimal(value)
+            return value.scaleb(-minor_digits) if minor_digits else value
+
+        return self._buckets(
+            count.tolist(), [amount(value) for value in total],
+            [amount(value) if n else None
+             for value, n in zip(minimum, count)],
+            [amount(value) if n else None
+             for value, n in zip(maximum, count)])
@@ -0,0 +1,163 @@
+"""
+pricing.bulk
+~~~~~~~~~~~~
+
+Formatting of whole price columns.
+
+Columns of integers, including NumPy integer arrays, are formatted with
+integer arithmetic in bulk, other amounts go through the compiled formatter
+of the column.  Every string equals `Price(amount, currency).format(...)`.
+
+Usage::
+
+    >>> format_column([999, -1999, 0], 'USD', 'en_US', minor_digits=2)
+    ['$9.99', '-$19.99', '$0.00']
+    >>> with open('statement.txt', 'w') as fd:
+    ...     format_into(fd, prices, 'en_US')
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from . import babel_numbers
+from .price import LC_NUMERIC, amount_converter, format_options
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+__all__ = ['format_column', 'format_into', 'write_column']
+
+
+# Largest magnitude int64 columns are scaled with NumPy without overflowing.
+INT64_SAFE = 2 ** 62
+
+
+def format_column(values, currency, locale=LC_NUMERIC, minor_digits=None,
+                  pattern=None, format_type='standard', **kwargs):
+    """Return a list of formatted strings for a column of amounts.
+
+    :param values: A sequence or NumPy array of amounts.
+    :param currency str: A ISO4217 currency code.
+    :param locale: A locale identifier, `Locale` or `LocalePack`.
+    :param minor_digits int: Number of decimal digits of a minor unit when
+        values are integer amounts of minor units, ex: 2 for cents.
+    :param pattern str: Custom pattern, same as `Price.format`.
+    :param format_type str: The currency format type, same as `Price.format`.
+    """
+    formatter = babel_numbers.compile_formatter(
+        currency, locale=locale, format_type=format_type,
+        **format_options(currency, pattern, **kwargs))
+    fixed = getattr(formatter, 'fixed', None)
+    if numpy is None or not isinstance(values, numpy.ndarray):
+        values = list(values)
+    digits = minor_digits or 0
+
+    if (fixed is None or fixed.scale or digits > fixed.precision or
+            not _is_integer_column(values)):
+        values = _python_numbers(values)
+        if minor_digits is None:
+            amounts = [amount_converter(value) for value in values]
+        else:
+            amounts = [amount_converter(value).scaleb(-minor_digits)
+                       for value in values]
+        return [formatter(amount) for amount in amounts]
+
+    negative, integers, fractions = _split(
+        values, 10 ** (fixed.precision - digits), 10 ** fixed.precision)
+    prefix, suffix, group = fixed.prefix, fixed.suffix, fixed.group_integer
+    if not fixed.precision:
+        return [prefix[sign] + group(integer) + suffix[sign]
+                for sign, integer in zip(negative, integers)]
+    fraction_format = fixed.fraction_format
+    return [
+        prefix[sign] + group(integer) + fraction_format % fraction +
+        suffix[sign]
+        for sign, integer, fraction in zip(negative, integers, fractions)]
+
+
+def write_column(writer, values, currency, locale=LC_NUMERIC, **kwargs):
+    """Write formatted amounts as rows of one field, ex: to a `csv.writer`.
+
+    Takes the same arguments as `format_column`.
+    """
+    writer.writerows(
+        [text] for text in format_column(values, currency, locale, **kwargs))
+
+
+def format_into(writer, prices, locale=LC_NUMERIC, pattern=None,
+                format_type='standard', end='\n', **kwargs):
+    """Write formatted prices into a text stream or list buffer.
+
+    The prefix, digits and suffix of each price are written as separate
+    pieces, without building the formatted string, and the currency
+    placeholders of each currency's pattern are resolved once per call.
+    Output equals `Price.format` with the same options.
+
+    :param writer: A `io.TextIOBase` or a list the pieces are appended to.
+    :param prices: An iterable of `Price` objects.
+    :param end str: Written after every price.
+    :return: Number of prices written.
+    """
+    write = writer.append if isinstance(writer, list) else writer.write
+    formatters = {}
+    count = 0
+    for count, price in enumerate(prices, 1):
+        currency = price.currency
+        try:
+            formatter, fixed = formatters[currency]
+        except KeyError:
+            formatter = babel_numbers.compile_formatter(
+                currency, locale=locale, format_type=format_type,
+                **format_options(currency, pattern, **kwargs))
+            fixed = getattr(formatter, 'fixed', None)
+            formatters[currency] = formatter, fixed
+        amount = price.amount
+        if fixed is not None and amount.is_finite():
+            fixed.write(write, amount)
+        else:
+            write(formatter(amount))
+        if end:
+            write(end)
+    return count
+
+
+def _python_numbers(values):
+    """Return values with NumPy scalars converted to Python numbers."""
+    if numpy is None:
+        return values
+    if isinstance(values, numpy.ndarray):
+        values = values.tolist()
+    return [value.item() if isinstance(value, numpy.generic) else value
+            for value in values]
+
+
+def _is_integer_column(values):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values.dtype.kind in 'iu'
+    return all(type(value) is int for value in values)
+
+
+def _split(values, factor, quantum):
+    """Return signs, integer parts and fractions of scaled minor units."""
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        if values.dtype.itemsize < 8:
+            values = values.astype(numpy.int64)
+        if not values.size or (int(values.max()) < INT64_SAFE // factor and
+                               int(values.min()) > -INT64_SAFE // factor):
+            negative = (values < 0).tolist()
+            integers, fractions = numpy.divmod(
+                numpy.abs(values) * factor, quantum)
+            return negative, integers.tolist(), fractions.tolist()
+        # Scaling would overflow, continue with Python ints.
+        values = values.tolist()
+
+    negative = [value < 0 for value in values]
+    integers, fractions = [], []
+    for value in values:
+        integer, fraction = divmod(abs(value) * factor, quantum)
+        integers.append(integer)
+        fractions.append(fraction)
+    return negative, integers, fractions
@@ -0,0 +1,114 @@
+"""
+pricing.cache
+~~~~~~~~~~~~~
+
+Bounded cache of formatted price strings.
+
+Caching is opt-in, register a `FormatCache` as the `IFormatCache` utility
+and `Price.format` will consult it::
+
+    >>> from zope.component import provideUtility
+    >>> provideUtility(FormatCache(maxsize=10000, ttl=300), IFormatCache)
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+import attr
+from attr.validators import instance_of, optional
+from zope.interface import implementer
+
+from .interfaces import IFormatCache
+
+
+__all__ = ['CacheStats', 'FormatCache']
+
+
+@attr.s(frozen=True, slots=True)
+class CacheStats:
+    """Point in time statistics of a `FormatCache`."""
+
+    hits: int = attr.ib()
+    misses: int = attr.ib()
+    evictions: int = attr.ib()
+    size: int = attr.ib()
+    maxsize: int = attr.ib()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@implementer(IFormatCache)
+@attr.s(cmp=False)
+class FormatCache:
+    """Thread safe LRU cache with an optional time to live.
+
+    Keys must identify everything the formatted string depends on.
+    `Price.format` keys amounts on their exact string form, so strings using
+    the ¤¤¤ currency name always carry the plural form of their own amount.
+
+    :param maxsize int: Maximum number of cached strings.
+    :param ttl float: Seconds an entry stays valid, None to never expire.
+    """
+
+    maxsize: int = attr.ib(default=4096, validator=instance_of(int))
+    ttl: float = attr.ib(
+        default=None, validator=optional(instance_of((int, float))))
+    _entries = attr.ib(init=False, repr=False, factory=OrderedDict)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+    _hits = attr.ib(init=False, repr=False, default=0)
+    _misses = attr.ib(init=False, repr=False, default=0)
+    _evictions = attr.ib(init=False, repr=False, default=0)
+
+    @maxsize.validator
+    def validate_maxsize(self, attribute, value):
+        if value < 1:
+            raise ValueError('maxsize must be positive: {}'.format(value))
+
+    def get(self, key):
+        """Return the cached string for key, or None on a miss."""
+        with self._lock:
+            try:
+                value, expires = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value):
+        """Cache value under key, evicting the least recently used entry."""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self):
+        """Return a `CacheStats` snapshot."""
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions,
+                len(self._entries), self.maxsize)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,413 @@
+"""
+pricing.codec
+~~~~~~~~~~~~~
+
+Compact binary encoding of prices, ex: to cache them or send them between
+processes without pickling class paths or parsing repr strings.
+
+Records are a type byte followed by fixed-layout price bodies::
+
+    flags     B    amount layout and sign
+    currency  H    three letter codes packed in base 26, 0xFFFF for tokens
+                   followed by B length and the ASCII code
+    amount         compact: b exponent, Q coefficient
+                   wide:    i exponent, H length, coefficient bytes
+                   special: B Infinity, NaN or sNaN
+
+A `Price` takes 13 bytes when its coefficient fits 64 bits.  `PriceRange`
+records hold two bodies.  Arrays of prices of one currency are stored as a
+header and an aligned column of little endian int64 units, which
+`PriceBuffer` reads without copying.
+
+Usage::
+
+    >>> data = dumps(Price('19.99', 'USD'))
+    >>> loads(data)
+    USD 19.99
+    >>> prices = PriceBuffer(dumps_array(prices))
+    >>> prices.units
+    <memory at 0x...>
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from array import array
+from decimal import Context, Decimal, MAX_EMAX, MAX_PREC, MIN_EMIN
+import struct
+import sys
+
+from .price import Price, XPrice
+from .range import PriceRange
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+__all__ = ['dumps', 'loads', 'unpack_from', 'iter_unpack', 'dumps_array',
+           'dumps_units', 'PriceBuffer']
+
+
+PRICE, XPRICE, RANGE = 1, 2, 3
+_TYPES = {Price: PRICE, XPrice: XPRICE}
+_CLASSES = {PRICE: Price, XPRICE: XPrice}
+
+COMPACT, WIDE, SPECIAL = 0, 1, 2
+NEGATIVE = 0x10
+_SPECIALS = {'F': 0, 'n': 1, 'N': 2}
+_SPECIAL_AMOUNTS = ['Infinity', 'NaN', 'sNaN']
+
+TOKEN = 0xFFFF
+UINT64 = 2 ** 64
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+_RECORD = struct.Struct('<BBHbQ')
+_HEADER = struct.Struct('<BH')
+_COMPACT = struct.Struct('<bQ')
+_WIDE = struct.Struct('<iH')
+_BYTE = struct.Struct('<B')
+
+MAGIC = b'PRA1'
+# Magic, currency id, scale, token code length and count.
+_ARRAY = struct.Struct('<4sHbBQ')
+
+# Scales coefficients exactly, whatever the current context.
+_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+_ids = {}
+_codes = {}
+
+
+def _currency_id(code):
+    try:
+        return _ids[code]
+    except KeyError:
+        pass
+    if len(code) == 3 and code.isascii() and code.isalpha() and (
+            code.isupper()):
+        a, b, c = (ord(char) - 65 for char in code)
+        currency_id = (a * 26 + b) * 26 + c
+    else:
+        currency_id = TOKEN
+    _ids[code] = currency_id
+    return currency_id
+
+
+def _currency_code(currency_id):
+    try:
+        return _codes[currency_id]
+    except KeyError:
+        pass
+    if currency_id >= 26 ** 3:
+        raise ValueError(f'Invalid currency id: {currency_id}')
+    ab, c = divmod(currency_id, 26)
+    a, b = divmod(ab, 26)
+    code = _codes[currency_id] = ''.join(chr(65 + i) for i in (a, b, c))
+    return code
+
+
+def _split(amount):
+    """Return the sign, coefficient and exponent of a finite amount."""
+    # Parsing the string is faster than as_tuple() for plain notation.
+    text = str(amount)
+    whole, _, fraction = text.partition('.')
+    try:
+        coefficient = int(whole + fraction)
+    except ValueError:
+        sign, _, exponent = amount.as_tuple()
+        return sign, int(_CONTEXT.scaleb(amount.copy_abs(), -exponent)), (
+            exponent)
+    return text[0] == '-', abs(coefficient), -len(fraction)
+
+
+def _join(negative, coefficient, exponent):
+    """Return the Decimal of a sign, coefficient and exponent, exactly."""
+    amount = _CONTEXT.scaleb(Decimal(coefficient), exponent)
+    return amount.copy_negate() if negative else amount
+
+
+def _pack_price(price, out):
+    """Append the body of price to the bytearray out."""
+    amount = price.amount
+    currency_id = _currency_id(price.currency)
+    if not amount.is_finite():
+        sign, _, exponent = amount.as_tuple()
+        out += _HEADER.pack(
+            (NEGATIVE if sign else 0) | SPECIAL, currency_id)
+        if currency_id == TOKEN:
+            _pack_code(price.currency, out)
+        out += _BYTE.pack(_SPECIALS[exponent])
+        return
+    sign, coefficient, exponent = _split(amount)
+    flags = NEGATIVE if sign else 0
+    if -128 <= exponent <= 127 and coefficient < UINT64:
+        out += _HEADER.pack(flags, currency_id)
+        if currency_id == TOKEN:
+            _pack_code(price.currency, out)
+        out += _COMPACT.pack(exponent, coefficient)
+        return
+    data = coefficient.to_bytes((coefficient.bit_length() + 7) // 8, 'little')
+    out += _HEADER.pack(flags | WIDE, currency_id)
+    if currency_id == TOKEN:
+        _pack_code(price.currency, out)
+    out += _WIDE.pack(exponent, len(data))
+    out += data
+
+
+def _pack_code(code, out):
+    data = code.encode('ascii')
+    out += _BYTE.pack(len(data))
+    out += data
+
+
+def _slice(buf, offset, size):
+    data = bytes(buf[offset:offset + size])
+    if len(data) != size:
+        raise ValueError('Truncated record')
+    return data
+
+
+def _unpack_price(buf, offset, cls=Price):
+    """Return the price of class cls at offset, and the offset following
+    it."""
+    flags, currency_id = _HEADER.unpack_from(buf, offset)
+    offset += _HEADER.size
+    if currency_id == TOKEN:
+        size, = _BYTE.unpack_from(buf, offset)
+        offset += 1
+        currency = _slice(buf, offset, size).decode('ascii')
+        offset += size
+        # Tokens must be loaded, packed codes are always valid.
+        make = cls
+    else:
+        currency = _currency_code(currency_id)
+        make = cls._make
+    layout = flags & 0x0F
+    if layout == COMPACT:
+        exponent, coefficient = _COMPACT.unpack_from(buf, offset)
+        offset += _COMPACT.size
+    elif layout == WIDE:
+        exponent, size = _WIDE.unpack_from(buf, offset)
+        offset += _WIDE.size
+        coefficient = int.from_bytes(_slice(buf, offset, size), 'little')
+        offset += size
+    elif layout == SPECIAL:
+        special, = _BYTE.unpack_from(buf, offset)
+        offset += 1
+        amount = Decimal(_SPECIAL_AMOUNTS[special])
+        if flags & NEGATIVE:
+            amount = amount.copy_negate()
+        return make(amount, currency), offset
+    else:
+        raise ValueError(f'Invalid price flags: {flags:#x}')
+    return make(_join(flags & NEGATIVE, coefficient, exponent), currency), (
+        offset)
+
+
+def dumps(obj):
+    """Return obj, a `Price`, `XPrice` or `PriceRange`, encoded as bytes."""
+    price_type = _TYPES.get(type(obj))
+    if price_type is not None:
+        amount = obj.amount
+        currency_id = _currency_id(obj.currency)
+        if currency_id != TOKEN and amount.is_finite():
+            # Fast path, one struct call for most prices.
+            sign, coefficient, exponent = _split(amount)
+            if -128 <= exponent <= 127 and coefficient < UINT64:
+                return _RECORD.pack(
+                    price_type, NEGATIVE if sign else 0, currency_id,
+                    exponent, coefficient)
+        out = bytearray(_BYTE.pack(price_type))
+        _pack_price(obj, out)
+        return bytes(out)
+    if isinstance(obj, PriceRange):
+        out = bytearray(_BYTE.pack(RANGE))
+        _pack_price(obj.start, out)
+        _pack_price(obj.stop, out)
+        return bytes(out)
+    raise TypeError(f'Cannot encode {type(obj)}')
+
+
+def unpack_from(buffer, offset=0):
+    """Decode the record at offset of buffer.
+
+    :return: The decoded object and the offset following its record.
+    """
+    try:
+        return _unpack(memoryview(buffer).cast('B'), offset)
+    except (struct.error, IndexError):
+        raise ValueError('Truncated record') from None
+
+
+def _unpack(buf, offset):
+    record_type = buf[offset]
+    cls = _CLASSES.get(record_type)
+    if cls is not None:
+        if len(buf) - offset >= _RECORD.size:
+            _, flags, currency_id, exponent, coefficient = (
+                _RECORD.unpack_from(buf, offset))
+            if flags & 0x0F == COMPACT and currency_id != TOKEN:
+                # Fast path, one struct call for most prices.
+                return cls._make(
+                    _join(flags & NEGATIVE, coefficient, exponent),
+                    _currency_code(currency_id)), offset + _RECORD.size
+        return _unpack_price(buf, offset + 1, cls)
+    if record_type == RANGE:
+        start, offset = _unpack_price(buf, offset + 1)
+        stop, offset = _unpack_price(buf, offset)
+        return PriceRange._make(start, stop), offset
+    raise ValueError(f'Invalid record type: {record_type}')
+
+
+def loads(data):
+    """Return the object encoded in data by `dumps`."""
+    obj, offset = unpack_from(data)
+    if offset != len(data):
+        raise ValueError(
+            'Got {} trailing bytes'.format(len(data) - offset))
+    return obj
+
+
+def iter_unpack(buffer):
+    """Yield the objects of concatenated records in buffer."""
+    buf = memoryview(buffer).cast('B')
+    size = len(buf)
+    offset = 0
+    while offset < size:
+        try:
+            obj, offset = _unpack(buf, offset)
+        except (struct.error, IndexError):
+            raise ValueError('Truncated record') from None
+        yield obj
+
+
+def _padding(size):
+    return -size % 8
+
+
+def dumps_units(units, currency, scale=0):
+    """Return an array buffer of integer units of ``10 ** -scale`` currency.
+
+    :param units: A sequence or NumPy array of integers within int64.
+    """
+    currency_id = _currency_id(currency)
+    code = currency.encode('ascii') if currency_id == TOKEN else b''
+    if numpy is not None and isinstance(units, numpy.ndarray):
+        if units.dtype.kind not in 'iu':
+            raise TypeError(f'Integer units required, not {units.dtype}')
+        if units.size and (int(units.min()) < INT64_MIN or
+                           int(units.max()) > INT64_MAX):
+            raise ValueError('Units exceed int64')
+        column = units.astype('<i8', copy=False).tobytes()
+        count = units.size
+    else:
+        try:
+            column = array('q', units)
+        except OverflowError:
+            raise ValueError('Units exceed int64') from None
+        if sys.byteorder != 'little':  # pragma: no cover
+            column.byteswap()
+        count = len(column)
+        column = column.tobytes()
+    header = _ARRAY.pack(MAGIC, currency_id, scale, len(code), count)
+    return b''.join((header, code, bytes(_padding(len(code))), column))
+
+
+def dumps_array(prices, currency=None):
+    """Return an array buffer of `Price` objects of one currency.
+
+    Units are scaled to the largest number of fraction digits of the
+    amounts, prices are read back at that scale.  Raises ValueError if
+    units exceed int64, encode such prices with `dumps`.  currency is needed
+    when prices may be empty.
+    """
+    prices = list(prices)
+    if currency is None:
+        if not prices:
+            raise ValueError('currency is required without prices')
+        currency = prices[0].currency
+    parts = []
+    for price in prices:
+        if price.currency != currency:
+            raise ValueError(
+                f'Cannot store {price!r} in a {currency} array')
+        if not price.amount.is_finite():
+            raise ValueError(f'Cannot store {price!r} in an array')
+        parts.append(_split(price.amount))
+    scale = max(max((-exponent for _, _, exponent in parts), default=0), 0)
+    if scale > 127:
+        raise ValueError('Too many fraction digits for an array')
+    return dumps_units(
+        [(-coefficient if negative else coefficient) * 10 ** (
+            scale + exponent) for negative, coefficient, exponent in parts],
+        currency, scale)
+
+
+class PriceBuffer:
+    """Read only view of an array buffer made by `dumps_array`.
+
+    Units are read in place from data, any object supporting the buffer
+    protocol, ex: bytes, a memory map or a shared memory block.
+
+    :param data: An array buffer.
+    """
+
+    __slots__ = ('currency', 'scale', 'units', '_make')
+
+    def __init__(self, data):
+        buf = memoryview(data).cast('B')
+        magic, currency_id, scale, size, count = _ARRAY.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError('Not a price array buffer')
+        offset = _ARRAY.size
+        if currency_id == TOKEN:
+            code = bytes(buf[offset:offset + size]).decode('ascii')
+            self._make = Price
+        else:
+            code = _currency_code(currency_id)
+            self._make = Price._make
+        offset += size + _padding(size)
+        column = buf[offset:offset + count * 8]
+        if len(column) != count * 8:
+            raise ValueError('Truncated price array buffer')
+        if sys.byteorder == 'little':
+            units = column.cast('q')
+        else:  # pragma: no cover
+            units = array('q', column)
+            units.byteswap()
+            units = memoryview(units)
+        self.currency = code
+        self.scale = scale
+        self.units = units
+
+    def __len__(self):
+        return len(self.units)
+
+    def __getitem__(self, index):
+        return self._price(self.units[index])
+
+    def __iter__(self):
+        return map(self._price, self.units)
+
+    def __repr__(self):
+        return '{}({!r}, {} prices, scale={})'.format(
+            type(self).__name__, self.currency, len(self), self.scale)
+
+    def _price(self, units):
+        return self._make(_CONTEXT.scaleb(Decimal(units), -self.scale),
+                          self.currency)
+
+    def to_prices(self):
+        """Return the prices as a list of `Price` objects."""
+        make, currency, exponent = self._make, self.currency, -self.scale
+        scaleb = _CONTEXT.scaleb
+        return [make(scaleb(Decimal(units), exponent), currency)
+                for units in self.units]
+
+    def to_numpy(self):
+        """Return the units as an int64 NumPy array sharing the buffer."""
+        if numpy is None:
+            raise ImportError('to_numpy requires numpy')
+        return numpy.frombuffer(self.units, dtype=numpy.int64)
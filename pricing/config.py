@@ -0,0 +1,143 @@
+"""
+pricing.config
+~~~~~~~~~~~~~~
+
+Python configuration API, an alternative to the ZCML directives.
+
+The functions here perform the same registrations as the `currencyFormat`
+and `exchange` subdirectives, without parsing XML or going through
+zope.configuration's action and conflict machinery.  The directive handlers
+in `pricing.metaconfigure` delegate to them.
+
+Usage::
+
+    >>> from pricing import config
+    >>> config.register_currency(
+    ...     'BTC', '₿', '¤#,##0.########', currency_digits=False,
+    ...     name='bitcoin')
+    >>> config.register_exchange('pricing.exchange.CoinBaseBackend', 'USD')
+
+    >>> config.configure_from_dict({
+    ...     'default': 'USD',
+    ...     'currencies': [
+    ...         {'code': 'LTC', 'symbol': 'Ł', 'format': '¤#,##0.########',
+    ...          'currency_digits': False, 'name': 'litecoin'}],
+    ...     'exchanges': [
+    ...         {'backend': 'pricing.exchange.CoinBaseBackend',
+    ...          'base': 'EUR', 'name': 'eur', 'shared': True}]})
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import importlib
+
+from zope.component import provideUtility, queryUtility
+
+from .exchange import Exchange, SharedBackend
+from .formats import CurrencyFormat
+from .interfaces import ICurrencyFormat, IExchange, IFormatCache
+
+
+__all__ = ['register_currency', 'register_exchange', 'configure_from_dict']
+
+
+# Rate sources shared by exchanges registered with shared=True outside of
+# a configuration dict, one per backend class, default currency and options.
+_sources = {}
+
+
+def _resolve(obj):
+    """Return the object named by a dotted path, relative to pricing if it
+    starts with a dot, or obj itself if it isn't a string."""
+    if not isinstance(obj, str):
+        return obj
+    if obj.startswith('.'):
+        obj = __package__ + obj
+    path, name = obj.rsplit('.', 1)
+    return getattr(importlib.import_module(path), name)
+
+
+def _shared_source(sources, backend, base, options):
+    key = (backend, base, tuple(sorted(options.items())))
+    try:
+        return sources[key]
+    except KeyError:
+        source = sources[key] = backend(base, **options)
+        return source
+
+
+def register_currency(code, symbol, format=None, currency_digits=True,
+                      decimal_quantization=True, name=''):
+    """Register a custom currency format, like `<currencyFormat>`.
+
+    :return: the registered :inst:`CurrencyFormat`.
+    """
+    currency = CurrencyFormat(name, code, symbol, format, currency_digits,
+                              decimal_quantization)
+    provideUtility(currency, ICurrencyFormat, name=code)
+    # Strings formatted with a replaced format mustn't be served anymore.
+    cache = queryUtility(IFormatCache)
+    if cache is not None:
+        cache.clear()
+    return currency
+
+
+def register_exchange(backend, base='USD', component=Exchange, name='',
+                      shared=False, path=None, default='USD', sources=None):
+    """Register an exchange, like `<exchange>`.
+
+    backend and component are classes or dotted paths.  Shared exchanges
+    use one rate source per backend class, default currency and path, taken
+    from sources or from a module wide mapping.
+
+    :return: the registered exchange.
+    """
+    backend, component = _resolve(backend), _resolve(component)
+    options = {'path': path} if path else {}
+    if not shared:
+        backend = backend(base, **options)
+    else:
+        source = _shared_source(
+            _sources if sources is None else sources, backend, default,
+            options)
+        backend = SharedBackend(source, base)
+    exchange = component(backend)
+    provideUtility(exchange, IExchange, name=name)
+    return exchange
+
+
+def configure_from_dict(config):
+    """Register the currencies and exchanges described by config.
+
+    config mirrors the `<currency>` directive: an optional ``default``
+    currency, a list of ``currencies`` keyword dicts for
+    `register_currency` and a list of ``exchanges`` keyword dicts for
+    `register_exchange`.  Shared exchanges of one config share their rate
+    sources.  Like ZCML, duplicate currency codes or exchange names within
+    one config are rejected before anything is registered.
+    """
+    unknown = set(config) - {'default', 'currencies', 'exchanges'}
+    if unknown:
+        raise ValueError('Unknown configuration keys: {}'.format(
+            ', '.join(sorted(unknown))))
+    currencies = config.get('currencies', ())
+    exchanges = config.get('exchanges', ())
+    _check_unique('currency code', [item['code'] for item in currencies])
+    _check_unique('exchange name',
+                  [item.get('name', '') for item in exchanges])
+
+    default = config.get('default', 'USD')
+    sources = {}
+    for item in currencies:
+        register_currency(**item)
+    for item in exchanges:
+        register_exchange(default=default, sources=sources, **item)
+
+
+def _check_unique(kind, values):
+    seen = set()
+    for value in values:
+        if value in seen:
+            raise ValueError('Duplicate {}: {!r}'.format(kind, value))
+        seen.add(value)
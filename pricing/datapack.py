@@ -0,0 +1,105 @@
+"""
+pricing.datapack
+~~~~~~~~~~~~~~~~
+
+Trimmed CLDR data packs.
+
+A data pack holds only what `pricing` formats with, number symbols,
+currency formats, symbols, names and precisions, for a configured list of
+locales and currencies in one compact JSON file.  Installing it spares
+loading babel's locale data, anything missing from the pack still comes
+from babel.
+
+Build a pack::
+
+    $ python -m pricing.datapack pricing.json -l en_US -l de_DE -c USD -c EUR
+
+Load it at startup, or set the ``PRICING_DATA_PACK`` environment variable
+to its path before importing `pricing`::
+
+    >>> from pricing import datapack
+    >>> datapack.load('pricing.json')
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+import babel
+from babel.core import Locale, get_global
+
+from .babel_numbers import (
+    DATA_PACK_VERSION, LocalePack, install_data_pack)
+
+
+__all__ = ['build', 'write', 'read', 'load', 'unload']
+
+
+def build(locales, currencies=None):
+    """Return a data pack for locales, trimmed to currencies if given."""
+    if currencies is not None:
+        currencies = sorted(set(currencies))
+    return {
+        'version': DATA_PACK_VERSION,
+        'babel': babel.__version__,
+        'currencies': currencies,
+        'currency_fractions': {
+            code: digits[0] for code, digits in
+            get_global('currency_fractions').items()},
+        'locales': {
+            str(locale): LocalePack.from_locale(locale).to_data(currencies)
+            for locale in map(Locale.parse, locales)}}
+
+
+def write(path, locales, currencies=None):
+    """Build a data pack and write it atomically to path."""
+    data = build(locales, currencies)
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix='.datapack')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            json.dump(data, fp, ensure_ascii=False, separators=(',', ':'),
+                      sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read(path):
+    """Return the data pack stored at path."""
+    with open(path, encoding='utf-8') as fp:
+        return json.load(fp)
+
+
+def load(path):
+    """Read the data pack at path and use it for formatting."""
+    install_data_pack(read(path))
+
+
+def unload():
+    """Stop using a data pack, formatting data comes from babel again."""
+    install_data_pack(None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pricing.datapack',
+        description='Build a trimmed CLDR data pack for pricing.')
+    parser.add_argument('path', help='output file')
+    parser.add_argument(
+        '-l', '--locale', action='append', required=True, dest='locales',
+        help='locale identifier to include, ex: en_US')
+    parser.add_argument(
+        '-c', '--currency', action='append', dest='currencies',
+        help='currency code to include, all currencies when omitted')
+    args = parser.parse_args(argv)
+    write(args.path, args.locales, args.currencies)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,44 +8,172 @@ Price exchange related classes.
 :license: MIT, see LICENSE for more details.
 """
 
+from contextlib import contextmanager
+import contextvars
 from decimal import Decimal
 from datetime import timedelta
+import csv
 import importlib
+import io
+import itertools
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from types import MappingProxyType
 from typing import ClassVar
 
 from zope.interface import implementer
 import attr
-from attr.validators import instance_of
-import requests
-import zulu
+from attr.validators import instance_of, optional
 
-from .interfaces import IExchangeBackend, IExchange
+from .interfaces import IExchangeBackend, IExchange, IRateSnapshot
 from .exceptions import ExchangeBackendNotInstalled
+from .registry import query_utility
 
 
-__all__ = ['BackendBase', 'SimpleBackend', 'CoinBaseBackend', 'Exchange']
+__all__ = ['RateSnapshot', 'BackendBase', 'SimpleBackend', 'CoinBaseBackend',
+           'FileBackend', 'SharedBackend', 'Exchange', 'get_exchange',
+           'use_exchange']
+
+
+_current_exchange = contextvars.ContextVar('current_exchange', default=None)
+_versions = itertools.count(1)
+
+
+def _now():
+    # zulu, requests and asyncio are imported where used, they dominate the
+    # import time of pricing.
+    import zulu
+    return zulu.now()
+
+
+def rates_expired(backend):
+    """Return whether backend's rates are older than 5 mins."""
+    return backend.last_updated + timedelta(minutes=5) < _now()
 
 
 def ensure_fresh_rates(func):
     """Decorator for Backend that ensures rates are fresh within last 5 mins"""
     def wrapper(self, *args, **kwargs):
-        if self.last_updated + timedelta(minutes=5) < zulu.now():
+        if rates_expired(self):
             self.refresh()
         return func(self, *args, **kwargs)
     return wrapper
 
 
+def _decimal_rates(rates):
+    """Converts rates mapping values into Decimal, read-only mapping."""
+    return MappingProxyType({
+        currency: rate if isinstance(rate, Decimal) else Decimal(str(rate))
+        for currency, rate in rates.items()})
+
+
+@implementer(IRateSnapshot)
+@attr.s(frozen=True, slots=True, cmp=False)
+class RateSnapshot:
+    """Immutable, versioned table of rates relative to a base currency.
+
+    Backends publish a new snapshot by replacing their reference to it, so
+    readers never lock and every quotation made from one snapshot is
+    consistent even while rates are being refreshed.
+
+    :param base str: An ISO4217 currency code.
+    :param rates dict: Mapping of currency -> rate of exchange from base.
+    :param version int: Generation of the rates, increases on each publish.
+    :param last_updated Zulu: When the rates were retrieved.
+    :return: A `RateSnapshot` object.
+    :rtype: :inst:`RateSnapshot`
+
+    Usage::
+
+        >>> snapshot = RateSnapshot('USD', {'EUR': '0.5', 'GBP': '0.25'})
+        ... snapshot.quotation('EUR', 'GBP')
+        Decimal('0.5')
+    """
+
+    base: str = attr.ib(validator=optional(instance_of(str)))
+    rates: MappingProxyType = attr.ib(factory=dict, converter=_decimal_rates)
+    version: int = attr.ib(factory=lambda: next(_versions))
+    last_updated: 'zulu.Zulu' = attr.ib(default=None)
+
+    def rate(self, currency):
+        """Returns the rate of exchange from base -> currency."""
+        if currency == self.base:
+            return Decimal(1)
+        rate = self.rates.get(currency, None)
+        if rate:
+            return rate
+
+    def quotation(self, origin, target):
+        """Returns the rate of exchange from origin -> target currency."""
+        a = self.rate(origin)
+        b = self.rate(target)
+        if a and b:
+            return b / a
+        return None
+
+    def rebase(self, base):
+        """Return the same rates relative to another base currency."""
+        if base == self.base:
+            return self
+        rate = self.rate(base)
+        rates = {}
+        if rate:
+            rates = {currency: value / rate
+                     for currency, value in self.rates.items()}
+            rates[self.base] = 1 / rate
+        return RateSnapshot(base, rates, self.version, self.last_updated)
+
+
 class BackendBase:
     """Base class API for exchange backends"""
 
+    def snapshot(self):
+        """Return the current `RateSnapshot`, None if not supported."""
+        return None
+
+    def rate(self, currency):
+        """Returns the rate of exchange from base -> currency."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            raise NotImplementedError(
+                '{} must implement rate or snapshot'.format(
+                    type(self).__name__))
+        return snapshot.rate(currency)
+
     def quotation(self, origin, target):
         """Return quotation between two currencies (origin, target)"""
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            return snapshot.quotation(origin, target)
         a = self.rate(origin)
         b = self.rate(target)
         if a and b:
             return Decimal(b) / Decimal(a)
         return None
 
+    async def asnapshot(self):
+        """Return the current `RateSnapshot` without blocking the loop."""
+        return self.snapshot()
+
+    async def arate(self, currency):
+        """Returns the rate of exchange from base -> currency."""
+        snapshot = await self.asnapshot()
+        if snapshot is None:
+            return self.rate(currency)
+        return snapshot.rate(currency)
+
+    async def aquotation(self, origin, target):
+        """Return quotation between two currencies (origin, target)"""
+        snapshot = await self.asnapshot()
+        if snapshot is None:
+            return self.quotation(origin, target)
+        return snapshot.quotation(origin, target)
+
 
 @implementer(IExchangeBackend)
 @attr.s
@@ -66,25 +194,24 @@ class SimpleBackend(BackendBase):
     base: str = attr.ib(default='USD', validator=instance_of(str))
     _rates: dict = attr.ib(init=False, repr=False, factory=dict,
                            validator=instance_of(dict))
+    _snapshot: RateSnapshot = attr.ib(
+        init=False, repr=False, cmp=False, default=None)
 
     def setrate(self, currency, rate):
         """Sets the rate for currency to provided rate."""
         if not self.base:
             raise Warning("set the base first: backend.base = currency")
-        self._rates[currency] = rate
+        rates = dict(self._rates)
+        rates[currency] = rate
+        self._rates = rates
+        self._snapshot = RateSnapshot(self.base, rates)
 
-    def rate(self, currency):
-        """Returns the rate of exchange from base -> currency."""
-        if currency == self.base:
-            rate = 1
-        else:
-            rate = self._rates.get(currency, None)
-        if rate:
-            return Decimal(rate)
-
-    def quotation(self, origin, target):
-        """Returns the rate of exchange from origin -> target currency."""
-        return super(SimpleBackend, self).quotation(origin, target)
+    def snapshot(self):
+        """Return the current `RateSnapshot`."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.base != self.base:
+            snapshot = self._snapshot = RateSnapshot(self.base, self._rates)
+        return snapshot
 
 
 @implementer(IExchangeBackend)
@@ -99,22 +226,38 @@ class CoinBaseBackend(BackendBase):
     Usage::
 
         >>> CoinBaseBackend(base='USD')
-        CoinBaseBackend(base='USD', last_updated=<Zulu [...]>)
+        CoinBaseBackend(base='USD')
 
     """
 
     base: str = attr.ib(default='USD', validator=instance_of(str))
 
-    _rates: dict = attr.ib(repr=False, init=False, factory=dict)
+    _snapshot: RateSnapshot = attr.ib(init=False, repr=False, cmp=False)
+    _refreshing: 'asyncio.Future' = attr.ib(
+        init=False, repr=False, cmp=False, default=None)
     _headers: ClassVar[dict] = {
         'Accept': 'application/json', 'Content-Type': 'application/json'}
     _base_url: ClassVar[str] = 'https://api.coinbase.com/v2'
-    last_updated: zulu.Zulu = attr.ib(init=False)
 
-    @last_updated.default
-    def last_updated_default(self):
-        now = zulu.now()
-        return now - timedelta(minutes=5)
+    @_snapshot.default
+    def _snapshot_default(self):
+        return RateSnapshot(
+            self.base, version=0,
+            last_updated=_now() - timedelta(minutes=5))
+
+    @property
+    def last_updated(self):
+        """Return when the current rates were retrieved."""
+        return self._snapshot.last_updated
+
+    @last_updated.setter
+    def last_updated(self, value):
+        # Backdating the current rates forces a refresh on next use.
+        self._snapshot = attr.evolve(self._snapshot, last_updated=value)
+
+    @property
+    def _rates(self):
+        return self._snapshot.rates
 
     def _rates_refresh(self, values=None):
         if values:
@@ -126,30 +269,283 @@ class CoinBaseBackend(BackendBase):
             base = self.base
             headers = self._headers
 
+        import requests
         url = base_url + '/exchange-rates?currency={}'.format(base)
         r = requests.get(url, headers=headers)
         r.raise_for_status()
         return r.json()['data']['rates']
 
+    async def _arates_refresh(self):
+        try:
+            import aiohttp
+        except ImportError:  # pragma: no cover
+            import asyncio
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._rates_refresh)
+
+        url = self._base_url + '/exchange-rates?currency={}'.format(self.base)
+        async with aiohttp.ClientSession(headers=self._headers) as session:
+            async with session.get(url) as r:
+                r.raise_for_status()
+                return (await r.json())['data']['rates']
+
     def refresh(self):
         """Refresh rates and update last_updated timestamp."""
-        self._rates = self._rates_refresh()
-        self.last_updated = zulu.now()
+        self._snapshot = RateSnapshot(
+            self.base, self._rates_refresh(), last_updated=_now())
+
+    async def _arefresh(self):
+        rates = await self._arates_refresh()
+        self._snapshot = RateSnapshot(
+            self.base, rates, last_updated=_now())
+
+    async def arefresh(self):
+        """Refresh rates without blocking the event loop.
+
+        Uses aiohttp when installed, otherwise requests in the loop's default
+        executor.  Concurrent callers in the same event loop await the same
+        in-flight refresh.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        task = self._refreshing
+        # A pending task of another, possibly closed, loop can't be awaited.
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._refreshing = loop.create_task(self._arefresh())
+        await asyncio.shield(task)
 
     @ensure_fresh_rates
-    def rate(self, currency):
-        """Returns the rate of exchange from base -> currency."""
-        if currency == self.base:
-            rate = 1
+    def snapshot(self):
+        """Return the current `RateSnapshot`."""
+        return self._snapshot
+
+    async def asnapshot(self):
+        """Return the current `RateSnapshot` without blocking the loop."""
+        if rates_expired(self):
+            await self.arefresh()
+        return self._snapshot
+
+
+@implementer(IExchangeBackend)
+@attr.s
+class FileBackend(BackendBase):
+    """Backend that reads rates from a local JSON, CSV or binary file.
+
+    The file is polled for changes (inode, mtime and size) at most once per
+    `interval` seconds.  A changed file is parsed into a new `RateSnapshot`
+    which replaces the current one in a single assignment, so readers never
+    block and never see a partially loaded table.  Replace the file atomically
+    (ex: with `FileBackend.write`) to update the rates.
+
+    :param base str: An ISO4217 currency code.
+    :param path str: Path to the rates file.
+    :param format str: One of 'json', 'csv' or 'bin', default from extension.
+    :param interval float: Minimum seconds between checks for file changes.
+    :param memory_map bool: Read the file through a read-only memory map.
+    :return: A `FileBackend` object.
+    :rtype: :inst:`FileBackend`
+
+    Usage::
+
+        >>> FileBackend(base='USD', path='/var/lib/rates.json')
+        FileBackend(base='USD', path='/var/lib/rates.json', format='json',
+        ...         interval=1.0, memory_map=False)
+
+    """
+
+    base: str = attr.ib(default='USD', validator=instance_of(str))
+    path: str = attr.ib(default=None, validator=optional(instance_of(str)))
+    format: str = attr.ib(default=None, validator=optional(instance_of(str)))
+    interval: float = attr.ib(default=1.0)
+    memory_map: bool = attr.ib(default=False, validator=instance_of(bool))
+
+    _table: tuple = attr.ib(init=False, repr=False, default=None)
+    _checked: float = attr.ib(init=False, repr=False, default=None)
+    _lock: threading.Lock = attr.ib(
+        init=False, repr=False, cmp=False, factory=threading.Lock)
+
+    _formats: ClassVar[tuple] = ('json', 'csv', 'bin')
+    _magic: ClassVar[bytes] = b'PRX1'
+
+    def __attrs_post_init__(self):
+        if self.path is None:
+            raise ValueError('FileBackend requires the path of a rates file')
+        if self.format is None:
+            self.format = os.path.splitext(self.path)[1].lstrip('.').lower()
+        if self.format not in self._formats:
+            raise ValueError('Unknown rates file format: {}'.format(
+                self.format))
+
+    @staticmethod
+    def _stat_key(path):
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        with open(self.path, 'rb') as fd:
+            if not self.memory_map:
+                return fd.read()
+            if not os.fstat(fd.fileno()).st_size:
+                return b''
+            return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def _parse_json(cls, data):
+        obj = json.loads(bytes(data).decode('utf-8'), parse_float=Decimal)
+        if 'data' in obj:
+            obj = obj['data']
+        base = obj.get('base', obj.get('currency'))
+        return base, obj.get('rates', obj)
+
+    @classmethod
+    def _parse_csv(cls, data):
+        reader = csv.reader(io.StringIO(bytes(data).decode('utf-8')))
+        rows = [row for row in reader if row and not row[0].startswith('#')]
+        if rows and rows[0][0].lower() == 'currency':
+            rows = rows[1:]
+        return None, {code.strip(): rate.strip() for code, rate in rows}
+
+    @classmethod
+    def _parse_bin(cls, data):
+        fields = []
+        with memoryview(data) as buf:
+            if bytes(buf[:4]) != cls._magic:
+                raise ValueError('Not a binary rates file')
+            offset = 4
+            while offset < len(buf):
+                size, = struct.unpack_from('<B', buf, offset)
+                field = bytes(buf[offset + 1:offset + 1 + size])
+                fields.append(field.decode('ascii'))
+                offset += 1 + size
+        base, items = fields[0], fields[1:]
+        return base, dict(zip(items[::2], items[1::2]))
+
+    def _load(self, key):
+        data = self._read()
+        try:
+            base, rates = getattr(self, '_parse_' + self.format)(data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+        snapshot = RateSnapshot(base or self.base, rates).rebase(self.base)
+        if rates and not snapshot.rates:
+            raise ValueError('Base {} not found in {}'.format(
+                self.base, self.path))
+        self._table = (key, RateSnapshot(
+            self.base, snapshot.rates, last_updated=_now()))
+
+    def refresh(self):
+        """Reload rates from the file if it has changed."""
+        self._checked = time.monotonic()
+        try:
+            key = self._stat_key(self.path)
+        except OSError:
+            # The file may be briefly missing while it's being replaced.
+            if self._table is None:
+                raise
+            return
+        if self._table is None or self._table[0] != key:
+            self._load(key)
+
+    def snapshot(self):
+        """Return the current `RateSnapshot`, reloading a changed file."""
+        table = self._table
+        checked = self._checked
+        if (table is None or checked is None or
+                time.monotonic() - checked >= self.interval):
+            if table is None:
+                with self._lock:
+                    self.refresh()
+            elif self._lock.acquire(blocking=False):
+                try:
+                    self.refresh()
+                finally:
+                    self._lock.release()
+            table = self._table
+        return table[1]
+
+    @classmethod
+    def write(cls, path, rates, base='USD', format=None):
+        """Atomically write rates (relative to base) to a rates file."""
+        if format is None:
+            format = os.path.splitext(path)[1].lstrip('.').lower()
+        rates = {code: str(rate) for code, rate in rates.items()}
+        if format == 'json':
+            data = json.dumps({'base': base, 'rates': rates}).encode('utf-8')
+        elif format == 'csv':
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(['currency', 'rate'])
+            writer.writerows(sorted(rates.items()))
+            data = out.getvalue().encode('utf-8')
+        elif format == 'bin':
+            fields = [base]
+            for code, rate in sorted(rates.items()):
+                fields.extend((code, rate))
+            data = cls._magic + b''.join(
+                struct.pack('<B', len(f)) + f.encode('ascii') for f in fields)
         else:
-            rate = self._rates.get(currency, None)
-        if rate:
-            return Decimal(rate)
+            raise ValueError('Unknown rates file format: {}'.format(format))
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+@implementer(IExchangeBackend)
+@attr.s
+class SharedBackend(BackendBase):
+    """Backend that derives its rates from a shared rate source.
+
+    Several backends with different bases can share one source backend, so
+    the rate table is downloaded once and every base's view is derived by
+    rebasing in memory.  All views refresh together with their source.
+
+    :param source IExchangeBackend: The backend providing the rate table.
+    :param base str: An ISO4217 currency code.
+    :return: A `SharedBackend` object.
+    :rtype: :inst:`SharedBackend`
+
+    Usage::
+
+        >>> source = CoinBaseBackend(base='USD')
+        ... SharedBackend(source, base='EUR')
+        SharedBackend(source=CoinBaseBackend(...), base='EUR')
+
+    """
+
+    source: IExchangeBackend = attr.ib(validator=instance_of(BackendBase))
+    base: str = attr.ib(default='USD', validator=instance_of(str))
+    _rebased: tuple = attr.ib(init=False, repr=False, cmp=False, default=None)
+
+    def refresh(self):
+        """Refresh rates of the shared source."""
+        self.source.refresh()
+
+    def snapshot(self):
+        """Return the source's current `RateSnapshot` rebased to base."""
+        return self._rebase(self.source.snapshot())
+
+    async def asnapshot(self):
+        """Return the source's current `RateSnapshot` rebased to base."""
+        return self._rebase(await self.source.asnapshot())
+
+    def _rebase(self, source):
+        rebased = self._rebased
+        if (rebased is None or rebased[0] is not source or
+                rebased[1].base != self.base):
+            rebased = self._rebased = (source, source.rebase(self.base))
+        return rebased[1]
 
-    @ensure_fresh_rates
     def quotation(self, origin, target):
         """Returns the rate of exchange from origin -> target currency."""
-        return super(CoinBaseBackend, self).quotation(origin, target)
+        return self.source.quotation(origin, target)
 
 
 @implementer(IExchange)
@@ -228,6 +624,30 @@ class Exchange:
             raise ExchangeBackendNotInstalled()
         return self._backend.quotation(origin, target)
 
+    def snapshot(self):
+        """Return the backend's current `RateSnapshot`."""
+        if not self._backend:
+            raise ExchangeBackendNotInstalled()
+        return self._backend.snapshot()
+
+    async def arate(self, currency):
+        """Returns the rate of exchange from base -> currency."""
+        if not self._backend:
+            raise ExchangeBackendNotInstalled()
+        return await self._backend.arate(currency)
+
+    async def aquotation(self, origin, target):
+        """Returns the rate of exchange from origin -> target currency."""
+        if not self._backend:
+            raise ExchangeBackendNotInstalled()
+        return await self._backend.aquotation(origin, target)
+
+    async def asnapshot(self):
+        """Return the backend's current `RateSnapshot`."""
+        if not self._backend:
+            raise ExchangeBackendNotInstalled()
+        return await self._backend.asnapshot()
+
     def __getattr__(self, key):
         return getattr(self._backend, key)
 
@@ -238,3 +658,41 @@ class Exchange:
             raise ExchangeBackendNotInstalled()
         else:
             setattr(self._backend, key, value)
+
+
+def get_exchange():
+    """Return the exchange for the current context.
+
+    The exchange selected with `use_exchange` takes precedence over the
+    unnamed `IExchange` utility.
+    """
+    exchange = _current_exchange.get()
+    if exchange is None:
+        exchange = query_utility(IExchange)
+    return exchange
+
+
+@contextmanager
+def use_exchange(exchange):
+    """Select the exchange used for conversions in the current context.
+
+    Accepts an `IExchange` object or the name of a registered `IExchange`
+    utility.  Names are resolved once, the resolved exchange is kept in a
+    context variable so each thread and asyncio task has its own selection
+    and conversions don't touch the component registry.
+
+    Usage::
+
+        >>> with use_exchange('merchant-eur'):
+        ...     Price('10', 'USD').to('EUR')
+        EUR 8.50
+    """
+    if isinstance(exchange, str):
+        name, exchange = exchange, query_utility(IExchange, name=exchange)
+        if exchange is None:
+            raise LookupError('No exchange named {!r}'.format(name))
+    token = _current_exchange.set(exchange)
+    try:
+        yield exchange
+    finally:
+        _current_exchange.reset(token)
@@ -0,0 +1,268 @@
+"""
+pricing.indexes
+~~~~~~~~~~~~~~~
+
+Indexes answering price queries over many objects.
+
+`PriceRangeIndex` finds every `PriceRange` containing a price, without
+testing each range.  `PriceIndex` keeps keyed prices sorted to find the
+keys priced within a `PriceRange`, or the cheapest ones.
+
+Usage::
+
+    >>> index = PriceRangeIndex([
+    ...     PriceRange(Price('0', 'USD'), Price('10', 'USD')),
+    ...     PriceRange(Price('5', 'USD'), Price('50', 'USD'))],
+    ...     values=['small', 'medium'])
+    >>> index.stab(Price('7.5', 'USD'))
+    ['small', 'medium']
+
+    >>> catalog = PriceIndex([(Price('5', 'USD'), 'pen'),
+    ...                       (Price('30', 'USD'), 'book')])
+    >>> catalog.keys_in(PriceRange(Price('0', 'USD'), Price('10', 'USD')))
+    ['pen']
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from .price import Price
+
+
+__all__ = ['PriceRangeIndex', 'PriceIndex']
+
+
+def _build_tree(intervals):
+    """Return a centered interval tree of (start, stop, value) triples
+    sorted by start.
+
+    Nodes are (center, left, right, starts, by_start, stops, by_stop)
+    tuples, where by_start holds the values of the intervals containing
+    center sorted by start and by_stop sorted by stop.  Centering on the
+    median start leaves at most half of the intervals on either side, and
+    partitioning keeps them sorted by start.
+    """
+    if not intervals:
+        return None
+    split = len(intervals) // 2
+    center = intervals[split][0]
+    # Intervals starting after center are a suffix.
+    while split < len(intervals) and intervals[split][0] == center:
+        split += 1
+    right = intervals[split:]
+    left, here = [], []
+    for interval in intervals[:split]:
+        if interval[1] < center:
+            left.append(interval)
+        else:
+            here.append(interval)
+    starts = [start for start, _, _ in here]
+    by_start = [value for _, _, value in here]
+    here.sort(key=itemgetter(1))
+    stops = [stop for _, stop, _ in here]
+    by_stop = [value for _, _, value in here]
+    return (center, _build_tree(left), _build_tree(right),
+            starts, by_start, stops, by_stop)
+
+
+class PriceRangeIndex:
+    """Static index of price ranges answering stabbing queries.
+
+    Ranges are partitioned by currency into centered interval trees, which
+    find the k ranges containing a price in O(log n + k).  Like
+    `PriceRange.__contains__`, both ends of a range are inclusive.
+
+    :param ranges: An iterable of `PriceRange` objects.
+    :param values: An optional iterable of values to return for each
+        range, the ranges themselves by default.
+    """
+
+    __slots__ = ('_trees', '_size')
+
+    def __init__(self, ranges, values=None):
+        ranges = list(ranges)
+        if values is None:
+            values = ranges
+        else:
+            values = list(values)
+            if len(values) != len(ranges):
+                raise ValueError(
+                    'Got {} values for {} ranges'.format(
+                        len(values), len(ranges)))
+        intervals = {}
+        for price_range, value in zip(ranges, values):
+            intervals.setdefault(price_range.currency, []).append(
+                (price_range.start.amount, price_range.stop.amount, value))
+        self._trees = {
+            currency: _build_tree(sorted(items, key=itemgetter(0)))
+            for currency, items in intervals.items()}
+        self._size = len(ranges)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def currencies(self):
+        """Return the currencies of the indexed ranges."""
+        return frozenset(self._trees)
+
+    def stab(self, price):
+        """Return the values of the ranges containing price.
+
+        Values are returned in no particular order.
+        """
+        if not isinstance(price, Price):
+            raise TypeError(
+                f'stab requires a Price not {type(price)}')
+        return self._stab(self._trees.get(price.currency), price.amount)
+
+    def stab_many(self, prices):
+        """Return, for each of prices, the values of the ranges containing
+        it, like `stab`."""
+        trees = self._trees
+        stab = self._stab
+        results = []
+        for price in prices:
+            if not isinstance(price, Price):
+                raise TypeError(
+                    f'stab_many requires Price items not {type(price)}')
+            results.append(stab(trees.get(price.currency), price.amount))
+        return results
+
+    @staticmethod
+    def _stab(node, amount):
+        found = []
+        while node is not None:
+            center, left, right, starts, by_start, stops, by_stop = node
+            if amount < center:
+                found.extend(by_start[:bisect_right(starts, amount)])
+                node = left
+            elif amount > center:
+                found.extend(by_stop[bisect_left(stops, amount):])
+                node = right
+            else:
+                found.extend(by_start)
+                break
+        return found
+
+
+def _amount(price):
+    if not isinstance(price, Price):
+        raise TypeError(f'PriceIndex requires Price not {type(price)}')
+    if price.amount.is_nan():
+        raise ValueError(f'Cannot index {price!r}')
+    return price.amount
+
+
+def _check_count(n):
+    if n < 0:
+        raise ValueError(f'Number of items must not be negative: {n}')
+
+
+class PriceIndex:
+    """Sorted index of (price, key) pairs.
+
+    Each currency keeps two parallel lists, its amounts in ascending order
+    and the keys priced with them, so stored elements aren't `Price`
+    objects.  Queries bisect the amounts, `keys_in` runs in O(log n + k).
+    Keys with equal amounts stay in insertion order.
+
+    :param items: An iterable of (price, key) pairs to bulk load.
+    """
+
+    __slots__ = ('_amounts', '_keys')
+
+    def __init__(self, items=()):
+        self._amounts = {}
+        self._keys = {}
+        self.update(items)
+
+    def __len__(self):
+        return sum(map(len, self._keys.values()))
+
+    @property
+    def currencies(self):
+        """Return the currencies of the indexed prices."""
+        return frozenset(
+            currency for currency, keys in self._keys.items() if keys)
+
+    def update(self, items):
+        """Bulk load (price, key) pairs."""
+        columns = {}
+        for price, key in items:
+            amount = _amount(price)
+            columns.setdefault(price.currency, []).append((amount, key))
+        for currency, pairs in columns.items():
+            pairs[:0] = zip(self._amounts.get(currency, ()),
+                            self._keys.get(currency, ()))
+            # Stable, so equal amounts keep their insertion order.
+            pairs.sort(key=itemgetter(0))
+            self._amounts[currency] = [amount for amount, _ in pairs]
+            self._keys[currency] = [key for _, key in pairs]
+
+    def insert(self, price, key):
+        """Add key priced at price."""
+        amount = _amount(price)
+        amounts = self._amounts.setdefault(price.currency, [])
+        position = bisect_right(amounts, amount)
+        amounts.insert(position, amount)
+        self._keys.setdefault(price.currency, []).insert(position, key)
+
+    def delete(self, price, key):
+        """Remove key priced at price, raises ValueError if not indexed."""
+        amount = _amount(price)
+        amounts = self._amounts.get(price.currency, [])
+        keys = self._keys.get(price.currency, [])
+        start = bisect_left(amounts, amount)
+        stop = bisect_right(amounts, amount, start)
+        for position in range(start, stop):
+            if keys[position] == key:
+                del amounts[position]
+                del keys[position]
+                return
+        raise ValueError(f'{key!r} priced {price!r} is not indexed')
+
+    def _bounds(self, price_range):
+        amounts = self._amounts.get(price_range.currency, ())
+        start = bisect_left(amounts, price_range.start.amount)
+        return start, bisect_right(amounts, price_range.stop.amount, start)
+
+    def count_in(self, price_range):
+        """Return the number of keys priced within price_range."""
+        start, stop = self._bounds(price_range)
+        return stop - start
+
+    def keys_in(self, price_range):
+        """Return the keys priced within price_range, cheapest first."""
+        start, stop = self._bounds(price_range)
+        return self._keys.get(price_range.currency, [])[start:stop]
+
+    def items_in(self, price_range):
+        """Return (price, key) pairs priced within price_range, cheapest
+        first."""
+        currency = price_range.currency
+        start, stop = self._bounds(price_range)
+        return self._items(currency, start, stop)
+
+    def cheapest(self, currency, n):
+        """Return the n cheapest (price, key) pairs in currency."""
+        _check_count(n)
+        return self._items(currency, 0, n)
+
+    def most_expensive(self, currency, n):
+        """Return the n most expensive (price, key) pairs in currency, most
+        expensive first."""
+        _check_count(n)
+        size = len(self._keys.get(currency, ()))
+        items = self._items(currency, max(size - n, 0), size)
+        items.reverse()
+        return items
+
+    def _items(self, currency, start, stop):
+        amounts = self._amounts.get(currency, [])[start:stop]
+        keys = self._keys.get(currency, [])[start:stop]
+        return [(Price(amount, currency), key)
+                for amount, key in zip(amounts, keys)]
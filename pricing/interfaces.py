@@ -12,7 +12,9 @@ from zope.interface import Interface, Attribute
 
 __all__ = [
     'ICurrencyFormat',
+    'IFormatCache',
     'IExchangeBackend',
+    'IRateSnapshot',
     'IPrice',
     'IPriceRange',
     'IExchange'
@@ -29,6 +31,43 @@ class ICurrencyFormat(Interface):
     decimal_quantization = Attribute('Quantize decimal')
 
 
+class IFormatCache(Interface):
+    """Cache of formatted price strings."""
+
+    maxsize = Attribute('Maximum number of cached strings')
+    ttl = Attribute('Seconds an entry stays valid, None to never expire')
+
+    def get(key):
+        """Return the cached string for key, or None."""
+
+    def set(key, value):
+        """Cache a formatted string under key."""
+
+    def clear():
+        """Drop every cached string."""
+
+    def stats():
+        """Return hit, miss and size statistics."""
+
+
+class IRateSnapshot(Interface):
+    """Immutable table of exchange rates published by a backend."""
+
+    base = Attribute('Base currency for exchange rates')
+    rates = Attribute('Read-only mapping of currency to rate from base')
+    version = Attribute('Generation of the rates')
+    last_updated = Attribute('When the rates were retrieved')
+
+    def rate(currency):
+        """Return the rate of exchange from the base currency to currency."""
+
+    def quotation(origin, target):
+        """Return a quotation from origin to target currency."""
+
+    def rebase(base):
+        """Return the same rates relative to another base currency."""
+
+
 class IExchangeBackend(Interface):
     """Backend provider for the Exchange, exchange-rates system."""
 
@@ -40,6 +79,18 @@ class IExchangeBackend(Interface):
     def quotation(origin, target):
         """Return a quotation from origin to target currency."""
 
+    def snapshot():
+        """Return the current rate snapshot."""
+
+    def arate(currency):
+        """Coroutine returning the rate of exchange from the base currency."""
+
+    def aquotation(origin, target):
+        """Coroutine returning a quotation from origin to target currency."""
+
+    def asnapshot():
+        """Coroutine returning the current rate snapshot."""
+
 
 class IPrice(Interface):
     """Represents a known quantity of a specific currency."""
@@ -50,9 +101,12 @@ class IPrice(Interface):
     def format(locale='en_US', pattern=None, format_type='standard', **kwargs):
         """Return a locale-aware, currency-formatted string."""
 
-    def to(currency):
+    def to(currency, exchange=None):
         """Return equivalent price object in another currency"""
 
+    def ato(currency, exchange=None):
+        """Coroutine returning equivalent price object in another currency"""
+
 
 class IPriceRange(Interface):
     """Represents a range between start and stop price."""
@@ -81,6 +135,18 @@ class IExchange(Interface):
     def quotation(origin, target):
         """Return quotation between two currencies (origin, target)"""
 
+    def snapshot():
+        """Return the backend's current rate snapshot."""
+
+    def arate(currency):
+        """Coroutine returning quotation between the base and a currency"""
+
+    def aquotation(origin, target):
+        """Coroutine returning quotation between two currencies"""
+
+    def asnapshot():
+        """Coroutine returning the backend's current rate snapshot."""
+
 
 class IBIP21PaymentURI(Interface):
     """A BIP21 Payment URI class."""
@@ -0,0 +1,147 @@
+"""
+pricing.json
+~~~~~~~~~~~~
+
+JSON encoding of prices and price ranges.
+
+Prices are objects of their amount as a string, so Decimal amounts keep
+their exact digits, and their currency, ranges are objects of their start
+and stop prices::
+
+    {"amount": "19.99", "currency": "USD"}
+    {"start": {"amount": "0", ...}, "stop": {"amount": "10", ...}}
+
+`default` and `object_hook` plug into `json.dumps` and `json.loads`, or
+other encoders taking a ``default`` hook, ex: orjson.  `iterencode` streams
+a JSON array from an iterable, encoding it in batches with orjson when
+installed, the standard library otherwise.
+
+Usage::
+
+    >>> json.dumps(Price('19.99', 'USD'), default=default)
+    '{"amount": "19.99", "currency": "USD"}'
+    >>> json.loads('{"amount": "19.99", "currency": "USD"}',
+    ...            object_hook=object_hook)
+    USD 19.99
+    >>> dump_iter(prices, fp)
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from decimal import Decimal
+from functools import partial
+from itertools import islice
+import json
+
+from .price import Price
+from .range import PriceRange
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+__all__ = ['default', 'object_hook', 'PriceEncoder', 'dumps', 'loads',
+           'iterencode', 'dump_iter']
+
+
+def _price(price):
+    return {'amount': str(price.amount), 'currency': price.currency}
+
+
+def default(obj):
+    """Return a JSON serializable form of prices and price ranges, for the
+    ``default`` argument of encoders.
+
+    Decimal amounts outside prices are encoded as strings.
+    """
+    if isinstance(obj, Price):
+        return _price(obj)
+    if isinstance(obj, PriceRange):
+        return {'start': _price(obj.start), 'stop': _price(obj.stop)}
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(
+        f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def object_hook(obj):
+    """Return the price or price range an object decodes to, for the
+    ``object_hook`` argument of `json.loads`.
+
+    Objects with other keys are returned unchanged.
+    """
+    if len(obj) == 2:
+        if 'amount' in obj and 'currency' in obj:
+            return Price(obj['amount'], obj['currency'])
+        start = obj.get('start')
+        stop = obj.get('stop')
+        if isinstance(start, Price) and isinstance(stop, Price):
+            return PriceRange(start, stop)
+    return obj
+
+
+class PriceEncoder(json.JSONEncoder):
+    """`json.JSONEncoder` encoding prices and price ranges."""
+
+    def default(self, obj):
+        try:
+            return default(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+def dumps(obj, **kwargs):
+    """Return obj encoded with `json.dumps`, encoding prices."""
+    kwargs.setdefault('default', default)
+    return json.dumps(obj, **kwargs)
+
+
+def loads(s, **kwargs):
+    """Return s decoded with `json.loads`, decoding prices."""
+    kwargs.setdefault('object_hook', object_hook)
+    return json.loads(s, **kwargs)
+
+
+def _encoder():
+    if orjson is not None:
+        return partial(orjson.dumps, default=default)
+    return partial(json.dumps, default=default, separators=(',', ':'))
+
+
+def iterencode(iterable, encoder=None, batch=1000):
+    """Yield a JSON array of the items of iterable in chunks of text,
+    without holding more than batch items in memory.
+
+    :param encoder: A function returning the JSON of a list as str or
+        bytes, encoding prices, ex: ``partial(json.dumps, cls=PriceEncoder)``.
+        orjson is used when installed, `json.dumps` otherwise.
+    :param batch int: Number of items encoded per call to encoder.
+    """
+    if encoder is None:
+        encoder = _encoder()
+    iterator = iter(iterable)
+    separator = '['
+    while True:
+        items = list(islice(iterator, batch))
+        if not items:
+            break
+        text = encoder([_price(item) if type(item) is Price else item
+                        for item in items])
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        yield separator
+        # Strip the brackets to join the batches into one array.
+        yield text.strip()[1:-1]
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+def dump_iter(iterable, fp, **kwargs):
+    """Write a JSON array of the items of iterable to the text stream fp,
+    as it's encoded by `iterencode`."""
+    write = fp.write
+    for chunk in iterencode(iterable, **kwargs):
+        write(chunk)
@@ -8,20 +8,18 @@ Custom ZCML directive processing.
 :license: MIT, see LICENSE for more details.
 """
 
-from zope.component import provideUtility
-from pricing.formats import CurrencyFormat
-from pricing.interfaces import ICurrencyFormat, IExchange
+from pricing.config import register_currency, register_exchange
 
 
 def _register_currency(name, code, *args):
-    currency = CurrencyFormat(name, code, *args)
-    provideUtility(currency, ICurrencyFormat, name=code)
+    register_currency(code, *args, name=name)
 
 
-def _register_exchange(name, component, backend, base):
-    backend = backend(base)
-    exchange = component(backend)
-    provideUtility(exchange, IExchange, name=name)
+def _register_exchange(name, component, backend, base, sources=None,
+                       default='USD', options=None):
+    register_exchange(backend, base, component, name,
+                      shared=sources is not None, default=default,
+                      sources=sources, **(options or {}))
 
 
 class CurrencyHandler:
@@ -29,6 +27,7 @@ class CurrencyHandler:
 
     def __init__(self, _context, default='USD'):
         self.default = default
+        self.sources = {}
 
     def __call__(self):
         pass
@@ -45,11 +44,18 @@ class CurrencyHandler:
                   decimal_quantization)
             )
 
-    @staticmethod
-    def exchange(_context, component, backend, base, name=''):
-        """Handle exchange subdirectives."""
+    def exchange(self, _context, component, backend, base, name='',
+                 shared=False, path=None):
+        """Handle exchange subdirectives.
+
+        Shared exchanges in the same currency directive use one rate source
+        per backend class and path, based on the directive's default
+        currency.
+        """
+        options = {'path': path} if path else {}
         _context.action(
-            discriminator=('currency', 'exchange', component),
+            discriminator=('currency', 'exchange', name),
             callable=_register_exchange,
-            args=(name, component, backend, base)
+            args=(name, component, backend, base,
+                  self.sources if shared else None, self.default, options)
         )
@@ -61,3 +61,10 @@ class IExchangeDirective(Interface):
         title="Exchange name",
         default='',
         required=False)
+    shared = schema.Bool(
+        title="Share one rate source between exchanges",
+        default=False,
+        required=False)
+    path = fields.Path(
+        title="Path to rates file for file based backends",
+        required=False)
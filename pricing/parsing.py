@@ -0,0 +1,215 @@
+"""
+pricing.parsing
+~~~~~~~~~~~~~~~
+
+Locale-aware parsing of formatted currency strings, the inverse of
+`Price.format`.
+
+Usage::
+
+    >>> parse_price('1.234,57 €', locale='de_DE')
+    EUR 1234.57
+    >>> parse_price('US$ 1,099.98', locale='en_US')
+    USD 1099.98
+    >>> parse_many(['₿0.00123', '-$5'], locale='en_US')
+    [BTC 0.00123, USD -5]
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+from decimal import Decimal
+import re
+
+import attr
+import babel.numbers
+
+from .babel_numbers import get_locale_pack
+from .interfaces import ICurrencyFormat
+from .price import LC_NUMERIC, Price
+from .registry import get_utilities_for
+
+
+__all__ = ['CurrencyParser', 'get_parser', 'parse_price', 'parse_many']
+
+
+SPACES = ' \xa0\u202f'
+MINUS_SIGNS = '-\u2212'
+# Bidirectional marks written around numbers and symbols in RTL locales.
+MARKS = '\u200e\u200f\u061c'
+
+
+def build_trie(symbols):
+    """Return a character trie from a mapping of symbol to currency code."""
+    trie = {}
+    for symbol, code in symbols.items():
+        node = trie
+        for char in symbol:
+            node = node.setdefault(char, {})
+        node[None] = code
+    return trie
+
+
+@attr.s(frozen=True, slots=True)
+class CurrencyParser:
+    """Parses currency strings formatted in a locale.
+
+    Use `get_parser` to obtain the cached parser of a locale.
+
+    :param pack LocalePack: The locale's number formatting data.
+    :param trie dict: Character trie of currency symbols and codes.
+    """
+
+    pack = attr.ib()
+    trie = attr.ib(cmp=False, repr=False)
+    _number_re = attr.ib(init=False, cmp=False, repr=False)
+    _ungroup = attr.ib(init=False, cmp=False, repr=False)
+    _minus = attr.ib(init=False, cmp=False, repr=False)
+
+    def __attrs_post_init__(self):
+        group = self.pack.group
+        groups = SPACES if group in SPACES else group
+        if group in '\u2019\'':
+            groups = '\u2019\''
+        setattr = object.__setattr__
+        setattr(self, '_number_re', re.compile(
+            r'(\d+(?:[{}]\d+)*)(?:{}(\d+))?'.format(
+                re.escape(groups), re.escape(self.pack.decimal))))
+        setattr(self, '_ungroup', str.maketrans('', '', groups))
+        setattr(self, '_minus', frozenset(
+            MINUS_SIGNS + self.pack.minus.strip(MARKS)))
+
+    @classmethod
+    def from_locale(cls, locale, formats=()):
+        """Build a parser from a locale and custom `ICurrencyFormat` s."""
+        pack = get_locale_pack(locale)
+        # International symbols such as US$ come from the root locale and
+        # are overridden by the locale's own symbols.
+        root = get_locale_pack('root')
+        symbols = {
+            symbol: code for code, symbol in root.currency_symbols.items()}
+        # Ambiguous locale symbols resolve to the territory's currency.
+        currencies = sorted(pack.currency_symbols)
+        territory = pack.locale.territory
+        if territory:
+            currencies.extend(
+                babel.numbers.get_territory_currencies(territory))
+        for code in currencies:
+            symbols[pack.currency_symbols.get(code, code)] = code
+        symbols.update((code, code) for code in pack.currency_names)
+        for currency_format in formats:
+            symbols[currency_format.symbol] = currency_format.code
+            symbols[currency_format.code] = currency_format.code
+        return cls(pack, build_trie(symbols))
+
+    def _match_currency(self, text, pos):
+        node, code, end = self.trie, None, pos
+        for index in range(pos, len(text)):
+            node = node.get(text[index])
+            if node is None:
+                break
+            if None in node:
+                code, end = node[None], index + 1
+        return code, end
+
+    @staticmethod
+    def _skip_spaces(text, pos):
+        while pos < len(text) and (
+                text[pos].isspace() or text[pos] in MARKS):
+            pos += 1
+        return pos
+
+    def parse(self, text, currency=None, cls=Price):
+        """Return a price parsed from text.
+
+        :param text str: A formatted currency string, ex: '1.234,57 €'.
+        :param currency str: Currency used when text has no symbol or code.
+        :param cls type: Class of the returned price.
+        :raises ValueError: when text is not a currency string.
+        """
+        skip = self._skip_spaces
+        end = len(text)
+        pos = skip(text, 0)
+        negative = parens = False
+        if pos < end and text[pos] in self._minus:
+            negative, pos = True, skip(text, pos + 1)
+        elif pos < end and text[pos] == '(':
+            negative = parens = True
+            pos = skip(text, pos + 1)
+
+        code, pos = self._match_currency(text, pos)
+        pos = skip(text, pos)
+        if not negative and pos < end and text[pos] in self._minus:
+            negative, pos = True, skip(text, pos + 1)
+
+        match = self._number_re.match(text, pos)
+        if match is None:
+            raise ValueError('failed to parse price: {!r}'.format(text))
+        integer, fraction = match.groups()
+        pos = skip(text, match.end())
+
+        if code is None:
+            code, pos = self._match_currency(text, pos)
+            pos = skip(text, pos)
+        if parens:
+            if pos < end and text[pos] == ')':
+                pos = skip(text, pos + 1)
+            else:
+                pos = -1
+        elif not negative and pos < end and text[pos] in self._minus:
+            negative, pos = True, skip(text, pos + 1)
+        if pos != end:
+            raise ValueError('failed to parse price: {!r}'.format(text))
+
+        code = code or currency
+        if code is None:
+            raise ValueError('no currency in price: {!r}'.format(text))
+        amount = integer.translate(self._ungroup)
+        if fraction:
+            amount = amount + '.' + fraction
+        if negative:
+            amount = '-' + amount
+        return cls(Decimal(amount), code)
+
+    def parse_many(self, texts, currency=None, cls=Price):
+        """Return a list of prices parsed from an iterable of strings."""
+        parse = self.parse
+        return [parse(text, currency, cls) for text in texts]
+
+
+# (registered formats, {locale pack: parser}).  `get_utilities_for` returns
+# the same tuple until the registry's generation changes, so checking it
+# costs an identity test per parse rather than sorting the formats.
+_parsers = ((), {})
+
+
+def get_parser(locale=LC_NUMERIC):
+    """Return the cached `CurrencyParser` of a locale.
+
+    Parsers are rebuilt when the registered `ICurrencyFormat` s change.
+    """
+    global _parsers
+    utilities = get_utilities_for(ICurrencyFormat)
+    registered, parsers = _parsers
+    # Lookups under a local site manager return equal, new tuples.
+    if registered is not utilities and registered != utilities:
+        parsers = {}
+        _parsers = (utilities, parsers)
+    pack = get_locale_pack(locale)
+    try:
+        return parsers[pack]
+    except KeyError:
+        formats = sorted((currency_format for _, currency_format in utilities),
+                         key=lambda f: f.code)
+        parser = parsers[pack] = CurrencyParser.from_locale(pack, formats)
+        return parser
+
+
+def parse_price(text, locale=LC_NUMERIC, currency=None, cls=Price):
+    """Return a price parsed from a string formatted in locale."""
+    return get_parser(locale).parse(text, currency, cls)
+
+
+def parse_many(texts, locale=LC_NUMERIC, currency=None, cls=Price):
+    """Return a list of prices parsed from strings formatted in locale."""
+    return get_parser(locale).parse_many(texts, currency, cls)
@@ -12,25 +12,68 @@ from decimal import Decimal
 import re
 
 from zope.interface import implementer
-from zope.component import queryUtility
 import attr
 from attr.validators import instance_of
 
 import babel
 from . import babel_numbers
-from .interfaces import IPrice, IExchange, ICurrencyFormat
+from .exchange import get_exchange
+from .registry import query_utility
+from .tokens import is_token, lookup as lookup_token
+from .interfaces import IPrice, ICurrencyFormat, IFormatCache
 from .exceptions import (
-    CurrencyMismatch, ExchangeRateNotFound, InvalidOperandType)
+    CurrencyMismatch, ExchangeBackendNotInstalled, ExchangeRateNotFound,
+    InvalidOperandType)
 
 
 LC_NUMERIC = babel.default_locale('LC_NUMERIC')
+CURRENCY_CODE = re.compile(r'^[A-Z]{3}$')
 
-__all__ = ['LC_NUMERIC', 'Price', 'XPrice']
+__all__ = ['LC_NUMERIC', 'CURRENCY_CODE', 'Price', 'XPrice', 'convert',
+           'aconvert']
+
+
+def _literal(text):
+    """Quote text holding number pattern characters, ex: a 1INCH ticker."""
+    if any(char in "0123456789#@,.;%‰'" for char in text):
+        return "'{}'".format(text.replace("'", "''"))
+    return text
 
 
 def sub_symbols(pattern, code, symbol):
     """Substitutes symbols in CLDR number pattern."""
-    return pattern.replace('¤¤', code).replace('¤', symbol)
+    return pattern.replace('¤¤', _literal(code)).replace(
+        '¤', _literal(symbol))
+
+
+def current_exchange(exchange=None):
+    """Return exchange or the current context's exchange."""
+    if exchange is None:
+        exchange = get_exchange()
+        if exchange is None:
+            raise ExchangeBackendNotInstalled()
+    return exchange
+
+
+def format_options(currency, pattern=None, **kwargs):
+    """Return `format_currency` options with the currency's custom format.
+
+    Options of a registered `ICurrencyFormat`, or of a loaded token, fill
+    in any not given.
+    """
+    currency_format = query_utility(ICurrencyFormat, name=currency)
+    if currency_format is None:
+        currency_format = lookup_token(currency)
+    if currency_format:
+        format = pattern or currency_format.format
+        if format is not None:
+            kwargs.setdefault('format', sub_symbols(
+                format, currency_format.code, currency_format.symbol))
+        kwargs.setdefault(
+            'currency_digits', currency_format.currency_digits)
+        kwargs.setdefault(
+            'decimal_quantization', currency_format.decimal_quantization)
+    return kwargs
 
 
 def amount_converter(obj):
@@ -50,7 +93,7 @@ class Price:
 
     :param amount Decimal:
         Amount of units for price. Converts from (str, int, float).
-    :param currency str: A ISO4217 currency code.
+    :param currency str: A ISO4217 currency code, or a loaded token's code.
     :return: a Price object.
     :rtype: :inst:`Price`
 
@@ -74,7 +117,7 @@ class Price:
 
     @currency.validator
     def validate_currency(self, attribute, value):
-        if not bool(re.compile(r'^[A-Z]{3}$').match(value)):
+        if not (CURRENCY_CODE.match(value) or is_token(value)):
             raise ValueError('Invalid currency: {}'.format(value))
 
     def __hash__(self):
@@ -251,11 +294,25 @@ class Price:
     def __composite_values__(self):
         return self.amount, self.currency
 
-    def to(self, currency):
+    def __reduce__(self):
+        # The amount's string round trips exactly and pickles smaller than
+        # a Decimal, the class is only pickled for subclasses.
+        cls = type(self)
+        if cls is Price:
+            return _unpickle, (str(self.amount), self.currency)
+        return _unpickle, (str(self.amount), self.currency, cls)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def to(self, currency, exchange=None):
         """Return equivalent price object in another currency"""
         if currency == self.currency:
             return self
-        exchange = queryUtility(IExchange)
+        exchange = current_exchange(exchange)
         rate = exchange.quotation(self.currency, currency)
         if rate is None:
             raise ExchangeRateNotFound(
@@ -263,6 +320,22 @@ class Price:
         amount = self.amount * rate
         return self.__class__(amount, currency)
 
+    async def ato(self, currency, exchange=None):
+        """Return equivalent price object in another currency.
+
+        Coroutine version of `to`, refreshing rates without blocking the
+        event loop.
+        """
+        if currency == self.currency:
+            return self
+        exchange = current_exchange(exchange)
+        rate = await exchange.aquotation(self.currency, currency)
+        if rate is None:
+            raise ExchangeRateNotFound(
+                exchange.backend_name, self.currency, currency)
+        amount = self.amount * rate
+        return self.__class__(amount, currency)
+
     def format(self, locale=LC_NUMERIC, pattern=None, format_type='standard',
                **kwargs):
         """Return a locale-aware, currency-formatted string.
@@ -290,21 +363,22 @@ class Price:
         http://www.unicode.org/reports/tr35/tr35-numbers.html
         """
 
-        currency_format = queryUtility(ICurrencyFormat, name=self.currency)
-        if currency_format:
-            format = sub_symbols(pattern or currency_format.format,
-                                 currency_format.code, currency_format.symbol)
-            # format = (pattern or currency_format.format).replace(
-            #     '¤¤', currency_format.code).replace(
-            #         '¤', currency_format.symbol)
-            kwargs.setdefault('format', format)
-            kwargs.setdefault(
-                'currency_digits', currency_format.currency_digits)
-            kwargs.setdefault(
-                'decimal_quantization', currency_format.decimal_quantization)
-        return babel_numbers.format_currency(
-            self.amount, self.currency, locale=locale, format_type=format_type,
-            **kwargs)
+        kwargs = format_options(self.currency, pattern, **kwargs)
+        cache = query_utility(IFormatCache)
+        if cache is not None:
+            # The exact amount string keeps ¤¤¤ plural forms correct.
+            key = (str(self.amount), self.currency, locale, format_type,
+                   tuple(sorted(kwargs.items())))
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+        formatter = babel_numbers.compile_formatter(
+            self.currency, locale=locale, format_type=format_type, **kwargs)
+        result = formatter(self.amount)
+        if cache is not None:
+            cache.set(key, result)
+        return result
 
     @classmethod
     def parse(cls, s):
@@ -317,6 +391,16 @@ class Price:
             raise ValueError(
                 "failed to parse string '{}': {}".format(s, err)) from None
 
+    @classmethod
+    def _make(cls, amount, currency):
+        """Return a price of a Decimal amount and a valid currency, without
+        converting or validating them."""
+        price = object.__new__(cls)
+        values = price.__dict__
+        values['amount'] = amount
+        values['currency'] = currency
+        return price
+
 
 @implementer(IPrice)
 @attr.s(frozen=True, hash=False, cmp=False, repr=False)
@@ -352,3 +436,59 @@ class XPrice(Price):
         if isinstance(other, Price):
             other = other.to(self.currency)
         return super(XPrice, self).__divmod__(other)
+
+
+def _unpickle(amount, currency, cls=Price, new=object.__new__):
+    """Rebuild a pickled price like `Price._make`, without validation."""
+    price = new(cls)
+    values = price.__dict__
+    values['amount'] = Decimal(amount)
+    values['currency'] = currency
+    return price
+
+
+def _convert(prices, currency, exchange, quotes):
+    rates = {}
+    converted = []
+    for price in prices:
+        if price.currency == currency:
+            converted.append(price)
+            continue
+        try:
+            rate = rates[price.currency]
+        except KeyError:
+            rate = rates[price.currency] = quotes.quotation(
+                price.currency, currency)
+        if rate is None:
+            raise ExchangeRateNotFound(
+                exchange.backend_name, price.currency, currency)
+        converted.append(price.__class__(price.amount * rate, currency))
+    return converted
+
+
+def convert(prices, currency, exchange=None):
+    """Return a list of prices converted to currency.
+
+    The exchange is resolved once and each origin currency is quoted once
+    from the same rate snapshot, so converting many prices costs one
+    quotation per distinct currency.
+
+    >>> convert([Price('10', 'EUR'), Price('5', 'USD')], 'USD')
+    [USD 11.70, USD 5]
+    """
+    exchange = current_exchange(exchange)
+    snapshot = getattr(exchange, 'snapshot', None)
+    quotes = snapshot() if snapshot is not None else None
+    return _convert(prices, currency, exchange, quotes or exchange)
+
+
+async def aconvert(prices, currency, exchange=None):
+    """Return a list of prices converted to currency.
+
+    Coroutine version of `convert`, refreshing rates without blocking the
+    event loop.
+    """
+    exchange = current_exchange(exchange)
+    asnapshot = getattr(exchange, 'asnapshot', None)
+    quotes = await asnapshot() if asnapshot is not None else None
+    return _convert(prices, currency, exchange, quotes or exchange)
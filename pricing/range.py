@@ -2,21 +2,25 @@
 pricing.range
 ~~~~~~~~~~~
 
-Represents a range in pricing.
+Represents a range in pricing, and sets of ranges.
 
 :copyright: (c) 2018 by Joseph Black.
 :license: MIT, see LICENSE for more details.
 """
 
+from bisect import bisect_right
+from decimal import Decimal
+from operator import itemgetter
+
 from zope.interface import implementer
 import attr
 
 from . import fields
 from .interfaces import IPriceRange
-from .price import Price
+from .price import Price, amount_converter
 
 
-__all__ = ['PriceRange']
+__all__ = ['PriceRange', 'PriceRangeSet']
 
 
 @implementer(IPriceRange)
@@ -88,6 +92,27 @@ class PriceRange:
         """Return the currency of the range."""
         return self.start.currency
 
+    def __reduce__(self):
+        cls = type(self)
+        if cls is PriceRange:
+            return _unpickle, (self.start, self.stop)
+        return _unpickle, (self.start, self.stop, cls)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @classmethod
+    def _make(cls, start, stop):
+        """Return a range of valid prices without validating it."""
+        price_range = object.__new__(cls)
+        values = price_range.__dict__
+        values['start'] = start
+        values['stop'] = stop
+        return price_range
+
     def evolve(self, start=None, stop=None):
         """Return a range with start or stop replaced with given values."""
         if start is None:
@@ -95,3 +120,207 @@ class PriceRange:
         if stop is None:
             stop = self.stop
         return PriceRange(start=start, stop=stop)
+
+
+def _unpickle(start, stop, cls=PriceRange):
+    """Rebuild a pickled range with its trusted constructor."""
+    return cls._make(start, stop)
+
+
+_INFINITY = Decimal('Infinity')
+
+
+class PriceRangeSet:
+    """A normalized set of price ranges.
+
+    Overlapping and adjacent ranges are coalesced, and the remaining ranges
+    are kept sorted per currency, so union, intersection, difference and
+    gaps are linear sweeps over two sorted lists, after one O(n log n)
+    sort on creation.
+
+    Ranges are closed, like `PriceRange`.  With the default step of 0,
+    ranges touching at an end are adjacent, and the pieces left by a
+    difference or the gaps between ranges share their ends with the
+    neighbouring ranges.  With a step, ex: '0.01' for prices in cents,
+    ranges less than a step apart are adjacent and those ends are moved by
+    a step, so 0.00-9.99 and 10.00-19.99 coalesce into 0.00-19.99.
+
+    :param ranges: An iterable of `PriceRange` objects.
+    :param step: Smallest difference between prices, a Decimal, str or int.
+
+    Usage::
+
+        >>> tiers = PriceRangeSet([
+        ...     PriceRange(Price('0', 'USD'), Price('10', 'USD')),
+        ...     PriceRange(Price('5', 'USD'), Price('20', 'USD')),
+        ...     PriceRange(Price('30', 'USD'), Price('40', 'USD'))])
+        >>> list(tiers.gaps())
+        [PriceRange(start=USD 20, stop=USD 30)]
+    """
+
+    __slots__ = ('_intervals', 'step')
+
+    def __init__(self, ranges=(), step=0):
+        self.step = amount_converter(step)
+        columns = {}
+        for price_range in ranges:
+            columns.setdefault(price_range.currency, []).append(
+                (price_range.start.amount, price_range.stop.amount))
+        self._intervals = {
+            currency: self._coalesce(sorted(intervals, key=itemgetter(0)))
+            for currency, intervals in columns.items()}
+
+    @classmethod
+    def _from_intervals(cls, intervals, step):
+        """Return a set of already normalized intervals."""
+        price_set = cls.__new__(cls)
+        price_set._intervals = {
+            currency: items for currency, items in intervals.items() if items}
+        price_set.step = step
+        return price_set
+
+    def _coalesce(self, intervals):
+        """Merge intervals sorted by start that overlap or are adjacent."""
+        step = self.step
+        merged = []
+        for start, stop in intervals:
+            if merged and start <= merged[-1][1] + step:
+                if stop > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], stop)
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def __iter__(self):
+        for currency in sorted(self._intervals):
+            for start, stop in self._intervals[currency]:
+                yield PriceRange(Price(start, currency), Price(stop, currency))
+
+    def __len__(self):
+        return sum(map(len, self._intervals.values()))
+
+    def __bool__(self):
+        return bool(self._intervals)
+
+    def __eq__(self, other):
+        if isinstance(other, PriceRangeSet):
+            return self._intervals == other._intervals
+        return False
+
+    def __repr__(self):
+        return '{}({!r}, step={})'.format(
+            type(self).__name__, list(self), self.step)
+
+    def __contains__(self, item):
+        if not isinstance(item, Price):
+            raise TypeError(
+                f'`in price_range_set` requires Price as lhs not {type(item)}')
+        intervals = self._intervals.get(item.currency, ())
+        position = bisect_right(intervals, (item.amount, _INFINITY))
+        return bool(position) and item.amount <= intervals[position - 1][1]
+
+    @property
+    def currencies(self):
+        """Return the currencies of the ranges."""
+        return frozenset(self._intervals)
+
+    def _check(self, other):
+        if not isinstance(other, PriceRangeSet):
+            other = PriceRangeSet(other, self.step)
+        elif other.step != self.step:
+            raise ValueError(
+                f'Cannot combine sets with steps {self.step} and {other.step}')
+        return other
+
+    def union(self, other):
+        """Return the ranges covered by either set."""
+        other = self._check(other)
+        intervals = dict(self._intervals)
+        for currency, items in other._intervals.items():
+            intervals[currency] = self._coalesce(
+                _merge(intervals.get(currency, []), items))
+        return self._from_intervals(intervals, self.step)
+
+    def intersection(self, other):
+        """Return the ranges covered by both sets."""
+        other = self._check(other)
+        intervals = {}
+        for currency, items in self._intervals.items():
+            others = other._intervals.get(currency, [])
+            result = intervals[currency] = []
+            i = j = 0
+            while i < len(items) and j < len(others):
+                start = max(items[i][0], others[j][0])
+                stop = min(items[i][1], others[j][1])
+                if start <= stop:
+                    result.append((start, stop))
+                if items[i][1] < others[j][1]:
+                    i += 1
+                else:
+                    j += 1
+        return self._from_intervals(intervals, self.step)
+
+    def difference(self, other):
+        """Return the ranges covered by this set but not by other."""
+        other = self._check(other)
+        step = self.step
+        intervals = {}
+        for currency, items in self._intervals.items():
+            others = other._intervals.get(currency, [])
+            result = []
+            j = 0
+            for start, stop in items:
+                # Ranges of other ending before this one can't cut the next.
+                while j < len(others) and others[j][1] < start:
+                    j += 1
+                k = j
+                while start is not None and (
+                        k < len(others) and others[k][0] <= stop):
+                    cut_start, cut_stop = others[k]
+                    if start < cut_start and start <= cut_start - step:
+                        result.append((start, cut_start - step))
+                    start = (None if cut_stop >= stop else
+                             max(start, cut_stop + step))
+                    k += 1
+                if start is not None and start <= stop:
+                    result.append((start, stop))
+            intervals[currency] = self._coalesce(result)
+        return self._from_intervals(intervals, self.step)
+
+    def gaps(self, within=None):
+        """Return the ranges between the ranges of the set.
+
+        :param within: A `PriceRange`, to return the parts of it the set
+            doesn't cover instead, including those before or after the
+            set's ranges.
+        """
+        if within is not None:
+            return PriceRangeSet([within], self.step).difference(self)
+        step = self.step
+        intervals = {}
+        for currency, items in self._intervals.items():
+            intervals[currency] = [
+                (stop + step, start - step)
+                for (_, stop), (start, _) in zip(items, items[1:])
+                if stop + step <= start - step]
+        return self._from_intervals(intervals, step)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+def _merge(a, b):
+    """Merge two lists of intervals sorted by start."""
+    merged = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i][0] <= b[j][0]:
+            merged.append(a[i])
+            i += 1
+        else:
+            merged.append(b[j])
+            j += 1
+    merged.extend(a[i:])
+    merged.extend(b[j:])
+    return merged
@@ -0,0 +1,148 @@
+"""
+pricing.registry
+~~~~~~~~~~~~~~~~
+
+Deferred loading of pricing's ZCML configuration.
+
+Importing `pricing` no longer parses ZCML.  The configuration is loaded by
+`configure`, or implicitly by the first registry lookup made through this
+module.  Implicit configuration only fills in defaults, utilities already
+registered by the application are kept.
+
+Lookups made through `query_utility` and `get_utilities_for` are served
+from a flat dict snapshot of the global registry, so hot paths such as
+`Price.format` and `Price.to` pay one dict lookup.  The snapshot is
+dropped whenever the global registry changes, registrations made with or
+without events alike, and lookups under a local site manager bypass it.
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import threading
+
+from zope.component import getGlobalSiteManager, getSiteManager
+
+
+__all__ = ['configure', 'ensure_configured', 'is_configured',
+           'query_utility', 'get_utilities_for']
+
+
+_lock = threading.RLock()
+_configured = False
+_loading = False
+_registry = getGlobalSiteManager()
+_missing = object()
+
+# (utilities, generation, {(interface, name): utility}) of the global
+# registry.  The utility adapter registry bumps its generation on every
+# registration and unregistration, while provideUtility doesn't notify
+# registration events.  Resetting the registry replaces the adapter
+# registry, and restarts its generation.
+_snapshot = (None, None, {})
+_hook = getSiteManager.original
+
+
+def is_configured():
+    """Return whether pricing's configuration has been loaded."""
+    return _configured
+
+
+def configure(force=False):
+    """Load pricing's ZCML configuration.
+
+    Like importing `pricing` did before, registrations from the package's
+    configure.zcml replace existing ones.  Subsequent calls do nothing
+    unless force is given.
+    """
+    with _lock:
+        if _loading or (_configured and not force):
+            return
+        _configure()
+
+
+def ensure_configured():
+    """Load pricing's configuration, keeping existing registrations."""
+    if _configured:
+        return
+    with _lock:
+        # The loading thread reenters through lookups made by directives.
+        if _configured or _loading:
+            return
+        _configure([(r.component, r.provided, r.name)
+                    for r in _registry.registeredUtilities()])
+
+
+def _configure(existing=()):
+    """Load the configuration and register existing utilities back.
+
+    It's only marked loaded once done, so other threads wait on the lock
+    rather than look up missing utilities, and failures are retried.
+    """
+    global _configured, _loading
+    _loading = True
+    try:
+        _load()
+    finally:
+        _loading = False
+        for component, provided, name in existing:
+            if _registry.queryUtility(provided, name) is not component:
+                _registry.registerUtility(component, provided, name)
+    _configured = True
+
+
+def _load():
+    from zope.configuration import xmlconfig
+    import pricing
+    xmlconfig.file('configure.zcml', pricing)
+
+
+def _table():
+    """Return the snapshot table, or None when lookups must bypass it."""
+    global _snapshot
+    if not _configured:
+        ensure_configured()
+    if getSiteManager.implementation is not _hook:
+        return None
+    utilities = _registry.utilities
+    # The generation is private to zope.interface, without it changes
+    # can't be detected and lookups bypass the snapshot.
+    generation = getattr(utilities, '_generation', None)
+    if generation is None:
+        return None
+    _snapshot = (utilities, generation, {})
+    return _snapshot[2]
+
+
+def query_utility(interface, name='', default=None):
+    """Same as `zope.component.queryUtility`, configuring pricing first."""
+    utilities, generation, table = _snapshot
+    if (utilities is not _registry.utilities
+            or generation != utilities._generation
+            or getSiteManager.implementation is not _hook):
+        table = _table()
+        if table is None:
+            return getSiteManager().queryUtility(interface, name, default)
+    try:
+        utility = table[interface, name]
+    except KeyError:
+        utility = table[interface, name] = _registry.queryUtility(
+            interface, name, _missing)
+    return default if utility is _missing else utility
+
+
+def get_utilities_for(interface):
+    """Return (name, utility) pairs registered for interface."""
+    utilities, generation, table = _snapshot
+    if (utilities is not _registry.utilities
+            or generation != utilities._generation
+            or getSiteManager.implementation is not _hook):
+        table = _table()
+        if table is None:
+            return tuple(getSiteManager().getUtilitiesFor(interface))
+    try:
+        return table[interface, None]
+    except KeyError:
+        utilities = table[interface, None] = tuple(
+            _registry.getUtilitiesFor(interface))
+        return utilities
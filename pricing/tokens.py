@@ -0,0 +1,235 @@
+"""
+pricing.tokens
+~~~~~~~~~~~~~~
+
+Bulk currency formats for tokens.
+
+Registering thousands of token formats one by one, as `ICurrencyFormat`
+utilities or ZCML elements, makes startup time and registry size grow
+linearly.  Token tables are instead read from a JSON or CSV file into one
+indexed table of rows, on the first lookup, and `TokenFormat` objects are
+only built for the tokens actually formatted.
+
+Token tickers don't follow ISO 4217, so codes of loaded tokens, upper case
+letters and digits, from 2 to 12 characters, are accepted as `Price`
+currencies.  Registered `ICurrencyFormat` utilities take precedence over
+token tables.
+
+A JSON file holds a list of objects, a CSV file a header row, with the
+`TokenFormat` fields as keys.  A ``decimals`` key may replace the format,
+tokens with neither show up to 8 decimals::
+
+    code,symbol,name,decimals
+    USDC,USDC,USD Coin,6
+    1INCH,1INCH,1inch,18
+
+Usage::
+
+    >>> from pricing import tokens
+    >>> tokens.load('tokens.csv')
+    >>> Price('1234.5', 'USDC').format('en_US')
+    'USDC1,234.5'
+
+:copyright: (c) 2018 by Joseph Black.
+:license: MIT, see LICENSE for more details.
+"""
+
+import csv
+import json
+import re
+import sys
+import threading
+
+import attr
+from attr.validators import instance_of, optional
+from zope.interface import implementer
+
+from .interfaces import ICurrencyFormat
+
+
+__all__ = ['TOKEN_CODE', 'DEFAULT_FORMAT', 'TokenFormat', 'TokenTable',
+           'read', 'load', 'unload', 'lookup', 'is_token']
+
+
+TOKEN_CODE = re.compile(r'^[A-Z0-9]{2,12}$')
+
+DEFAULT_FORMAT = '¤#,##0.########'
+
+# `TokenFormat` fields of table rows, in order, besides the code key.
+FIELDS = ('name', 'symbol', 'format', 'currency_digits',
+          'decimal_quantization')
+
+_BOOLEANS = {'true': True, '1': True, 'yes': True,
+             'false': False, '0': False, 'no': False}
+
+
+@implementer(ICurrencyFormat)
+@attr.s(frozen=True, slots=True)
+class TokenFormat:
+    """Formatting parameters of a token, like `CurrencyFormat`.
+
+    :param name str: Token name, ex: USD Coin.
+    :param code str: A token ticker, ex: USDC
+    :param symbol str: A token symbol, ex: USDC
+    :param format str: A CLDR compatible currency format pattern.
+    :param currency_digits bool: Zero pad to currency precision if True
+    :param decimal_quantization bool: Decimal Quantization.
+    """
+
+    name: str = attr.ib(
+        validator=instance_of(str))
+    code: str = attr.ib(
+        validator=instance_of(str))
+    symbol: str = attr.ib(
+        validator=instance_of(str))
+    format: str = attr.ib(
+        default=None,
+        validator=optional(instance_of(str)))
+    currency_digits: bool = attr.ib(
+        default=False,
+        validator=instance_of(bool))
+    decimal_quantization: bool = attr.ib(
+        default=True,
+        validator=instance_of(bool))
+
+    @code.validator
+    def validate_code(self, attribute, value):
+        if not TOKEN_CODE.match(value):
+            raise ValueError('Invalid token code: {}'.format(value))
+
+
+def _boolean(value, default):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    try:
+        return _BOOLEANS[str(value).lower()]
+    except KeyError:
+        raise ValueError('Invalid boolean: {!r}'.format(value)) from None
+
+
+def _row(item):
+    """Return the code and the table row of a token definition."""
+    code = item['code']
+    if not TOKEN_CODE.match(code):
+        raise ValueError('Invalid token code: {}'.format(code))
+    format = item.get('format') or None
+    if format is None and item.get('decimals') not in (None, ''):
+        decimals = int(item['decimals'])
+        format = '¤#,##0.' + '#' * decimals if decimals else '¤#,##0'
+    elif format is None:
+        format = DEFAULT_FORMAT
+    # Thousands of tokens share a handful of formats and symbols.
+    return code, (
+        item.get('name') or code,
+        sys.intern(item.get('symbol') or code),
+        sys.intern(format),
+        _boolean(item.get('currency_digits'), False),
+        _boolean(item.get('decimal_quantization'), True))
+
+
+class TokenTable:
+    """Indexed table of token formats.
+
+    Rows are plain tuples of `FIELDS` keyed by code, `TokenFormat` objects
+    are built on lookup and kept.
+    """
+
+    __slots__ = ('_rows', '_formats')
+
+    def __init__(self, rows=None):
+        self._rows = dict(rows or ())
+        self._formats = {}
+
+    @classmethod
+    def from_items(cls, items):
+        """Build a table from token definition mappings, later ones
+        replacing earlier ones with the same code."""
+        return cls(map(_row, items))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, code):
+        return code in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def update(self, other):
+        """Add the rows of other, replacing rows with the same code."""
+        self._rows.update(other._rows)
+        self._formats.clear()
+
+    def lookup(self, code):
+        """Return the `TokenFormat` of code, or None."""
+        try:
+            return self._formats[code]
+        except KeyError:
+            row = self._rows.get(code)
+            if row is None:
+                return None
+            token = self._formats[code] = TokenFormat(
+                code=code, **dict(zip(FIELDS, row)))
+            return token
+
+
+def read(path):
+    """Return the `TokenTable` stored in a JSON or CSV file."""
+    with open(path, encoding='utf-8', newline='') as fp:
+        if path.lower().endswith('.csv'):
+            items = csv.DictReader(fp)
+        else:
+            items = json.load(fp)
+        return TokenTable.from_items(items)
+
+
+_lock = threading.Lock()
+_pending = []
+_table = TokenTable()
+
+
+def load(path, lazy=True):
+    """Use the tokens of the file at path for formatting.
+
+    The file is read on the first token lookup unless lazy is false.
+    Tokens of later loads replace earlier ones with the same code.
+    """
+    with _lock:
+        _pending.append(path)
+    if not lazy:
+        _materialize()
+
+
+def unload():
+    """Forget every loaded token table."""
+    global _table
+    with _lock:
+        del _pending[:]
+        _table = TokenTable()
+
+
+def _materialize():
+    global _table
+    with _lock:
+        if not _pending:
+            return _table
+        table = TokenTable(_table._rows)
+        for path in _pending:
+            table.update(read(path))
+        del _pending[:]
+        _table = table
+        return table
+
+
+def lookup(code):
+    """Return the loaded `TokenFormat` of code, or None."""
+    table = _materialize() if _pending else _table
+    return table.lookup(code)
+
+
+def is_token(code):
+    """Return whether code is the code of a loaded token."""
+    table = _materialize() if _pending else _table
+    return code in table
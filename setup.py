@@ -44,6 +44,7 @@ setup(
     license='MIT',
     packages=find_packages(),
     zip_safe=False,
+    python_requires='>=3.7',
     install_requires=[
         'zope.interface>=4.5.0',
         'zope.configuration>=4.1.0',
@@ -54,14 +55,17 @@ setup(
         'babel>=2.5.3',
         'boltons>=18.0.0',
     ],
+    extras_require={
+        'async': ['aiohttp>=3.3'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
         'Operating System :: OS Independent',
         'Natural Language :: English',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3 :: Only',
         'Topic :: Internet :: WWW/HTTP',
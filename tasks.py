@@ -10,6 +10,11 @@ def test(ctx):
     ctx.run('pytest')
 
 
+@task
+def bench(ctx):
+    ctx.run('for f in benchmarks/bench_*.py; do python "$f"; done')
+
+
 @task
 def check(ctx):
     ctx.run('pyroma .')
@@ -6,6 +6,7 @@ Price unittests as mixins for Price and subclasses
 import abc
 from decimal import Decimal, InvalidOperation
 import collections
+import copy
 import unittest
 import pickle
 import babel
@@ -79,6 +80,20 @@ class ClassMixin(object):
     def test_pickable(self):
         self.assertEqual(pickle.loads(pickle.dumps(self.price)), self.price)
 
+    def test_pickle_exact(self):
+        cls = type(self.price)
+        for amount in ('-0.00', '1.2E+5', 'NaN', '-Infinity'):
+            price = cls(amount, 'XXX')
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                unpickled = pickle.loads(pickle.dumps(price, protocol))
+                self.assertIs(type(unpickled), cls)
+                self.assertEqual(repr(unpickled), repr(price))
+
+    def test_copy(self):
+        self.assertIs(copy.copy(self.price), self.price)
+        self.assertIs(copy.deepcopy(self.price), self.price)
+        self.assertIs(copy.deepcopy([self.price])[0], self.price)
+
     def test_sqlalchemy_composite_values(self):
         self.assertEqual((self.price.amount, self.price.currency), self.price.__composite_values__())
 
@@ -0,0 +1,113 @@
+from decimal import Decimal
+import random
+import unittest
+
+from pricing import Price, PriceRange
+from pricing.arrays import PriceRangeArray
+from pricing.exceptions import CurrencyMismatch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_ranges(rnd, count, currency='USD'):
+    ranges = []
+    for _ in range(count):
+        start = Decimal(rnd.randint(-1000, 1000)).scaleb(-rnd.randint(0, 3))
+        stop = start + Decimal(rnd.randint(0, 500)).scaleb(-2)
+        ranges.append(
+            PriceRange(Price(start, currency), Price(stop, currency)))
+    return ranges
+
+
+class TestPriceRangeArray(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(45)
+        self.ranges = make_ranges(self.rnd, 200)
+        self.array = PriceRangeArray.from_ranges(self.ranges)
+
+    def test_from_ranges(self):
+        self.assertEqual(len(self.array), 200)
+        self.assertEqual(self.array.scale, 3)
+        self.assertEqual(self.array.to_ranges(), self.ranges)
+        self.assertEqual(self.array[7], self.ranges[7])
+        empty = PriceRangeArray.from_ranges([], currency='EUR')
+        self.assertEqual((len(empty), empty.currency), (0, 'EUR'))
+        self.assertEqual(list(empty.contains(Price('1', 'EUR'))), [])
+
+    def test_shift(self):
+        for shift in (Price('1.25', 'USD'), Price('-0.00001', 'USD')):
+            self.assertEqual(
+                (self.array + shift).to_ranges(),
+                [price_range + shift for price_range in self.ranges])
+            self.assertEqual(
+                (self.array - shift).to_ranges(),
+                [price_range - shift for price_range in self.ranges])
+        self.assertEqual(self.array.shift(Price('1', 'USD')),
+                         self.array + Price('1', 'USD'))
+        with self.assertRaises(CurrencyMismatch):
+            self.array + Price('1', 'EUR')
+
+    def test_contains(self):
+        for price in (Price('0', 'USD'), self.ranges[3].stop,
+                      Price('1.0001', 'USD'), Price('-5.2', 'USD')):
+            self.assertEqual(
+                list(self.array.contains(price)),
+                [price in price_range for price_range in self.ranges])
+        prices = [Price(Decimal(self.rnd.randint(-1000, 1000)).scaleb(-2),
+                        'USD') for _ in self.ranges]
+        self.assertEqual(
+            list(self.array.contains(prices)),
+            [price in price_range
+             for price, price_range in zip(prices, self.ranges)])
+        with self.assertRaises(ValueError):
+            self.array.contains(prices[:3])
+
+    def test_intersection(self):
+        others = make_ranges(self.rnd, 200)
+        other = PriceRangeArray.from_ranges(others)
+        mask = list(self.array.overlaps(other))
+        expected = [
+            PriceRange(max(a.start, b.start), min(a.stop, b.stop))
+            for a, b, overlap in zip(self.ranges, others, mask) if overlap]
+        self.assertEqual(
+            [a.start <= b.stop and b.start <= a.stop
+             for a, b in zip(self.ranges, others)], mask)
+        self.assertEqual(
+            self.array.compress(mask).intersection(
+                other.compress(mask)).to_ranges(), expected)
+        self.assertTrue(any(mask) and not all(mask))
+        with self.assertRaises(ValueError):
+            self.array.intersection(other)
+
+    def test_validation(self):
+        with self.assertRaisesRegex(ValueError, 'at row 1$'):
+            PriceRangeArray('USD', [1, 5, 3], [2, 4, 3])
+        if numpy is not None:
+            with self.assertRaisesRegex(ValueError, 'at row 2$'):
+                PriceRangeArray('USD', numpy.array([1, 2, 5]),
+                                numpy.array([2, 4, 3]))
+            with self.assertRaisesRegex(ValueError, 'at row 0$'):
+                PriceRangeArray('USD', [2 ** 70], [2 ** 69])
+        with self.assertRaises(ValueError):
+            PriceRangeArray('USD', [1, 5], [2])
+        with self.assertRaises(ValueError):
+            PriceRangeArray.from_ranges([
+                PriceRange(Price('1', 'USD'), Price('Infinity', 'USD'))])
+        with self.assertRaises(CurrencyMismatch):
+            PriceRangeArray.from_ranges(
+                self.ranges + make_ranges(self.rnd, 1, 'EUR'))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_overflow(self):
+        self.assertEqual(self.array.starts.dtype, numpy.int64)
+        huge = Price(2 ** 70, 'USD')
+        shifted = self.array + huge
+        self.assertEqual(shifted.starts.dtype, object)
+        self.assertEqual(
+            shifted.to_ranges(),
+            [price_range + huge for price_range in self.ranges])
+        self.assertEqual(
+            list(self.array.contains(huge)), [False] * len(self.ranges))
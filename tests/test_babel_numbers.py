@@ -1,4 +1,12 @@
-from pricing.babel_numbers import format_currency
+from decimal import Decimal
+import random
+
+import attr
+import babel.numbers
+
+from pricing.babel_numbers import (
+    LocalePack, _currency_names_plural, _public_currency_names_plural,
+    compile_formatter, format_currency, get_locale_pack, parse_pattern)
 from babel.core import Locale
 
 import unittest
@@ -36,3 +44,207 @@ class TestBabelNumbers(unittest.TestCase):
             format_currency('42.23423432', 'USD', locale=locale,
                             currency_digits=True, decimal_quantization=True),
             '$42.23')
+
+
+class TestLocalePack(unittest.TestCase):
+    locales = ['en_US', 'de_DE', 'fr_FR', 'ja_JP', 'ar_EG', 'ru_RU']
+    currencies = ['USD', 'EUR', 'JPY', 'BHD', 'RUB', 'XXX', 'ZZZ']
+
+    def test_shared(self):
+        pack = get_locale_pack('de_DE')
+        self.assertIs(get_locale_pack('de_DE'), pack)
+        self.assertIs(get_locale_pack(Locale.parse('de_DE')), pack)
+        self.assertIs(get_locale_pack(pack), pack)
+        self.assertEqual(pack.decimal, ',')
+        self.assertEqual(pack.group, '.')
+
+    def test_immutable(self):
+        pack = get_locale_pack('en_US')
+        with self.assertRaises(AttributeError):
+            pack.decimal = ','
+        with self.assertRaises(TypeError):
+            pack.currency_symbols['USD'] = 'US$'
+
+    def test_matches_babel(self):
+        for locale in self.locales:
+            pack = get_locale_pack(locale)
+            for currency in self.currencies:
+                self.assertEqual(
+                    pack.currency_symbol(currency),
+                    babel.numbers.get_currency_symbol(currency, locale))
+                self.assertEqual(
+                    pack.currency_precision(currency),
+                    babel.numbers.get_currency_precision(currency))
+                for count in (None, 0, 1, 2, 5, Decimal('1.5'), 21):
+                    self.assertEqual(
+                        pack.currency_name(currency, count),
+                        babel.numbers.get_currency_name(
+                            currency, count, locale))
+
+    def test_quoted_literals(self):
+        patterns = ["¤#,##0.00' net'", "'Total: '¤#,##0.00",
+                    "#,##0.00 ¤ 'o''clock'", "¤''#,##0.00", "#,##0.00 ¤¤"]
+        for locale in ('en_US', 'de_CH', 'fr_FR'):
+            for currency in ('USD', 'CHF', 'JPY'):
+                for format in patterns:
+                    expected = babel.numbers.format_currency(
+                        '-1234.5', currency, format, locale=locale)
+                    self.assertEqual(
+                        format_currency('-1234.5', currency, format,
+                                        locale=locale),
+                        expected, (format, locale, currency))
+                    self.assertEqual(
+                        compile_formatter(currency, format, locale)(
+                            Decimal('-1234.5')),
+                        expected, (format, locale, currency))
+                self.assertEqual(
+                    format_currency('1234.5', currency, locale=locale),
+                    babel.numbers.format_currency(
+                        '1234.5', currency, locale=locale))
+
+    def test_public_currency_names_plural(self):
+        for identifier in ('en_US', 'ru_RU', 'ar_EG', 'cy_GB', 'sl_SI'):
+            locale = Locale.parse(identifier)
+            pack = attr.evolve(
+                LocalePack.from_locale(locale),
+                currency_names_plural=_public_currency_names_plural(locale))
+            for currency in ('USD', 'EUR', 'RUB', 'XAU'):
+                for count in list(range(25)) + [101, 1000000, Decimal('1.5')]:
+                    self.assertEqual(
+                        pack.currency_name(currency, count),
+                        babel.numbers.get_currency_name(
+                            currency, count, identifier),
+                        (identifier, currency, count))
+
+    def test_currency_names_plural_without_data(self):
+        locale = Locale.parse('ru_RU')
+
+        class PublicLocale:
+            """Locale without babel's private data."""
+            plural_form = locale.plural_form
+            currencies = locale.currencies
+
+            def __str__(self):
+                return 'ru_RU'
+
+        names = _currency_names_plural(PublicLocale())
+        for code, forms in locale._data['currency_names_plural'].items():
+            for form, name in forms.items():
+                self.assertEqual(names[code][form], name, (code, form))
+
+    def test_format_with_pack(self):
+        pack = get_locale_pack('de_DE')
+        self.assertEqual(
+            format_currency('1099.98', 'EUR', locale=pack),
+            format_currency('1099.98', 'EUR', locale='de_DE'))
+        self.assertEqual(
+            format_currency('-1099.98', 'EUR', '#,##0.00 ¤¤¤', locale=pack),
+            '-1.099,98 Euro')
+        for number in ('1234.5', '-0.00012'):
+            self.assertEqual(
+                format_currency(number, 'EUR', '#,##0.###E+00', locale=pack),
+                babel.numbers.format_currency(
+                    number, 'EUR', '#,##0.###E+00', locale='de_DE'))
+
+
+class TestFixedPointFastPath(unittest.TestCase):
+    """The integer fast path must match the generic implementation."""
+
+    locales = ['en_US', 'de_DE', 'fr_FR', 'hi_IN', 'ja_JP', 'es_CO', 'de_CH']
+    currencies = ['USD', 'JPY', 'BHD', 'INR']
+    patterns = [
+        None, '¤#,##0.00', '#,##0.00 ¤¤', '¤#,##0.00;(¤#,##0.00)',
+        '#,##,##0.00 ¤', '¤ #,##0', '#,##0.00 ¤¤¤', '¤#,##0.########',
+        '#,##0.###', '0.00 ¤', '#,##0.0000 ¤']
+
+    @staticmethod
+    def render(func, *args):
+        try:
+            return func(*args)
+        except (ArithmeticError, ValueError) as err:
+            return type(err)
+
+    def make_values(self):
+        rnd = random.Random(31)
+        values = [
+            Decimal('0'), Decimal('-0'), Decimal('0.005'), Decimal('0.015'),
+            Decimal('-0.004'), Decimal('1'), Decimal('999.995'),
+            Decimal('1000'), Decimal('-1234567.891'), Decimal('1E+3'),
+            Decimal('100000000000000000000.01'), Decimal('12.5'),
+            Decimal('0.0000001'), 1099.98, '42.23423432', 7]
+        for _ in range(60):
+            digits = rnd.randint(1, 16)
+            exponent = rnd.randint(-8, 2)
+            sign = rnd.choice([-1, 1])
+            values.append(
+                Decimal(sign * rnd.randrange(10 ** digits)).scaleb(exponent))
+        return values
+
+    def test_matches_generic(self):
+        values = self.make_values()
+        for locale in self.locales:
+            locale = get_locale_pack(locale)
+            for format in self.patterns:
+                if format is None:
+                    format = locale.currency_formats['standard'].pattern
+                pattern = parse_pattern(format)
+                self.assertTrue(pattern.fixed_point)
+                for currency in self.currencies:
+                    for currency_digits in (True, False):
+                        for value in values:
+                            args = (value, locale, currency, currency_digits,
+                                    True)
+                            self.assertEqual(
+                                self.render(pattern.apply, *args),
+                                self.render(
+                                    pattern._apply_generic,
+                                    Decimal(str(value)), *args[1:]),
+                                (format, args))
+
+    def test_compiled_matches_apply(self):
+        values = self.make_values() + [Decimal('NaN'), Decimal('-Infinity')]
+        for locale in self.locales:
+            locale = get_locale_pack(locale)
+            for format in self.patterns:
+                pattern = parse_pattern(
+                    format or locale.currency_formats['standard'])
+                for currency in self.currencies:
+                    for currency_digits in (True, False):
+                        formatter = compile_formatter(
+                            currency, format, locale, currency_digits)
+                        for value in values:
+                            self.assertEqual(
+                                self.render(formatter, value),
+                                self.render(
+                                    pattern.apply, value, locale, currency,
+                                    currency_digits),
+                                (format, locale, currency, value))
+                            fixed = getattr(formatter, 'fixed', None)
+                            value = Decimal(str(value))
+                            if fixed is None or not value.is_finite():
+                                continue
+                            pieces = []
+                            fixed.write(pieces.append, value)
+                            self.assertEqual(
+                                ''.join(pieces), formatter(value),
+                                (format, locale, currency, value))
+
+    def test_compiled_cache(self):
+        formatter = compile_formatter('EUR', locale='de_DE')
+        self.assertIs(compile_formatter('EUR', locale='de_DE'), formatter)
+        self.assertIn("'\\xa0€'", formatter.source)
+        self.assertEqual(formatter(Decimal('-1234.5')), '-1.234,50\xa0€')
+
+    def test_compiled_fallback(self):
+        for format in ('#,##0.00 ¤¤¤', '#E0 ¤', '@@@ ¤', '¤#,##0.##'):
+            formatter = compile_formatter(
+                'EUR', format, 'en_US', currency_digits=False)
+            self.assertFalse(hasattr(formatter, 'source'), format)
+            self.assertEqual(
+                formatter('1099.985'),
+                format_currency('1099.985', 'EUR', format, 'en_US',
+                                currency_digits=False))
+
+    def test_non_fixed_patterns(self):
+        for format in ('¤000000.00', '@@@ ¤', '#E0 ¤'):
+            self.assertFalse(parse_pattern(format).fixed_point)
@@ -0,0 +1,173 @@
+from decimal import Decimal
+import random
+import unittest
+
+from pricing import Price, PriceRange
+from pricing.buckets import Bucket, Bucketizer
+from pricing.exceptions import CurrencyMismatch, ExchangeRateNotFound
+from pricing.exchange import RateSnapshot
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+BOUNDARIES = ['0', '10', '25', '100', 'Infinity']
+
+
+def expected_index(amount):
+    for i, (start, stop) in enumerate(zip(BOUNDARIES, BOUNDARIES[1:])):
+        if Decimal(start) <= amount < Decimal(stop):
+            return i
+    return None
+
+
+class TestBucketizer(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(47)
+        self.cents = [self.rnd.randint(-500, 20000) for _ in range(500)]
+        self.prices = [Price(Decimal(cents).scaleb(-2), 'USD')
+                       for cents in self.cents]
+        self.bucketizer = Bucketizer(BOUNDARIES, 'USD')
+
+    def test_assign(self):
+        self.assertEqual(len(self.bucketizer), 4)
+        self.assertEqual(
+            self.bucketizer.assign(self.prices),
+            [expected_index(price.amount) for price in self.prices])
+        self.assertEqual(self.bucketizer.bucket(Price('10', 'USD')), 1)
+        self.assertEqual(self.bucketizer.bucket(Price('9.99', 'USD')), 0)
+        self.assertIsNone(self.bucketizer.bucket(Price('-0.01', 'USD')))
+        self.assertEqual(self.bucketizer.bucket(Price('1e9', 'USD')), 3)
+
+    def test_histogram(self):
+        buckets = self.bucketizer.histogram(self.prices)
+        for i, bucket in enumerate(buckets):
+            amounts = [price.amount for price in self.prices
+                       if expected_index(price.amount) == i]
+            self.assertEqual(bucket.count, len(amounts))
+            self.assertEqual(bucket.total, Price(sum(amounts), 'USD'))
+            self.assertEqual(bucket.minimum, Price(min(amounts), 'USD'))
+            self.assertEqual(bucket.maximum, Price(max(amounts), 'USD'))
+        self.assertEqual(
+            buckets[1].range, PriceRange(Price('10', 'USD'),
+                                         Price('25', 'USD')))
+        self.assertEqual(
+            self.bucketizer.histogram([])[0],
+            Bucket(PriceRange(Price('0', 'USD'), Price('10', 'USD')), 0,
+                   Price('0', 'USD')))
+
+    def test_from_ranges(self):
+        bucketizer = Bucketizer.from_ranges([
+            PriceRange(Price('0', 'USD'), Price('9.99', 'USD')),
+            PriceRange(Price('20', 'USD'), Price('50', 'USD'))])
+        self.assertEqual(
+            bucketizer.assign([Price(amount, 'USD') for amount in
+                               ('0', '9.99', '15', '20', '50', '50.01')]),
+            [0, 0, None, 1, 1, None])
+        with self.assertRaises(ValueError):
+            Bucketizer.from_ranges([
+                PriceRange(Price('0', 'USD'), Price('10', 'USD')),
+                PriceRange(Price('10', 'USD'), Price('50', 'USD'))])
+        with self.assertRaises(CurrencyMismatch):
+            Bucketizer.from_ranges([
+                PriceRange(Price('0', 'USD'), Price('10', 'USD')),
+                PriceRange(Price('20', 'EUR'), Price('50', 'EUR'))])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Bucketizer(['0', '10'])
+        with self.assertRaises(ValueError):
+            Bucketizer(['10', '0'], 'USD')
+        with self.assertRaises(ValueError):
+            Bucketizer(['10'], 'USD')
+        with self.assertRaises(CurrencyMismatch):
+            Bucketizer([Price('0', 'USD'), Price('10', 'EUR')])
+        self.assertEqual(
+            Bucketizer([Price('0', 'EUR'), Price('10', 'EUR')]).currency,
+            'EUR')
+
+    def test_exchange(self):
+        snapshot = RateSnapshot('USD', {'EUR': '0.5', 'GBP': '0.25'})
+        prices = [Price('4', 'EUR'), Price('20', 'USD'), Price('5', 'GBP')]
+        self.assertEqual(
+            self.bucketizer.assign(prices, exchange=snapshot), [0, 1, 1])
+        buckets = self.bucketizer.histogram(prices, exchange=snapshot)
+        self.assertEqual(buckets[1].total, Price('40', 'USD'))
+        self.assertEqual(buckets[1].minimum, Price('20', 'USD'))
+        with self.assertRaises(CurrencyMismatch):
+            self.bucketizer.assign(prices)
+        with self.assertRaises(ExchangeRateNotFound):
+            self.bucketizer.assign([Price('1', 'JPY')], exchange=snapshot)
+
+    def test_column(self):
+        expected = self.bucketizer.histogram(self.prices)
+        self.assertEqual(
+            self.bucketizer.histogram_column(self.cents, minor_digits=2),
+            expected)
+        self.assertEqual(
+            self.bucketizer.assign_column(self.cents, minor_digits=2),
+            self.bucketizer.assign(self.prices))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_column(self):
+        cents = numpy.array(self.cents, dtype=numpy.int64)
+        self.assertEqual(
+            self.bucketizer.histogram_column(cents, minor_digits=2),
+            self.bucketizer.histogram(self.prices))
+        self.assertEqual(
+            list(self.bucketizer.assign_column(cents, minor_digits=2)),
+            [-1 if i is None else i
+             for i in self.bucketizer.assign(self.prices)])
+        bucketizer = Bucketizer.from_ranges([
+            PriceRange(Price('0.005', 'USD'), Price('9.995', 'USD'))])
+        self.assertEqual(
+            list(bucketizer.assign_column(
+                numpy.array([0, 1, 999, 1000]), minor_digits=2)),
+            [-1, 0, 0, -1])
+        floats = numpy.array([-1.0, 0.0, 9.5, 10.0, 150.25])
+        self.assertEqual(
+            list(self.bucketizer.assign_column(floats)), [-1, 0, 0, 1, 3])
+        buckets = self.bucketizer.histogram_column(floats)
+        self.assertEqual(buckets[0].total, Price('9.5', 'USD'))
+        self.assertEqual(buckets[3].maximum, Price('150.25', 'USD'))
+        self.assertIsNone(buckets[2].minimum)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_overflow(self):
+        large = numpy.array([2 ** 63 + 5, 5], dtype=numpy.uint64)
+        prices = [Price(value, 'USD') for value in large.tolist()]
+        self.assertEqual(list(self.bucketizer.assign_column(large)), [3, 0])
+        self.assertEqual(self.bucketizer.assign(prices), [3, 0])
+        self.assertEqual(self.bucketizer.histogram_column(large),
+                         self.bucketizer.histogram(prices))
+        values = numpy.array([2 ** 62, 2 ** 62, -5])
+        buckets = self.bucketizer.histogram_column(values, minor_digits=2)
+        self.assertEqual(
+            buckets[3].total, Price(Decimal(2 ** 63) / 100, 'USD'))
+        self.assertEqual(
+            buckets, self.bucketizer.histogram(
+                Price(Decimal(value).scaleb(-2), 'USD')
+                for value in values.tolist()))
+        self.assertEqual(
+            list(self.bucketizer.assign_column(values, minor_digits=2)),
+            [3, 3, -1])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_scalars(self):
+        expected = self.bucketizer.assign(self.prices)
+        scalars = [numpy.int64(cents) for cents in self.cents]
+        objects = numpy.array(self.cents, dtype=object)
+        objects[0] = numpy.int64(objects[0])
+        for values in (scalars, objects):
+            self.assertEqual(
+                list(self.bucketizer.assign_column(values, minor_digits=2)),
+                expected)
+            self.assertEqual(
+                self.bucketizer.histogram_column(values, minor_digits=2),
+                self.bucketizer.histogram(self.prices))
+        self.assertEqual(
+            list(self.bucketizer.assign_column([numpy.int64(5)], 2)), [0])
+        self.assertEqual(
+            list(self.bucketizer.assign_column([numpy.float64(30.5)])), [2])
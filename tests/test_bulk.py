@@ -0,0 +1,138 @@
+import csv
+from decimal import Decimal
+import io
+import random
+import unittest
+
+from pricing import Price
+from pricing.bulk import format_column, format_into, write_column
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestFormatColumn(unittest.TestCase):
+    locales = ['en_US', 'de_DE', 'hi_IN', 'ja_JP', 'fr_CH']
+    currencies = ['USD', 'JPY', 'BHD', 'INR', 'BTC']
+
+    def make_minor_units(self):
+        rnd = random.Random(36)
+        return [0, 1, -1, 99, -100, 123456789, 10 ** 17, -(10 ** 16) + 7] + [
+            rnd.randint(-10 ** 12, 10 ** 12) for _ in range(40)]
+
+    def expected(self, values, currency, locale, minor_digits, **kwargs):
+        return [
+            Price(Decimal(value).scaleb(-minor_digits), currency).format(
+                locale, **kwargs)
+            for value in values]
+
+    def test_minor_units_match_price_format(self):
+        values = self.make_minor_units()
+        for locale in self.locales:
+            for currency in self.currencies:
+                for minor_digits in (0, 2, 3):
+                    self.assertEqual(
+                        format_column(values, currency, locale,
+                                      minor_digits=minor_digits),
+                        self.expected(values, currency, locale,
+                                      minor_digits),
+                        (locale, currency, minor_digits))
+
+    def test_major_units(self):
+        values = ['9.99', Decimal('-19.995'), 7, 1.5, Decimal('1E+3')]
+        self.assertEqual(
+            format_column(values, 'EUR', 'de_DE'),
+            [Price(value, 'EUR').format('de_DE') for value in values])
+        self.assertEqual(
+            format_column([5, -3], 'USD', 'en_US'), ['$5.00', '-$3.00'])
+
+    def test_options(self):
+        values = [12345, -6]
+        for kwargs in ({'format': '#,##0.00 ¤¤'},
+                       {'format': '#,##0.## ¤¤¤', 'currency_digits': False},
+                       {'format_type': 'accounting'},
+                       {'decimal_quantization': False}):
+            self.assertEqual(
+                format_column(values, 'USD', 'en_US', minor_digits=2,
+                              **kwargs),
+                self.expected(values, 'USD', 'en_US', 2, **kwargs), kwargs)
+
+    def test_iterator(self):
+        self.assertEqual(
+            format_column(iter([100, 250]), 'USD', 'en_US', minor_digits=2),
+            ['$1.00', '$2.50'])
+
+    def test_write_column(self):
+        fd = io.StringIO()
+        write_column(csv.writer(fd), [999, -5], 'USD', 'en_US',
+                     minor_digits=2)
+        self.assertEqual(fd.getvalue(), '$9.99\r\n-$0.05\r\n')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        values = self.make_minor_units()[:-2] + [2 ** 62, -(2 ** 62)]
+        for dtype in ('int64', 'int32', 'uint64', 'object'):
+            array = numpy.array(
+                [abs(value) if dtype == 'uint64' else value
+                 for value in values
+                 if dtype != 'int32' or abs(value) < 2 ** 31], dtype=dtype)
+            self.assertEqual(
+                format_column(array, 'INR', 'hi_IN', minor_digits=2),
+                self.expected(array.tolist(), 'INR', 'hi_IN', 2), dtype)
+        array = numpy.array([1.5, -2.25])
+        self.assertEqual(
+            format_column(array, 'USD', 'en_US'), ['$1.50', '-$2.25'])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_fallback(self):
+        values = [123456789, -5, 0]
+        array = numpy.array(values, dtype=numpy.int64)
+        self.assertEqual(
+            format_column(array, 'BTC', 'en_US', minor_digits=8),
+            self.expected(values, 'BTC', 'en_US', 8))
+        self.assertEqual(
+            format_column(array, 'USD', 'en_US', minor_digits=2,
+                          decimal_quantization=False),
+            self.expected(values, 'USD', 'en_US', 2,
+                          decimal_quantization=False))
+        self.assertEqual(
+            format_column(array, 'USD', 'en_US', minor_digits=3),
+            self.expected(values, 'USD', 'en_US', 3))
+        self.assertEqual(
+            format_column(list(array), 'USD', 'en_US', minor_digits=3),
+            self.expected(values, 'USD', 'en_US', 3))
+
+
+class TestFormatInto(unittest.TestCase):
+    def make_prices(self):
+        rnd = random.Random(38)
+        prices = [Price('-0', 'USD'), Price('NaN', 'EUR'),
+                  Price('1234.5', 'BTC'), Price('7', 'JPY')]
+        for _ in range(50):
+            prices.append(Price(
+                Decimal(rnd.randint(-10 ** 9, 10 ** 9)).scaleb(-3),
+                rnd.choice(['USD', 'EUR', 'INR', 'BHD', 'ETH'])))
+        return prices
+
+    def test_matches_price_format(self):
+        prices = self.make_prices()
+        for locale in ('en_US', 'de_DE', 'hi_IN'):
+            for kwargs in ({}, {'format': '¤¤ #,##0.00'},
+                           {'format': '#,##0.## ¤¤¤'}):
+                fd = io.StringIO()
+                self.assertEqual(
+                    format_into(fd, prices, locale, **kwargs), len(prices))
+                self.assertEqual(
+                    fd.getvalue(),
+                    ''.join(price.format(locale, **kwargs) + '\n'
+                            for price in prices), (locale, kwargs))
+
+    def test_list_buffer(self):
+        buffer = []
+        count = format_into(buffer, [Price('-1234.5', 'USD')], 'en_US',
+                            end='')
+        self.assertEqual(count, 1)
+        self.assertEqual(buffer, ['-$', '1,234', '.50', ''])
+        self.assertEqual(format_into(buffer, [], 'en_US'), 0)
@@ -0,0 +1,111 @@
+from decimal import Decimal
+import threading
+import unittest
+from unittest import mock
+
+from zope.component import getGlobalSiteManager, provideUtility
+
+from pricing import Price, config
+from pricing.cache import FormatCache
+from pricing.interfaces import ICurrencyFormat, IFormatCache
+
+
+class TestFormatCache(unittest.TestCase):
+    def test_provides(self):
+        self.assertTrue(IFormatCache.providedBy(FormatCache()))
+
+    def test_lru(self):
+        cache = FormatCache(maxsize=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        self.assertEqual(cache.get('a'), '1')
+        cache.set('c', '3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1')
+        self.assertEqual(cache.get('c'), '3')
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions),
+                         (3, 1, 1))
+        self.assertEqual(stats.size, 2)
+        self.assertEqual(stats.hit_rate, 0.75)
+
+    def test_ttl(self):
+        cache = FormatCache(ttl=10)
+        with mock.patch('pricing.cache.time.monotonic', return_value=100):
+            cache.set('a', '1')
+        with mock.patch('pricing.cache.time.monotonic', return_value=109):
+            self.assertEqual(cache.get('a'), '1')
+        with mock.patch('pricing.cache.time.monotonic', return_value=110):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        cache = FormatCache()
+        cache.set('a', '1')
+        cache.get('a')
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats().hits, 0)
+        self.assertEqual(cache.stats().size, 0)
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            FormatCache(maxsize=0)
+
+    def test_threads(self):
+        cache = FormatCache(maxsize=50)
+
+        def work(offset):
+            for i in range(2000):
+                key = (offset + i) % 100
+                if cache.get(key) is None:
+                    cache.set(key, str(key))
+
+        threads = [threading.Thread(target=work, args=(n * 7,))
+                   for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 16000)
+        self.assertLessEqual(stats.size, 50)
+
+
+class TestPriceFormatCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FormatCache(maxsize=100)
+        provideUtility(self.cache, IFormatCache)
+
+    def tearDown(self):
+        getGlobalSiteManager().unregisterUtility(provided=IFormatCache)
+
+    def test_format_cached(self):
+        price = Price('9.99', 'USD')
+        self.assertEqual(price.format('en_US'), '$9.99')
+        self.assertEqual(Price('9.99', 'USD').format('en_US'), '$9.99')
+        self.assertEqual(self.cache.stats().hits, 1)
+        self.assertEqual(price.format('de_DE'), '9,99\xa0$')
+        self.assertEqual(self.cache.stats().misses, 2)
+
+    def test_plural_names(self):
+        options = dict(format='#,##0.## ¤¤¤', currency_digits=False)
+        amounts = ['1', '2', '1', '1.00', '0.5', '2', '-1']
+        results = [Price(amount, 'EUR').format('en_US', **options)
+                   for amount in amounts]
+        self.assertEqual(results, [
+            '1 euro', '2 euros', '1 euro', '1 euro', '0.5 euros', '2 euros',
+            '-1 euro'])
+        getGlobalSiteManager().unregisterUtility(provided=IFormatCache)
+        self.assertEqual(results, [
+            Price(amount, 'EUR').format('en_US', **options)
+            for amount in amounts])
+
+    def test_cleared_on_register_currency(self):
+        self.addCleanup(getGlobalSiteManager().unregisterUtility,
+                        provided=ICurrencyFormat, name='ZZC')
+        config.register_currency('ZZC', 'Ƶ', '¤#,##0.00')
+        self.assertEqual(Price('1.5', 'ZZC').format('en_US'), 'Ƶ1.50')
+        config.register_currency('ZZC', 'Z', '¤ #,##0.0')
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(Price('1.5', 'ZZC').format('en_US'), 'Z 1.50')
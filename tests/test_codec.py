@@ -0,0 +1,135 @@
+from decimal import Decimal
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+from pricing import Price, PriceRange, XPrice, codec, tokens
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PRICES = [
+    Price('19.99', 'USD'),
+    Price('-0.00', 'EUR'),
+    Price('1E+5', 'JPY'),
+    Price('-1.2E-3', 'BTC'),
+    Price('18446744073709551615', 'USD'),
+    Price('18446744073709551616', 'USD'),
+    Price('123456789012345678901234567890.123456789', 'ETH'),
+    Price('-1E-200', 'USD'),
+    Price('-Infinity', 'USD'),
+    Price('NaN', 'USD'),
+    XPrice('3.50', 'GBP'),
+]
+
+
+class TestCodec(unittest.TestCase):
+    def assertIdentical(self, a, b):
+        self.assertIs(type(a), type(b))
+        self.assertEqual(repr(a), repr(b))
+
+    def test_round_trip(self):
+        for price in PRICES:
+            decoded = codec.loads(codec.dumps(price))
+            self.assertIdentical(decoded, price)
+            self.assertEqual(decoded.amount.as_tuple(),
+                             price.amount.as_tuple())
+        price_range = PriceRange(Price('1', 'USD'), Price('2.50', 'USD'))
+        self.assertEqual(codec.loads(codec.dumps(price_range)), price_range)
+        self.assertEqual(len(codec.dumps(Price('19.99', 'USD'))), 13)
+
+    def test_records(self):
+        data = b''.join(map(codec.dumps, PRICES))
+        decoded = list(codec.iter_unpack(data))
+        for a, b in zip(decoded, PRICES):
+            self.assertIdentical(a, b)
+        self.assertEqual(len(decoded), len(PRICES))
+        obj, offset = codec.unpack_from(data, len(codec.dumps(PRICES[0])))
+        self.assertIdentical(obj, PRICES[1])
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            codec.dumps(Decimal('1'))
+        with self.assertRaises(ValueError):
+            codec.loads(b'\x09')
+        with self.assertRaises(ValueError):
+            codec.loads(codec.dumps(PRICES[0]) + b'\x00')
+        with self.assertRaises(ValueError):
+            codec.loads(b'\x01\x00\xff\xfe\x00' + bytes(8))
+        with self.assertRaises(ValueError):
+            codec.loads(codec.dumps(PRICES[6])[:-1])
+        with self.assertRaises(ValueError):
+            list(codec.iter_unpack(codec.dumps(PRICES[0])[:-1]))
+
+    def test_tokens(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'tokens.csv')
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write('code,symbol,decimals\nUSDC,USDC,6\n')
+            tokens.load(path)
+            price = Price('1.000001', 'USDC')
+            data = codec.dumps(price)
+            self.assertEqual(codec.loads(data), price)
+            prices = codec.PriceBuffer(codec.dumps_array([price]))
+            self.assertEqual(prices.to_prices(), [price])
+            tokens.unload()
+            with self.assertRaises(ValueError):
+                codec.loads(data)
+        finally:
+            tokens.unload()
+            shutil.rmtree(tmpdir)
+
+    def test_array(self):
+        prices = [Price(Decimal(i).scaleb(-(i % 3)), 'USD')
+                  for i in range(-50, 50)]
+        data = codec.dumps_array(prices)
+        buffer = codec.PriceBuffer(data)
+        self.assertEqual((buffer.currency, buffer.scale, len(buffer)),
+                         ('USD', 2, 100))
+        self.assertEqual(buffer.to_prices(), prices)
+        self.assertEqual(buffer[-1], prices[-1])
+        self.assertEqual(buffer.units[1], -49)
+        empty = codec.PriceBuffer(codec.dumps_array([], currency='EUR'))
+        self.assertEqual((len(empty), empty.currency), (0, 'EUR'))
+        with self.assertRaises(ValueError):
+            codec.dumps_array([Price('1', 'USD'), Price('1', 'EUR')])
+        with self.assertRaises(ValueError):
+            codec.dumps_array([Price(2 ** 63, 'USD')])
+        with self.assertRaises(ValueError):
+            codec.dumps_array([Price('Infinity', 'USD')])
+        with self.assertRaises(ValueError):
+            codec.PriceBuffer(data[:-1])
+        with self.assertRaises(ValueError):
+            codec.PriceBuffer(b'XXXX' + data[4:])
+
+    def test_array_mmap(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'prices.bin')
+            with open(path, 'wb') as fp:
+                fp.write(codec.dumps_units(range(1000), 'JPY'))
+            with open(path, 'rb') as fp:
+                data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = codec.PriceBuffer(data)
+            self.assertEqual(buffer[999], Price('999', 'JPY'))
+            buffer.units.release()
+            data.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        units = numpy.arange(-5, 5, dtype=numpy.int32)
+        buffer = codec.PriceBuffer(codec.dumps_units(units, 'EUR', 2))
+        column = buffer.to_numpy()
+        self.assertEqual(column.dtype, numpy.int64)
+        self.assertEqual(column.tolist(), units.tolist())
+        self.assertEqual(buffer[0], Price('-0.05', 'EUR'))
+        with self.assertRaises(TypeError):
+            codec.dumps_units(numpy.zeros(2), 'EUR')
@@ -1,6 +1,10 @@
+import asyncio
 from copy import deepcopy
+from datetime import timedelta
 from decimal import Decimal
+import sys
 import unittest
+from unittest import mock
 
 import zulu
 from zope.component import queryUtility, provideUtility
@@ -30,3 +34,89 @@ class TestCoinBaseBackend(unittest.TestCase):
         rate = backend.quotation('EUR', 'CAD')
         self.assertIsInstance(rate, Decimal)
         self.assertGreater(rate, 1)
+
+
+class StubCoinBaseBackend(CoinBaseBackend):
+    def _rates_refresh(self, values=None):
+        return self.tables.pop(0)
+
+
+class TestCoinBaseBackendSnapshots(unittest.TestCase):
+    def test_refresh_publishes_snapshot(self):
+        backend = StubCoinBaseBackend('USD')
+        backend.tables = [{'EUR': '0.5', 'CAD': '1.5'},
+                          {'EUR': '0.25', 'CAD': '3'}]
+        self.assertEqual(backend._snapshot.version, 0)
+
+        snapshot = backend.snapshot()
+        self.assertEqual(snapshot.rate('EUR'), Decimal('0.5'))
+        self.assertEqual(backend.last_updated, snapshot.last_updated)
+
+        backend.refresh()
+        self.assertEqual(snapshot.quotation('EUR', 'CAD'), Decimal('3'))
+        self.assertEqual(backend.quotation('EUR', 'CAD'), Decimal('12'))
+        self.assertGreater(backend.snapshot().version, snapshot.version)
+
+    def test_backdate_forces_refresh(self):
+        backend = StubCoinBaseBackend('USD')
+        backend.tables = [{'EUR': '0.5'}, {'EUR': '0.25'}]
+        snapshot = backend.snapshot()
+        backend.last_updated = snapshot.last_updated - timedelta(hours=1)
+        self.assertEqual(backend._snapshot.rates, snapshot.rates)
+        self.assertEqual(backend.rate('EUR'), Decimal('0.25'))
+
+    def test_async_refresh_without_aiohttp(self):
+        backend = StubCoinBaseBackend('USD')
+        backend.tables = [{'EUR': '0.5', 'CAD': '1.5'}]
+        with mock.patch.dict(sys.modules, {'aiohttp': None}):
+            snapshot = asyncio.run(backend.asnapshot())
+        self.assertEqual(snapshot.rate('EUR'), Decimal('0.5'))
+        self.assertIs(backend.snapshot(), snapshot)
+
+
+class AsyncStubCoinBaseBackend(CoinBaseBackend):
+    def _rates_refresh(self, values=None):
+        self.calls += 1
+        return {'EUR': '0.5', 'CAD': '1.5'}
+
+    async def _arates_refresh(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {'EUR': '0.25', 'CAD': '3'}
+
+
+class TestCoinBaseBackendAsync(unittest.TestCase):
+    def setUp(self):
+        self.backend = AsyncStubCoinBaseBackend('USD')
+        self.backend.calls = 0
+
+    def test_aquotation(self):
+        rate = asyncio.run(self.backend.aquotation('EUR', 'CAD'))
+        self.assertEqual(rate, Decimal('12'))
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_concurrent_refresh_coalesces(self):
+        async def quote_many():
+            return await asyncio.gather(*[
+                self.backend.aquotation('EUR', 'CAD') for _ in range(10)])
+
+        self.assertEqual(asyncio.run(quote_many()), [Decimal('12')] * 10)
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_refresh_pending_in_other_loop(self):
+        loop = asyncio.new_event_loop()
+        self.backend._refreshing = loop.create_future()
+        loop.close()
+        asyncio.run(self.backend.arefresh())
+        self.assertEqual(self.backend.rate('EUR'), Decimal('0.25'))
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_shares_rate_state_with_sync_api(self):
+        asyncio.run(self.backend.arefresh())
+        self.assertEqual(self.backend.rate('EUR'), Decimal('0.25'))
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_ato(self):
+        exchange = Exchange(backend=self.backend)
+        price = asyncio.run(Price('10', 'EUR').ato('CAD', exchange=exchange))
+        self.assertEqual(price, Price('120', 'CAD'))
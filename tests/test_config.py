@@ -0,0 +1,127 @@
+from decimal import Decimal
+import os
+import shutil
+import tempfile
+import unittest
+
+from zope.component import getGlobalSiteManager, queryUtility
+
+from pricing import Price, config
+from pricing.exchange import (
+    Exchange, CoinBaseBackend, FileBackend, SharedBackend, SimpleBackend)
+from pricing.formats import CurrencyFormat
+from pricing.interfaces import ICurrencyFormat, IExchange
+
+
+class ConfigTestCase(unittest.TestCase):
+    def tearDown(self):
+        registry = getGlobalSiteManager()
+        for interface in (ICurrencyFormat, IExchange):
+            for name, component in list(
+                    registry.getUtilitiesFor(interface)):
+                if name.startswith(('ZZ', 'config-', 'dict-')):
+                    registry.unregisterUtility(component, interface, name)
+
+
+class TestRegister(ConfigTestCase):
+    def test_register_currency(self):
+        currency = config.register_currency(
+            'ZZC', 'Ƶ', '¤#,##0.####', currency_digits=False, name='zed')
+        self.assertIs(queryUtility(ICurrencyFormat, name='ZZC'), currency)
+        self.assertEqual(
+            currency, CurrencyFormat('zed', 'ZZC', 'Ƶ', '¤#,##0.####', False))
+        self.assertEqual(Price('1.5', 'ZZC').format('en_US'), 'Ƶ1.5')
+
+    def test_register_currency_quoted_symbol(self):
+        config.register_currency('ZZF', 'Fr.', "¤ #,##0.00' net'")
+        self.assertEqual(
+            Price('1234.5', 'ZZF').format('en_US'), 'Fr. 1,234.50 net')
+        self.assertEqual(
+            Price('1234.5', 'USD').format(
+                'en_US', format="'Total: '¤#,##0.00"),
+            'Total: $1,234.50')
+
+    def test_register_currency_invalid_code(self):
+        with self.assertRaises(ValueError):
+            config.register_currency('zz', 'Z')
+
+    def test_register_exchange(self):
+        exchange = config.register_exchange(
+            'pricing.exchange.SimpleBackend', 'EUR', name='config-eur')
+        self.assertIs(queryUtility(IExchange, name='config-eur'), exchange)
+        self.assertIsInstance(exchange, Exchange)
+        self.assertIsInstance(exchange._backend, SimpleBackend)
+        self.assertEqual(exchange.base, 'EUR')
+
+    def test_register_shared_exchange(self):
+        sources = {}
+        eur = config.register_exchange(
+            SimpleBackend, 'EUR', name='config-shared-eur', shared=True,
+            sources=sources)
+        gbp = config.register_exchange(
+            '.exchange.SimpleBackend', 'GBP', component='.exchange.Exchange',
+            name='config-shared-gbp', shared=True, sources=sources)
+        self.assertIsInstance(eur._backend, SharedBackend)
+        self.assertIs(eur._backend.source, gbp._backend.source)
+        self.assertIs(sources[SimpleBackend, 'USD', ()], eur._backend.source)
+        self.assertEqual(eur._backend.source.base, 'USD')
+        self.assertEqual((eur.base, gbp.base), ('EUR', 'GBP'))
+        chf = config.register_exchange(
+            SimpleBackend, 'CHF', name='config-shared-chf', shared=True,
+            default='EUR', sources=sources)
+        self.assertIsNot(chf._backend.source, eur._backend.source)
+        self.assertEqual(chf._backend.source.base, 'EUR')
+
+    def test_shared_file_backends(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        exchanges = []
+        for rate in ('0.5', '0.8'):
+            path = os.path.join(tmpdir, rate + '.json')
+            FileBackend.write(path, {'EUR': rate}, base='USD')
+            exchanges.append(config.register_exchange(
+                FileBackend, 'USD', name='config-file-' + rate, shared=True,
+                path=path))
+        first, second = exchanges
+        self.assertIsNot(first._backend.source, second._backend.source)
+        self.assertEqual(first.rate('EUR'), Decimal('0.5'))
+        self.assertEqual(second.rate('EUR'), Decimal('0.8'))
+
+
+class TestConfigureFromDict(ConfigTestCase):
+    def test_matches_zcml(self):
+        config.configure_from_dict({
+            'default': 'EUR',
+            'currencies': [
+                {'code': 'ZZB', 'symbol': 'Ƀ', 'format': '¤#,##0.########',
+                 'currency_digits': False, 'name': 'bitcoin'},
+                {'code': 'ZZL', 'symbol': 'Ƚ', 'name': 'litecoin'}],
+            'exchanges': [
+                {'backend': CoinBaseBackend, 'base': 'USD',
+                 'name': 'dict-usd', 'shared': True},
+                {'backend': CoinBaseBackend, 'base': 'GBP',
+                 'name': 'dict-gbp', 'shared': True}]})
+        self.assertEqual(
+            queryUtility(ICurrencyFormat, name='ZZB'),
+            CurrencyFormat('bitcoin', 'ZZB', 'Ƀ', '¤#,##0.########', False))
+        self.assertEqual(
+            queryUtility(ICurrencyFormat, name='ZZL').symbol, 'Ƚ')
+        usd = queryUtility(IExchange, name='dict-usd')
+        gbp = queryUtility(IExchange, name='dict-gbp')
+        self.assertIs(usd._backend.source, gbp._backend.source)
+        self.assertEqual(usd._backend.source.base, 'EUR')
+
+    def test_unknown_keys(self):
+        with self.assertRaises(ValueError):
+            config.configure_from_dict({'currency': []})
+
+    def test_duplicates(self):
+        with self.assertRaises(ValueError):
+            config.configure_from_dict({'currencies': [
+                {'code': 'ZZD', 'symbol': 'D'},
+                {'code': 'ZZD', 'symbol': 'd'}]})
+        self.assertIsNone(queryUtility(ICurrencyFormat, name='ZZD'))
+        with self.assertRaises(ValueError):
+            config.configure_from_dict({'exchanges': [
+                {'backend': SimpleBackend},
+                {'backend': SimpleBackend, 'name': ''}]})
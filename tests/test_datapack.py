@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import babel.numbers
+
+from pricing import Price, datapack
+from pricing.babel_numbers import (
+    format_currency, get_locale_pack, install_data_pack)
+
+
+class TestDataPack(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'pricing.json')
+        datapack.write(self.path, ['en_US', 'de_DE', 'ru_RU'],
+                       ['USD', 'EUR', 'RUB'])
+        datapack.load(self.path)
+
+    def tearDown(self):
+        datapack.unload()
+        shutil.rmtree(self.tmpdir)
+
+    def test_pack_from_data(self):
+        pack = get_locale_pack('de_DE')
+        self.assertEqual(pack.currencies, {'USD', 'EUR', 'RUB'})
+        self.assertEqual(set(pack.currency_symbols), {'USD', 'EUR', 'RUB'})
+        self.assertIsNone(pack.locale._Locale__data)
+
+    def test_matches_babel(self):
+        for locale in ('en_US', 'de_DE', 'ru_RU', 'fr_FR'):
+            for currency in ('USD', 'EUR', 'RUB', 'JPY', 'CHF'):
+                for format in (None, '#,##0.00 ¤¤¤', '¤¤ #,##0.00'):
+                    for amount in ('-1234.5', '1', '2', '5'):
+                        self.assertEqual(
+                            format_currency(amount, currency, format,
+                                            locale=locale),
+                            babel.numbers.format_currency(
+                                amount, currency, format, locale=locale),
+                            (locale, currency, format, amount))
+
+    def test_untrimmed(self):
+        datapack.write(self.path, ['ja_JP'])
+        datapack.load(self.path)
+        pack = get_locale_pack('ja_JP')
+        self.assertIsNone(pack.currencies)
+        self.assertEqual(Price('1234', 'JPY').format('ja_JP'), '￥1,234')
+
+    def test_version(self):
+        data = datapack.read(self.path)
+        data['version'] = 0
+        with self.assertRaises(ValueError):
+            install_data_pack(data)
+
+    def test_main(self):
+        path = os.path.join(self.tmpdir, 'cli.json')
+        datapack.main([path, '-l', 'en_GB', '-c', 'GBP'])
+        data = datapack.read(path)
+        self.assertEqual(list(data['locales']), ['en_GB'])
+        self.assertEqual(data['currencies'], ['GBP'])
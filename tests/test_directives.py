@@ -6,7 +6,7 @@ from zope.component import queryUtility
 from pricing.interfaces import (
     IPrice, ICurrencyFormat, IExchange, IExchangeBackend)
 from pricing.formats import CurrencyFormat
-from pricing.exchange import Exchange, CoinBaseBackend
+from pricing.exchange import Exchange, CoinBaseBackend, SharedBackend
 
 
 class DirectivesTest(unittest.TestCase):
@@ -25,3 +25,37 @@ class DirectivesTest(unittest.TestCase):
         self.assertIsInstance(exchange, Exchange)
         self.assertIsInstance(exchange._backend, CoinBaseBackend)
         self.assertEqual(exchange._backend.base, 'USD')
+
+    def test_shared_exchanges(self):
+        xmlconfig.string("""
+        <configure
+            xmlns:zope="http://namespaces.zope.org/zope"
+            xmlns="http://namespaces.zope.org/currency">
+
+            <zope:include package="pricing" file="currency-meta.zcml" />
+
+            <currency default="USD">
+                <exchange
+                    component="pricing.exchange.Exchange"
+                    backend="pricing.exchange.CoinBaseBackend"
+                    base="EUR"
+                    name="shared-eur"
+                    shared="true" />
+                <exchange
+                    component="pricing.exchange.Exchange"
+                    backend="pricing.exchange.CoinBaseBackend"
+                    base="GBP"
+                    name="shared-gbp"
+                    shared="true" />
+            </currency>
+
+        </configure>
+        """)
+        eur = queryUtility(IExchange, name='shared-eur')
+        gbp = queryUtility(IExchange, name='shared-gbp')
+        self.assertIsInstance(eur._backend, SharedBackend)
+        self.assertEqual(eur.base, 'EUR')
+        self.assertEqual(gbp.base, 'GBP')
+        self.assertIs(eur._backend.source, gbp._backend.source)
+        self.assertIsInstance(eur._backend.source, CoinBaseBackend)
+        self.assertEqual(eur._backend.source.base, 'USD')
@@ -3,15 +3,20 @@
 Price exchange unittests
 """
 
+import asyncio
 from copy import deepcopy
 from decimal import Decimal
+import threading
 import unittest
 
 from zope.component import queryUtility, provideUtility
 
 from pricing import Price, XPrice
-from pricing.interfaces import IExchange
-from pricing.exchange import SimpleBackend, Exchange
+from pricing.price import convert, aconvert
+from pricing.interfaces import IExchange, IRateSnapshot
+from pricing.exchange import (
+    BackendBase, RateSnapshot, SimpleBackend, SharedBackend, Exchange,
+    get_exchange, use_exchange)
 from pricing.exceptions import ExchangeBackendNotInstalled, ExchangeRateNotFound
 
 
@@ -113,6 +118,218 @@ class TestSimpleBackend(unittest.TestCase):
             self.exchange.setrate('AAA', Decimal('2'))
 
 
+class RateOnlyBackend(BackendBase):
+    def rate(self, currency):
+        return {'USD': Decimal(1), 'EUR': Decimal('0.5')}.get(currency)
+
+
+class TestBackendBase(unittest.TestCase):
+    def test_rate_only_backend(self):
+        backend = RateOnlyBackend()
+        self.assertEqual(backend.quotation('EUR', 'USD'), Decimal(2))
+        self.assertIsNone(backend.quotation('EUR', 'GBP'))
+        self.assertEqual(
+            asyncio.run(backend.aquotation('EUR', 'USD')), Decimal(2))
+
+    def test_not_implemented(self):
+        with self.assertRaisesRegex(NotImplementedError, 'BackendBase'):
+            BackendBase().rate('EUR')
+        with self.assertRaises(NotImplementedError):
+            BackendBase().quotation('EUR', 'USD')
+
+
+class TestRateSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = RateSnapshot('XXX', {'AAA': '2', 'BBB': 8})
+
+    def test_interface(self):
+        self.assertTrue(IRateSnapshot.providedBy(self.snapshot))
+
+    def test_rates_are_decimal(self):
+        self.assertEqual(self.snapshot.rates['AAA'], Decimal('2'))
+        self.assertIsInstance(self.snapshot.rates['BBB'], Decimal)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.snapshot.base = 'AAA'
+        with self.assertRaises(TypeError):
+            self.snapshot.rates['AAA'] = Decimal('3')
+
+    def test_versions_increase(self):
+        other = RateSnapshot('XXX', {})
+        self.assertGreater(other.version, self.snapshot.version)
+
+    def test_quotation(self):
+        self.assertEqual(self.snapshot.rate('XXX'), Decimal('1'))
+        self.assertEqual(self.snapshot.quotation('AAA', 'BBB'), Decimal('4'))
+        self.assertIsNone(self.snapshot.quotation('AAA', 'ZZZ'))
+
+    def test_rebase(self):
+        rebased = self.snapshot.rebase('AAA')
+        self.assertEqual(rebased.base, 'AAA')
+        self.assertEqual(rebased.version, self.snapshot.version)
+        self.assertEqual(rebased.rate('XXX'), Decimal('0.5'))
+        self.assertEqual(rebased.rate('BBB'), Decimal('4'))
+        self.assertIs(self.snapshot.rebase('XXX'), self.snapshot)
+
+    def test_rebase_unknown_base(self):
+        self.assertEqual(dict(self.snapshot.rebase('ZZZ').rates), {})
+
+    def test_backend_snapshot_isolation(self):
+        backend = SimpleBackend('XXX')
+        backend.setrate('AAA', Decimal('2'))
+        snapshot = backend.snapshot()
+        backend.setrate('AAA', Decimal('3'))
+        self.assertEqual(snapshot.rate('AAA'), Decimal('2'))
+        self.assertEqual(backend.rate('AAA'), Decimal('3'))
+        self.assertGreater(backend.snapshot().version, snapshot.version)
+
+    def test_exchange_snapshot(self):
+        exchange = Exchange(backend=SimpleBackend('XXX'))
+        exchange.setrate('AAA', Decimal('2'))
+        self.assertEqual(exchange.snapshot().rate('AAA'), Decimal('2'))
+        with self.assertRaises(ExchangeBackendNotInstalled):
+            Exchange().snapshot()
+
+
+class TestSharedBackend(unittest.TestCase):
+    def setUp(self):
+        self.source = SimpleBackend('XXX')
+        self.source.setrate('AAA', Decimal('2'))
+        self.source.setrate('BBB', Decimal('8'))
+        self.exchange = Exchange(backend=SharedBackend(self.source, 'AAA'))
+
+    def test_base_property(self):
+        self.assertEqual(self.exchange.base, 'AAA')
+
+    def test_rate(self):
+        self.assertEqual(self.exchange.rate('AAA'), Decimal('1'))
+        self.assertEqual(self.exchange.rate('XXX'), Decimal('0.5'))
+        self.assertEqual(self.exchange.rate('BBB'), Decimal('4'))
+
+    def test_quotation(self):
+        self.assertEqual(self.exchange.quotation('BBB', 'AAA'), Decimal('0.25'))
+        self.assertEqual(self.exchange.quotation('XXX', 'BBB'), Decimal('8'))
+
+    def test_unavailable_rate_returns_none(self):
+        self.assertIsNone(self.exchange.rate('ZZZ'))
+
+    def test_follows_source_rates(self):
+        other = SharedBackend(self.source, 'BBB')
+        self.source.setrate('AAA', Decimal('4'))
+        self.assertEqual(self.exchange.rate('BBB'), Decimal('2'))
+        self.assertEqual(other.rate('AAA'), Decimal('0.5'))
+
+
+class TestCurrentExchange(unittest.TestCase):
+    def setUp(self):
+        self.default = Exchange(backend=SimpleBackend('XXX'))
+        self.default.setrate('AAA', Decimal('2'))
+        provideUtility(self.default, IExchange)
+
+        self.tenant = Exchange(backend=SimpleBackend('XXX'))
+        self.tenant.setrate('AAA', Decimal('4'))
+        provideUtility(self.tenant, IExchange, name='tenant')
+
+    def test_default(self):
+        self.assertEqual(get_exchange(), self.default)
+        self.assertEqual(Price('1', 'XXX').to('AAA'), Price('2', 'AAA'))
+
+    def test_use_exchange(self):
+        other = Exchange(backend=SimpleBackend('XXX'))
+        with use_exchange(other) as exchange:
+            self.assertIs(exchange, other)
+            self.assertIs(get_exchange(), other)
+        self.assertEqual(get_exchange(), self.default)
+
+    def test_use_exchange_name(self):
+        with use_exchange('tenant'):
+            self.assertEqual(get_exchange(), self.tenant)
+            self.assertEqual(Price('1', 'XXX').to('AAA'), Price('4', 'AAA'))
+            self.assertEqual(XPrice('1', 'XXX') + XPrice('4', 'AAA'),
+                             XPrice('2', 'XXX'))
+        self.assertEqual(Price('1', 'XXX').to('AAA'), Price('2', 'AAA'))
+
+    def test_use_exchange_unknown_name(self):
+        with self.assertRaises(LookupError):
+            with use_exchange('unknown'):
+                pass
+
+    def test_nested(self):
+        other = Exchange(backend=SimpleBackend('XXX'))
+        with use_exchange('tenant'):
+            with use_exchange(other):
+                self.assertIs(get_exchange(), other)
+            self.assertEqual(get_exchange(), self.tenant)
+
+    def test_thread_isolation(self):
+        seen = []
+        with use_exchange('tenant'):
+            thread = threading.Thread(target=lambda: seen.append(get_exchange()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen[0], self.default)
+
+    def test_explicit_exchange(self):
+        self.assertEqual(Price('1', 'XXX').to('AAA', exchange=self.tenant),
+                         Price('4', 'AAA'))
+
+    def test_convert(self):
+        prices = [Price('1', 'XXX'), Price('2', 'AAA'), Price('3', 'XXX')]
+        self.assertEqual(convert(prices, 'AAA'), [
+            Price('2', 'AAA'), Price('2', 'AAA'), Price('6', 'AAA')])
+        with use_exchange('tenant'):
+            self.assertEqual(convert(prices, 'XXX'), [
+                Price('1', 'XXX'), Price('0.5', 'XXX'), Price('3', 'XXX')])
+
+    def test_convert_rate_not_found(self):
+        with self.assertRaises(ExchangeRateNotFound):
+            convert([Price('1', 'XXX')], 'ZZZ')
+
+
+class TestAsyncExchange(unittest.TestCase):
+    def setUp(self):
+        self.exchange = Exchange(backend=SimpleBackend('XXX'))
+        self.exchange.setrate('AAA', Decimal('2'))
+        self.exchange.setrate('BBB', Decimal('8'))
+
+    def test_aquotation(self):
+        self.assertEqual(
+            asyncio.run(self.exchange.aquotation('AAA', 'BBB')), Decimal('4'))
+        self.assertEqual(
+            asyncio.run(self.exchange.arate('BBB')), Decimal('8'))
+        snapshot = asyncio.run(self.exchange.asnapshot())
+        self.assertIs(snapshot, self.exchange.snapshot())
+
+    def test_no_backend(self):
+        with self.assertRaises(ExchangeBackendNotInstalled):
+            asyncio.run(Exchange().aquotation('AAA', 'BBB'))
+
+    def test_ato(self):
+        price = asyncio.run(
+            Price('10', 'AAA').ato('BBB', exchange=self.exchange))
+        self.assertEqual(price, Price('40', 'BBB'))
+
+        async def convert_in_context():
+            with use_exchange(self.exchange):
+                return await XPrice('10', 'BBB').ato('AAA')
+        self.assertEqual(asyncio.run(convert_in_context()), XPrice('2.5', 'AAA'))
+
+    def test_ato_rate_not_found(self):
+        with self.assertRaises(ExchangeRateNotFound):
+            asyncio.run(Price('10', 'AAA').ato('ZZZ', exchange=self.exchange))
+
+    def test_aconvert(self):
+        prices = [Price('10', 'AAA'), Price('8', 'BBB')]
+        self.assertEqual(
+            asyncio.run(aconvert(prices, 'XXX', exchange=self.exchange)),
+            [Price('5', 'XXX'), Price('1', 'XXX')])
+
+    def test_shared_backend(self):
+        shared = SharedBackend(self.exchange._backend, 'AAA')
+        self.assertEqual(asyncio.run(shared.arate('BBB')), Decimal('4'))
+
+
 class ConversionMixin(object):
     def test_unavailable_backend_conversion_error(self):
         exchange = Exchange()
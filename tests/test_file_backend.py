@@ -0,0 +1,120 @@
+from decimal import Decimal
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from zope.configuration import xmlconfig
+from zope.component import queryUtility
+
+from pricing.interfaces import IExchange, IExchangeBackend
+from pricing.exchange import FileBackend, Exchange
+
+
+RATES = {'EUR': Decimal('0.5'), 'GBP': Decimal('0.25')}
+
+
+class TestFileBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def makeOne(self, name, **kwargs):
+        path = os.path.join(self.tmpdir, name)
+        FileBackend.write(path, RATES, base='USD')
+        kwargs.setdefault('interval', 0)
+        return FileBackend('USD', path, **kwargs)
+
+    def assertRates(self, backend):
+        self.assertTrue(IExchangeBackend.providedBy(backend))
+        self.assertEqual(backend.rate('USD'), Decimal('1'))
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+        self.assertEqual(backend.quotation('EUR', 'GBP'), Decimal('0.5'))
+        self.assertIsNone(backend.rate('ZZZ'))
+        self.assertIsNone(backend.quotation('EUR', 'ZZZ'))
+
+    def test_json(self):
+        self.assertRates(self.makeOne('rates.json'))
+
+    def test_csv(self):
+        self.assertRates(self.makeOne('rates.csv'))
+
+    def test_bin(self):
+        self.assertRates(self.makeOne('rates.bin'))
+
+    def test_memory_map(self):
+        for name in ('rates.json', 'rates.csv', 'rates.bin'):
+            self.assertRates(self.makeOne(name, memory_map=True))
+
+    def test_coinbase_json(self):
+        path = os.path.join(self.tmpdir, 'coinbase.json')
+        with open(path, 'w') as fd:
+            json.dump({'data': {'currency': 'USD', 'rates': {
+                'EUR': '0.5', 'GBP': '0.25'}}}, fd)
+        self.assertRates(FileBackend('USD', path))
+
+    def test_rebase(self):
+        path = os.path.join(self.tmpdir, 'rates.json')
+        FileBackend.write(path, RATES, base='USD')
+        backend = FileBackend('EUR', path)
+        self.assertEqual(backend.rate('EUR'), Decimal('1'))
+        self.assertEqual(backend.rate('USD'), Decimal('2'))
+        self.assertEqual(backend.rate('GBP'), Decimal('0.5'))
+
+    def test_reload(self):
+        backend = self.makeOne('rates.json')
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+        FileBackend.write(backend.path, {'EUR': '0.8'}, base='USD')
+        self.assertEqual(backend.rate('EUR'), Decimal('0.8'))
+        self.assertIsNone(backend.rate('GBP'))
+
+    def test_reload_interval(self):
+        backend = self.makeOne('rates.json', interval=3600)
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+        FileBackend.write(backend.path, {'EUR': '0.8'}, base='USD')
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+        backend.refresh()
+        self.assertEqual(backend.rate('EUR'), Decimal('0.8'))
+
+    def test_missing_file_keeps_rates(self):
+        backend = self.makeOne('rates.json')
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+        os.unlink(backend.path)
+        self.assertEqual(backend.rate('EUR'), Decimal('0.5'))
+
+    def test_missing_path(self):
+        with self.assertRaises(ValueError):
+            FileBackend('USD')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            FileBackend('USD', 'rates.txt')
+
+    def test_directive(self):
+        path = os.path.join(self.tmpdir, 'rates.csv')
+        FileBackend.write(path, RATES, base='USD')
+        xmlconfig.string("""
+        <configure
+            xmlns:zope="http://namespaces.zope.org/zope"
+            xmlns="http://namespaces.zope.org/currency">
+
+            <zope:include package="pricing" file="currency-meta.zcml" />
+
+            <currency default="USD">
+                <exchange
+                    component="pricing.exchange.Exchange"
+                    backend="pricing.exchange.FileBackend"
+                    base="USD"
+                    path="{}"
+                    name="file" />
+            </currency>
+
+        </configure>
+        """.format(path))
+        exchange = queryUtility(IExchange, name='file')
+        self.assertIsInstance(exchange, Exchange)
+        self.assertIsInstance(exchange._backend, FileBackend)
+        self.assertEqual(exchange.quotation('EUR', 'GBP'), Decimal('0.5'))
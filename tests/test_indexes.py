@@ -0,0 +1,119 @@
+from decimal import Decimal
+import random
+import unittest
+
+from pricing import Price, PriceRange
+from pricing.indexes import PriceIndex, PriceRangeIndex
+
+
+def make_ranges(rnd, count, currencies=('USD', 'EUR')):
+    ranges = []
+    for _ in range(count):
+        start = rnd.randint(0, 1000)
+        stop = start + rnd.choice([0, 1, 5, 50, 500])
+        currency = rnd.choice(currencies)
+        ranges.append(PriceRange(
+            Price(Decimal(start).scaleb(-1), currency),
+            Price(Decimal(stop).scaleb(-1), currency)))
+    return ranges
+
+
+class TestPriceRangeIndex(unittest.TestCase):
+    def test_matches_contains(self):
+        rnd = random.Random(43)
+        ranges = make_ranges(rnd, 500)
+        index = PriceRangeIndex(ranges, values=range(len(ranges)))
+        self.assertEqual(len(index), 500)
+        self.assertEqual(index.currencies, {'USD', 'EUR'})
+        prices = [Price(Decimal(rnd.randint(-10, 1600)).scaleb(-1),
+                        rnd.choice(['USD', 'EUR', 'GBP']))
+                  for _ in range(300)]
+        prices += [price_range.stop for price_range in ranges[:50]]
+        prices += [price_range.start for price_range in ranges[:50]]
+        for price, found in zip(prices, index.stab_many(prices)):
+            self.assertEqual(
+                sorted(found),
+                [i for i, price_range in enumerate(ranges)
+                 if price_range.currency == price.currency and
+                 price in price_range], price)
+
+    def test_stab(self):
+        small = PriceRange(Price('0', 'USD'), Price('10', 'USD'))
+        large = PriceRange(Price('5', 'USD'), Price('50', 'USD'))
+        index = PriceRangeIndex([small, large])
+        self.assertCountEqual(index.stab(Price('5', 'USD')), [small, large])
+        self.assertEqual(index.stab(Price('10.01', 'USD')), [large])
+        self.assertEqual(index.stab(Price('-1', 'USD')), [])
+        self.assertEqual(index.stab(Price('5', 'EUR')), [])
+        self.assertEqual(PriceRangeIndex([]).stab(Price('5', 'USD')), [])
+
+    def test_invalid(self):
+        index = PriceRangeIndex([])
+        with self.assertRaises(TypeError):
+            index.stab(5)
+        with self.assertRaises(TypeError):
+            index.stab_many([Price('1', 'USD'), 5])
+        with self.assertRaises(ValueError):
+            PriceRangeIndex(
+                [PriceRange(Price('0', 'USD'), Price('1', 'USD'))], [1, 2])
+
+
+class TestPriceIndex(unittest.TestCase):
+    def make_items(self, rnd, count):
+        return [(Price(Decimal(rnd.randint(0, 200)).scaleb(-1),
+                       rnd.choice(['USD', 'EUR'])), i)
+                for i in range(count)]
+
+    def expected(self, items, price_range):
+        return [key for price, key in sorted(
+            items, key=lambda item: (item[0].amount, item[1]))
+            if price.currency == price_range.currency and
+            price in price_range]
+
+    def test_matches_contains(self):
+        rnd = random.Random(44)
+        items = self.make_items(rnd, 400)
+        index = PriceIndex(items[:200])
+        for price, key in items[200:300]:
+            index.insert(price, key)
+        index.update(items[300:])
+        for price, key in items[::3]:
+            index.delete(price, key)
+        del items[::3]
+        self.assertEqual(len(index), len(items))
+        self.assertEqual(index.currencies, {'USD', 'EUR'})
+        for price_range in make_ranges(rnd, 100):
+            keys = index.keys_in(price_range)
+            self.assertEqual(keys, self.expected(items, price_range))
+            self.assertEqual(index.count_in(price_range), len(keys))
+
+    def test_items(self):
+        pen, book = Price('5', 'USD'), Price('30', 'USD')
+        index = PriceIndex([(book, 'book'), (pen, 'pen'), (pen, 'ink')])
+        everything = PriceRange(Price('0', 'USD'), Price('100', 'USD'))
+        self.assertEqual(
+            index.items_in(everything),
+            [(pen, 'pen'), (pen, 'ink'), (book, 'book')])
+        self.assertEqual(
+            index.cheapest('USD', 2), [(pen, 'pen'), (pen, 'ink')])
+        self.assertEqual(
+            index.most_expensive('USD', 2), [(book, 'book'), (pen, 'ink')])
+        self.assertEqual(index.cheapest('EUR', 2), [])
+        self.assertEqual(index.cheapest('USD', 0), [])
+        self.assertEqual(index.most_expensive('USD', 0), [])
+        with self.assertRaises(ValueError):
+            index.cheapest('USD', -1)
+        with self.assertRaises(ValueError):
+            index.most_expensive('USD', -1)
+        self.assertEqual(
+            index.keys_in(PriceRange(Price('0', 'EUR'), Price('9', 'EUR'))),
+            [])
+
+    def test_invalid(self):
+        index = PriceIndex()
+        with self.assertRaises(ValueError):
+            index.delete(Price('5', 'USD'), 'pen')
+        with self.assertRaises(ValueError):
+            index.insert(Price('NaN', 'USD'), 'pen')
+        with self.assertRaises(TypeError):
+            index.update([(5, 'pen')])
@@ -0,0 +1,78 @@
+from decimal import Decimal
+from functools import partial
+import io
+import json
+import unittest
+from unittest import mock
+
+from pricing import Price, PriceRange, XPrice
+from pricing import json as price_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+PRICE = Price('-1234.500', 'USD')
+RANGE = PriceRange(Price('0', 'EUR'), Price('1E+3', 'EUR'))
+
+
+class TestJSON(unittest.TestCase):
+    def test_round_trip(self):
+        data = price_json.dumps({'price': PRICE, 'range': RANGE,
+                                 'other': {'amount': 1}})
+        self.assertEqual(
+            json.loads(data)['price'],
+            {'amount': '-1234.500', 'currency': 'USD'})
+        decoded = price_json.loads(data)
+        self.assertEqual(repr(decoded['price']), repr(PRICE))
+        self.assertEqual(repr(decoded['range']), repr(RANGE))
+        self.assertEqual(decoded['other'], {'amount': 1})
+        self.assertEqual(
+            json.loads(price_json.dumps(XPrice('2', 'GBP'))),
+            {'amount': '2', 'currency': 'GBP'})
+        self.assertEqual(price_json.dumps(Decimal('0.10')), '"0.10"')
+
+    def test_hooks(self):
+        self.assertEqual(
+            json.dumps([PRICE], cls=price_json.PriceEncoder),
+            json.dumps([PRICE], default=price_json.default))
+        with self.assertRaises(TypeError):
+            price_json.dumps(object())
+        with self.assertRaises(TypeError):
+            json.dumps(object(), cls=price_json.PriceEncoder)
+        self.assertEqual(
+            price_json.object_hook({'amount': 2, 'currency': 'USD'}),
+            Price('2', 'USD'))
+        self.assertEqual(
+            price_json.object_hook({'start': 1, 'stop': 2}),
+            {'start': 1, 'stop': 2})
+        with self.assertRaises(ValueError):
+            price_json.loads('{"amount": "1", "currency": "usd"}')
+
+    def test_iterencode(self):
+        items = [PRICE, RANGE, 1, None] * 5
+        stdlib = partial(json.dumps, cls=price_json.PriceEncoder)
+        for encoder in (None, stdlib):
+            for batch in (1, 3, 100):
+                data = ''.join(price_json.iterencode(
+                    iter(items), encoder=encoder, batch=batch))
+                self.assertEqual(price_json.loads(data), items)
+        self.assertEqual(''.join(price_json.iterencode([])), '[]')
+        out = io.StringIO()
+        price_json.dump_iter((PRICE for _ in range(3)), out, batch=2)
+        self.assertEqual(price_json.loads(out.getvalue()), [PRICE] * 3)
+
+    def test_iterencode_json(self):
+        with mock.patch.object(price_json, 'orjson', None):
+            data = ''.join(price_json.iterencode([PRICE, RANGE], batch=1))
+        self.assertEqual(
+            data, '[{"amount":"-1234.500","currency":"USD"},'
+                  '{"start":{"amount":"0","currency":"EUR"},'
+                  '"stop":{"amount":"1E+3","currency":"EUR"}}]')
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        data = orjson.dumps([PRICE, RANGE], default=price_json.default)
+        self.assertEqual(price_json.loads(data), [PRICE, RANGE])
@@ -0,0 +1,103 @@
+from decimal import Decimal
+import unittest
+
+from zope.component import getGlobalSiteManager, provideUtility
+
+from pricing import Price, XPrice
+from pricing.formats import CurrencyFormat
+from pricing.interfaces import ICurrencyFormat
+from pricing.parsing import get_parser, parse_price, parse_many
+
+
+class TestParsePrice(unittest.TestCase):
+    def assertParses(self, text, locale, expected, **kwargs):
+        price = parse_price(text, locale=locale, **kwargs)
+        self.assertEqual(price, expected, text)
+        self.assertEqual(str(price.amount), str(expected.amount), text)
+
+    def test_examples(self):
+        self.assertParses('1.234,57 €', 'de_DE', Price('1234.57', 'EUR'))
+        self.assertParses('US$ 1,099.98', 'en_US', Price('1099.98', 'USD'))
+        self.assertParses('₿0.00123', 'en_US', Price('0.00123', 'BTC'))
+        self.assertParses('Ł1,000.5', 'en_US', Price('1000.5', 'LTC'))
+        self.assertParses('Ξ2', 'en_US', Price('2', 'ETH'))
+
+    def test_locale_separators(self):
+        self.assertParses('1 234,57\xa0€', 'fr_FR',
+                          Price('1234.57', 'EUR'))
+        self.assertParses('1 234,57 €', 'fr_FR', Price('1234.57', 'EUR'))
+        self.assertParses('CHF 1’234.50', 'de_CH', Price('1234.50', 'CHF'))
+        self.assertParses('₹12,34,567.00', 'hi_IN', Price('1234567.00', 'INR'))
+        self.assertParses('$ 5', 'es_CO', Price('5', 'COP'))
+        self.assertParses('$5', 'en_CA', Price('5', 'CAD'))
+
+    def test_codes_and_signs(self):
+        self.assertParses('EUR 5', 'en_US', Price('5', 'EUR'))
+        self.assertParses('5.25 GBP', 'en_US', Price('5.25', 'GBP'))
+        self.assertParses('-$5.00', 'en_US', Price('-5.00', 'USD'))
+        self.assertParses('$-5.00', 'en_US', Price('-5.00', 'USD'))
+        self.assertParses('($5.00)', 'en_US', Price('-5.00', 'USD'))
+        self.assertParses('\u200f-1,234.25\xa0€', 'ar_EG',
+                          Price('-1234.25', 'EUR'))
+
+    def test_default_currency(self):
+        self.assertParses('1,234.5', 'en_US', Price('1234.5', 'JPY'),
+                          currency='JPY')
+        with self.assertRaises(ValueError):
+            parse_price('1,234.5', locale='en_US')
+
+    def test_invalid(self):
+        for text in ('', '$', 'abc', '$5 $', '($5', '5..0 €', '1.234,57 €'):
+            with self.assertRaises(ValueError, msg=text):
+                parse_price(text, locale='en_US')
+
+    def test_class(self):
+        price = parse_price('$5', locale='en_US', cls=XPrice)
+        self.assertIsInstance(price, XPrice)
+
+    def test_roundtrip(self):
+        for locale in ('en_US', 'de_DE', 'fr_FR', 'hi_IN', 'ja_JP', 'de_CH',
+                       'ar_EG', 'he_IL', 'sv_SE'):
+            for currency in ('USD', 'EUR', 'GBP', 'INR', 'BTC'):
+                for amount in ('-1234567.25', '0.50', '7.00'):
+                    price = Price(amount, currency)
+                    self.assertEqual(
+                        parse_price(price.format(locale), locale=locale),
+                        price, (locale, currency))
+
+    def test_parse_many(self):
+        self.assertEqual(
+            parse_many(['$5', '€1.50', '7 GBP'], locale='en_US'),
+            [Price('5', 'USD'), Price('1.50', 'EUR'), Price('7', 'GBP')])
+
+    def test_parser_cached(self):
+        self.assertIs(get_parser('de_DE'), get_parser('de_DE'))
+
+
+class TestCustomFormats(unittest.TestCase):
+    def setUp(self):
+        self.format = CurrencyFormat('dogecoin', 'DOG', symbol='Ð')
+        provideUtility(self.format, ICurrencyFormat, name='DOG')
+
+    def tearDown(self):
+        getGlobalSiteManager().unregisterUtility(
+            provided=ICurrencyFormat, name='DOG')
+
+    def test_parser_rebuilt(self):
+        parser = get_parser('en_US')
+        self.assertIs(get_parser('en_US'), parser)
+        self.tearDown()
+        rebuilt = get_parser('en_US')
+        self.assertIsNot(rebuilt, parser)
+        self.assertIs(get_parser('en_US'), rebuilt)
+        self.setUp()
+
+    def test_registered_symbol(self):
+        self.assertEqual(
+            parse_price('Ð42.5', locale='en_US'), Price('42.5', 'DOG'))
+        self.tearDown()
+        with self.assertRaises(ValueError):
+            parse_price('Ð42.5', locale='en_US')
+        self.setUp()
+        self.assertEqual(parse_price('42.5 DOG', locale='en_US').amount,
+                         Decimal('42.5'))
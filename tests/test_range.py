@@ -1,8 +1,12 @@
 import attr
 
+import copy
+import pickle
+import random
 import unittest
 
 from pricing import Price, PriceRange
+from pricing.range import PriceRangeSet
 from pricing.interfaces import IPriceRange
 
 
@@ -42,3 +46,98 @@ class TestPriceRange(unittest.TestCase):
 
         mr2 = mr.evolve(stop=Price('60.00', 'USD'))
         self.assertEqual(mr2.stop, Price('60.00', 'USD'))
+
+    def test_pickle_copy(self):
+        mr = PriceRange(Price('-0.00', 'USD'), Price('40.30', 'USD'))
+        unpickled = pickle.loads(pickle.dumps(mr))
+        self.assertIs(type(unpickled), PriceRange)
+        self.assertEqual(repr(unpickled), repr(mr))
+        self.assertIs(copy.copy(mr), mr)
+        self.assertIs(copy.deepcopy(mr), mr)
+
+
+def points(price_set):
+    """Return the integers covered by a set of integer ranges."""
+    return {(price_range.currency, amount)
+            for price_range in price_set
+            for amount in range(int(price_range.start.amount),
+                                int(price_range.stop.amount) + 1)}
+
+
+def make_ranges(rnd, count):
+    ranges = []
+    for _ in range(count):
+        start = rnd.randint(0, 200)
+        currency = rnd.choice(['USD', 'EUR'])
+        ranges.append(PriceRange(
+            Price(start, currency),
+            Price(start + rnd.randint(0, 10), currency)))
+    return ranges
+
+
+class TestPriceRangeSet(unittest.TestCase):
+    def test_normalized(self):
+        rnd = random.Random(46)
+        for _ in range(20):
+            ranges = make_ranges(rnd, 30)
+            price_set = PriceRangeSet(ranges, step=1)
+            self.assertEqual(points(price_set), points(ranges))
+            normalized = list(price_set)
+            self.assertEqual(len(price_set), len(normalized))
+            for a, b in zip(normalized, normalized[1:]):
+                if a.currency == b.currency:
+                    self.assertGreater(b.start.amount, a.stop.amount + 1)
+
+    def test_algebra(self):
+        rnd = random.Random(46)
+        for _ in range(50):
+            a = PriceRangeSet(make_ranges(rnd, 20), step=1)
+            b = PriceRangeSet(make_ranges(rnd, 20), step=1)
+            self.assertEqual(points(a | b), points(a) | points(b))
+            self.assertEqual(points(a & b), points(a) & points(b))
+            self.assertEqual(points(a - b), points(a) - points(b))
+            self.assertEqual(a | b, PriceRangeSet(list(a) + list(b), 1))
+            self.assertEqual(a - b, a - (a & b))
+
+    def test_gaps(self):
+        rnd = random.Random(46)
+        for _ in range(20):
+            price_set = PriceRangeSet(make_ranges(rnd, 20), step=1)
+            within = PriceRange(Price(-5, 'USD'), Price(250, 'USD'))
+            self.assertEqual(
+                points(price_set.gaps(within)),
+                points([within]) - points(price_set))
+            gaps = points(price_set.gaps())
+            for currency, amount in gaps:
+                self.assertNotIn(Price(amount, currency), price_set)
+            self.assertEqual(
+                points(price_set.gaps() | price_set),
+                {(currency, amount) for currency in price_set.currencies
+                 for amount in range(
+                     min(n for c, n in points(price_set) if c == currency),
+                     max(n for c, n in points(price_set) if c == currency)
+                     + 1)})
+
+    def test_continuous(self):
+        usd = PriceRangeSet([
+            PriceRange(Price('0', 'USD'), Price('10', 'USD')),
+            PriceRange(Price('10', 'USD'), Price('20', 'USD')),
+            PriceRange(Price('30.5', 'USD'), Price('40', 'USD'))])
+        self.assertEqual(
+            list(usd),
+            [PriceRange(Price('0', 'USD'), Price('20', 'USD')),
+             PriceRange(Price('30.5', 'USD'), Price('40', 'USD'))])
+        self.assertEqual(
+            list(usd.gaps()),
+            [PriceRange(Price('20', 'USD'), Price('30.5', 'USD'))])
+        self.assertEqual(
+            list(usd - [PriceRange(Price('5', 'USD'), Price('35', 'USD'))]),
+            [PriceRange(Price('0', 'USD'), Price('5', 'USD')),
+             PriceRange(Price('35', 'USD'), Price('40', 'USD'))])
+        self.assertIn(Price('20', 'USD'), usd)
+        self.assertNotIn(Price('20.01', 'USD'), usd)
+        self.assertNotIn(Price('5', 'EUR'), usd)
+        with self.assertRaises(TypeError):
+            5 in usd
+        with self.assertRaises(ValueError):
+            usd | PriceRangeSet(step='0.01')
@@ -0,0 +1,177 @@
+import subprocess
+import sys
+import textwrap
+import unittest
+from unittest import mock
+
+from zope.component import (
+    getGlobalSiteManager, getSiteManager, provideUtility)
+from zope.interface import Interface
+from zope.interface.registry import Components
+
+from pricing import registry
+from pricing.registry import get_utilities_for, query_utility
+
+
+def run(source):
+    """Run source in a fresh interpreter and return its stdout lines."""
+    result = subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(source)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    return result.stdout.splitlines()
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_import_is_lazy(self):
+        """Guards the import time of pricing against eager imports."""
+        loaded = run("""
+            import sys
+            import pricing
+            heavy = ['requests', 'zulu', 'babel', 'asyncio', 'aiohttp',
+                     'zope.configuration.xmlconfig', 'zope.component',
+                     'pricing.price', 'pricing.exchange']
+            print(sorted(name for name in heavy if name in sys.modules))
+        """)
+        self.assertEqual(loaded, ['[]'])
+
+    def test_lazy_attributes(self):
+        output = run("""
+            import pricing
+            from pricing import exchange
+            print(pricing.Price.__module__, exchange.__name__)
+            print('XPrice' in dir(pricing))
+        """)
+        self.assertEqual(output, ['pricing.price pricing.exchange', 'True'])
+        with self.assertRaises(subprocess.CalledProcessError):
+            run("import pricing; pricing.missing")
+
+
+class TestDeferredConfiguration(unittest.TestCase):
+    def test_configured_on_first_lookup(self):
+        output = run("""
+            from pricing import Price, registry
+            print(registry.is_configured())
+            print(Price('1.5', 'BTC').format('en_US'))
+            print(registry.is_configured())
+        """)
+        self.assertEqual(output, ['False', '₿1.5', 'True'])
+
+    def test_implicit_configuration_keeps_registrations(self):
+        output = run("""
+            from zope.component import provideUtility
+            from pricing import Exchange, SimpleBackend
+            from pricing.exchange import get_exchange
+            from pricing.interfaces import IExchange
+            exchange = Exchange(SimpleBackend('EUR'))
+            provideUtility(exchange, IExchange)
+            print(get_exchange() is exchange)
+        """)
+        self.assertEqual(output, ['True'])
+
+    def test_explicit_configure(self):
+        output = run("""
+            from zope.component import provideUtility, queryUtility
+            import pricing
+            from pricing.interfaces import IExchange
+            provideUtility(
+                pricing.Exchange(pricing.SimpleBackend('EUR')), IExchange)
+            pricing.configure()
+            print(queryUtility(IExchange).backend_name)
+        """)
+        self.assertEqual(output, ['CoinBaseBackend'])
+
+    def test_failed_configuration_is_retried(self):
+        output = run("""
+            from pricing import Price, registry
+            load = registry._load
+            def fail():
+                raise RuntimeError('broken')
+            registry._load = fail
+            try:
+                Price('1.5', 'BTC').format('en_US')
+            except RuntimeError as exc:
+                print(exc)
+            print(registry.is_configured())
+            registry._load = load
+            print(Price('1.5', 'BTC').format('en_US'))
+            print(registry.is_configured())
+        """)
+        self.assertEqual(output, ['broken', 'False', '₿1.5', 'True'])
+
+    def test_concurrent_lookup_waits(self):
+        output = run("""
+            import threading
+            from pricing import Price, registry
+            load = registry._load
+            started = threading.Event()
+            def slow():
+                started.set()
+                threading.Event().wait(0.2)
+                load()
+            registry._load = slow
+            thread = threading.Thread(target=registry.ensure_configured)
+            thread.start()
+            started.wait()
+            print(registry.is_configured())
+            print(Price('1.5', 'BTC').format('en_US'))
+            thread.join()
+        """)
+        self.assertEqual(output, ['False', '₿1.5'])
+
+
+class IThing(Interface):
+    pass
+
+
+class TestSnapshot(unittest.TestCase):
+    def tearDown(self):
+        registry = getGlobalSiteManager()
+        for name, thing in list(registry.getUtilitiesFor(IThing)):
+            registry.unregisterUtility(thing, IThing, name)
+
+    def test_invalidated_by_registrations(self):
+        self.assertIsNone(query_utility(IThing, 'a'))
+        self.assertEqual(get_utilities_for(IThing), ())
+        first, second = object(), object()
+        provideUtility(first, IThing, 'a')
+        self.assertIs(query_utility(IThing, 'a'), first)
+        getGlobalSiteManager().registerUtility(second, IThing, 'a')
+        self.assertIs(query_utility(IThing, 'a'), second)
+        self.assertEqual(get_utilities_for(IThing), (('a', second),))
+        getGlobalSiteManager().unregisterUtility(second, IThing, 'a')
+        self.assertEqual(query_utility(IThing, 'a', default=1), 1)
+        self.assertEqual(get_utilities_for(IThing), ())
+
+    def test_generation(self):
+        """Pins the zope.interface detail the snapshot relies on."""
+        utilities = getGlobalSiteManager().utilities
+        generation = utilities._generation
+        self.assertIsInstance(generation, int)
+        provideUtility(object(), IThing, 'generation')
+        self.assertGreater(utilities._generation, generation)
+
+    def test_without_generation(self):
+        query_utility(IThing)
+        first, second = object(), object()
+        provideUtility(first, IThing, 'a')
+        stub = mock.Mock(spec=['utilities'], utilities=object())
+        with mock.patch.object(registry, '_registry', stub):
+            self.assertIs(query_utility(IThing, 'a'), first)
+            provideUtility(second, IThing, 'a')
+            self.assertIs(query_utility(IThing, 'a'), second)
+            self.assertEqual(get_utilities_for(IThing), (('a', second),))
+        self.assertIs(query_utility(IThing, 'a'), second)
+
+    def test_local_site_manager(self):
+        provideUtility(object(), IThing)
+        local = Components('local', bases=(getGlobalSiteManager(),))
+        thing = object()
+        local.registerUtility(thing, IThing)
+        getSiteManager.sethook(lambda context=None: local)
+        try:
+            self.assertIs(query_utility(IThing), thing)
+            self.assertEqual(get_utilities_for(IThing), (('', thing),))
+        finally:
+            getSiteManager.reset()
+        self.assertIsNot(query_utility(IThing), thing)
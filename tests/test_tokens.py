@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from zope.component import getGlobalSiteManager
+
+from pricing import Price, tokens
+from pricing.bulk import format_column
+from pricing.config import register_currency
+from pricing.interfaces import ICurrencyFormat
+from pricing.price import format_options
+from pricing.tokens import TokenFormat, TokenTable
+
+
+CSV = """code,symbol,name,decimals,currency_digits
+USDC,USDC,USD Coin,6,
+1INCH,1INCH,1inch,18,
+SHIB,SHIB,,0,false
+"""
+
+JSON = [
+    {'code': 'WBTC', 'symbol': '₿', 'format': '¤#,##0.########',
+     'name': 'Wrapped Bitcoin'},
+    {'code': 'USDC', 'symbol': '$', 'decimals': 2, 'currency_digits': True},
+]
+
+
+class TestTokens(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmpdir, 'tokens.csv')
+        self.json = os.path.join(self.tmpdir, 'tokens.json')
+        with open(self.csv, 'w', encoding='utf-8') as fp:
+            fp.write(CSV)
+        with open(self.json, 'w', encoding='utf-8') as fp:
+            json.dump(JSON, fp)
+
+    def tearDown(self):
+        tokens.unload()
+        shutil.rmtree(self.tmpdir)
+
+    def test_read(self):
+        table = tokens.read(self.csv)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table), ['USDC', '1INCH', 'SHIB'])
+        self.assertEqual(
+            table.lookup('USDC'),
+            TokenFormat('USD Coin', 'USDC', 'USDC', '¤#,##0.######'))
+        self.assertIs(table.lookup('USDC'), table.lookup('USDC'))
+        self.assertEqual(table.lookup('SHIB').format, '¤#,##0')
+        self.assertEqual(table.lookup('SHIB').name, 'SHIB')
+        self.assertIsNone(table.lookup('ETH'))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TokenTable.from_items([{'code': 'usdc', 'symbol': 'u'}])
+        with self.assertRaises(ValueError):
+            TokenTable.from_items([{'code': 'AB', 'currency_digits': 'x'}])
+        with self.assertRaises(ValueError):
+            TokenFormat('Token', 'TOOLONGTOKEN1', 'T')
+
+    def test_lazy_load(self):
+        tokens.load(self.csv)
+        tokens.load(self.json)
+        self.assertEqual(tokens._pending, [self.csv, self.json])
+        self.assertTrue(tokens.is_token('1INCH'))
+        self.assertEqual(tokens._pending, [])
+        self.assertEqual(tokens.lookup('USDC').symbol, '$')
+        self.assertFalse(tokens.is_token('USD'))
+
+    def test_price(self):
+        with self.assertRaises(ValueError):
+            Price('1', 'USDC')
+        tokens.load(self.csv)
+        self.assertEqual(
+            Price('1234.5', 'USDC').format('en_US'), 'USDC1,234.5')
+        self.assertEqual(
+            Price('-1234.5', '1INCH').format('de_DE'), '-1INCH1.234,5')
+        self.assertEqual(
+            Price('1', '1INCH').format('en_US', format='#,##0.00 ¤¤'),
+            '1.00 1INCH')
+        self.assertEqual(Price('1234.4', 'SHIB').format('en_US'), 'SHIB1,234')
+        self.assertEqual(Price.parse('USDC 1.5'), Price('1.5', 'USDC'))
+        self.assertEqual(
+            format_column([1, -20], 'USDC', 'en_US', minor_digits=6),
+            ['USDC0.000001', '-USDC0.00002'])
+        with self.assertRaises(ValueError):
+            Price('1', 'ABCD')
+
+    def test_default_format(self):
+        path = os.path.join(self.tmpdir, 'plain.json')
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump([{'code': 'PLAIN', 'name': 'Plain', 'symbol': 'P'}], fp)
+        tokens.load(path)
+        self.assertEqual(tokens.lookup('PLAIN').format, tokens.DEFAULT_FORMAT)
+        self.assertEqual(
+            Price('1234.123456789', 'PLAIN').format('en_US'),
+            'P1,234.12345679')
+        self.assertEqual(
+            format_column([150], 'PLAIN', 'en_US', minor_digits=2),
+            ['P1.5'])
+
+    def test_no_format(self):
+        format = TokenFormat('Plain', 'PLAIN', 'P')
+        with mock.patch('pricing.price.lookup_token', return_value=format):
+            self.assertNotIn('format', format_options('PLAIN'))
+            self.assertEqual(
+                format_options('PLAIN', '¤0')['format'], 'P0')
+
+    def test_registered_format_wins(self):
+        tokens.load(self.json)
+        currency = register_currency('WBT', 'Ш', '¤ #,##0.00')
+        try:
+            self.assertEqual(Price('1', 'WBTC').format('en_US'), '₿1')
+            self.assertEqual(Price('1', 'WBT').format('en_US'), 'Ш 1.00')
+        finally:
+            getGlobalSiteManager().unregisterUtility(
+                currency, ICurrencyFormat, 'WBT')